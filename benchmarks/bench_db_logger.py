@@ -0,0 +1,69 @@
+# benchmarks/bench_db_logger.py
+# 比較 DatabaseLogger 逐筆 insert_one 與背景批次寫入（insert_many）的吞吐量，
+# 以及擷取執行緒呼叫 log_measurement 時所花的時間
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pymongo  # noqa: E402
+from db_logger import MEASUREMENT_SCHEMAS, DatabaseLogger  # noqa: E402
+
+
+def make_client(args):
+    if args.mongomock:
+        import mongomock
+        return mongomock.MongoClient()
+    return pymongo.MongoClient(args.uri, serverSelectionTimeoutMS=5000)
+
+
+def run(args, buffered):
+    """回傳 (呼叫端耗時, 全部寫入完成的耗時, 寫入筆數)"""
+    client = make_client(args)
+    # 先確認連線再清空資料庫；DatabaseLogger 建構時會建立集合，所以清空須在建構之前
+    try:
+        client.admin.command('ping')
+    except pymongo.errors.ConnectionFailure:
+        sys.exit("無法連接 MongoDB，可改用 --mongomock")
+    client.drop_database(args.db_name)
+    logger = DatabaseLogger(db_name=args.db_name, client=client, buffered=buffered,
+                            batch_size=args.batch_size, flush_interval=args.flush_interval,
+                            max_queue=args.count, measurement_schema=args.schema)
+    if not logger.is_connected():
+        sys.exit("無法連接 MongoDB，可改用 --mongomock")
+
+    t0 = time.perf_counter()
+    for i in range(args.count):
+        logger.log_measurement("EXP_BENCH", "distance", float(i), "mm")
+    producer = time.perf_counter() - t0
+    logger.flush()
+    total = time.perf_counter() - t0
+    written = len(logger.query_measurements("EXP_BENCH", "distance")[1])
+    client.drop_database(args.db_name)
+    logger.close()
+    return producer, total, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DatabaseLogger 寫入吞吐量測試")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/", help="MongoDB 連線字串")
+    parser.add_argument("--mongomock", action="store_true", help="使用 mongomock 取代實際的 mongod")
+    parser.add_argument("--db-name", default="sensor_data_bench", help="測試用資料庫（結束時刪除）")
+    parser.add_argument("--count", type=int, default=20000, help="寫入筆數")
+    parser.add_argument("--batch-size", type=int, default=500, help="批次大小")
+    parser.add_argument("--schema", default="timeseries", choices=MEASUREMENT_SCHEMAS,
+                        help="單點量測的儲存方式（不支援時間序列集合時自動改用 bucket）")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="最長寫入間隔（秒）")
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'caller (s)':>12}{'total (s)':>12}{'docs/s':>12}{'written':>10}")
+    for name, buffered in (("insert_one", False), ("buffered", True)):
+        producer, total, written = run(args, buffered)
+        print(f"{name:<12}{producer:>12.3f}{total:>12.3f}{written / total:>12.0f}{written:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_import.py
+# 量測 spectrum_py_package 的匯入時間，並確認匯入時不會載入 PyQt5 或 AvaSpec 原生函式庫
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在全新的直譯器中匯入，才不會受到已快取模組影響
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+avaspec = sys.modules.get("spectrum_py_package.avaspec")
+native = avaspec is not None and avaspec._library is not None
+print(elapsed, "PyQt5" in sys.modules, native)
+"""
+
+
+def measure(module, repeat):
+    """回傳每次匯入耗時（秒）以及是否載入了 Qt / 原生函式庫"""
+    times = []
+    qt_loaded = native_loaded = False
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        times.append(float(out[0]))
+        qt_loaded |= out[1] == "True"
+        native_loaded |= out[2] == "True"
+    return times, qt_loaded, native_loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="spectrum_py_package 匯入時間測試")
+    parser.add_argument("--repeat", type=int, default=10, help="重複次數")
+    parser.add_argument("--modules", nargs="+", default=[
+        "spectrum_py_package",
+        "spectrum_py_package.spectrometer",
+        "spectrum_py_package.avaspec",
+    ])
+    args = parser.parse_args()
+
+    print(f"{'module':<36}{'median (ms)':>12}{'min (ms)':>10}  Qt  native")
+    failed = False
+    for module in args.modules:
+        times, qt_loaded, native_loaded = measure(module, args.repeat)
+        print(f"{module:<36}{statistics.median(times) * 1e3:>12.1f}{min(times) * 1e3:>10.1f}"
+              f"  {'Y' if qt_loaded else '-':<3} {'Y' if native_loaded else '-'}")
+        failed |= qt_loaded or native_loaded
+
+    if failed:
+        print("錯誤：匯入時載入了 PyQt5 或原生函式庫")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import datetime
 # --- 資料庫設定 ---
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "sensor_data"
-COLLECTION_NAME = "spectrograms"  # 您想查詢的集合，可以是 "spectrograms" 或 "measurements"
+COLLECTION_NAME = "spectrograms"  # 您想查詢的集合，可以是 "spectrograms"、"measurements_ts"、"measurement_buckets" 或 "measurements"
 
 def check_latest_record():
     """
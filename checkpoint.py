@@ -0,0 +1,181 @@
+import datetime
+import glob
+import json
+import os
+import threading
+
+import numpy as np
+
+MANIFEST = 'manifest.json'
+
+
+def _write_atomic(path, write):
+    """先寫入暫存檔再以 os.replace 取代，程式中途當掉時不會留下寫到一半的檔案"""
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class CheckpointWriter:
+    """
+    量測中的定期存檔：各資料流的新資料先暫存在記憶體，每 interval 秒由背景執行緒寫成一個區段檔
+    (<資料流>_<序號>.npz，內含 time 與 data)，並更新 manifest.json。
+    區段與 manifest 都以原子方式寫入，程式當掉時最多遺失最後 interval 秒的資料；
+    記憶體中只保留尚未寫出的資料，完整資料以 read() 從磁碟讀回。
+    resume=True 時沿用既有的 manifest，新區段接在後面。
+    _lock 只保護暫存資料，磁碟寫入在 _flush_lock 內進行，寫檔期間 append() 不會被卡住。
+    """
+
+    def __init__(self, directory, interval=5.0, resume=False, **attrs):
+        self.directory = directory
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._flushing = {}
+
+        manifest_path = os.path.join(directory, MANIFEST)
+        if resume and os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            self.manifest['complete'] = False
+            self.manifest['resumed'] = self.manifest.get('resumed', 0) + 1
+        else:
+            self.manifest = {'created': datetime.datetime.now().isoformat(), 'complete': False,
+                             'interval': interval, 'streams': {}}
+        self.manifest.setdefault('attrs', {}).update(attrs)
+        self._write_manifest()
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._checkpoint_loop, daemon=True)
+        self._thread.start()
+
+    def append(self, name, times, rows):
+        """暫存新資料（times 形狀 (n,)，rows 第一維為 n）；單筆資料可直接傳入純量"""
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        rows = np.asarray(rows)
+        if len(times) == 1 and (rows.ndim == 0 or rows.shape[0] != 1):
+            rows = rows[None]
+        if rows.shape[0] != len(times):
+            raise ValueError(f"{name}: 資料筆數 {rows.shape[0]} 與時間點數 {len(times)} 不符")
+        with self._lock:
+            self._pending.setdefault(name, []).append((times, rows))
+
+    def flush(self):
+        """把暫存資料寫成新的區段並更新 manifest"""
+        with self._flush_lock:
+            # 只在鎖內交換暫存資料，寫檔時其他執行緒仍可繼續 append()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._flushing = pending
+            try:
+                written = False
+                for name, chunks in pending.items():
+                    if not chunks:
+                        continue
+                    times = np.concatenate([t for t, _ in chunks])
+                    rows = np.concatenate([r for _, r in chunks])
+                    stream = self.manifest['streams'].get(name, {'rows': 0, 'segments': []})
+                    segment = f"{name}_{len(stream['segments']):05d}.npz"
+                    _write_atomic(os.path.join(self.directory, segment),
+                                  lambda f: np.savez(f, time=times, data=rows))
+                    stream['segments'].append({'file': segment, 'rows': len(times),
+                                               'start': float(times[0]), 'end': float(times[-1])})
+                    stream['rows'] += len(times)
+                    stream['row_shape'] = list(rows.shape[1:])
+                    stream['dtype'] = rows.dtype.str
+                    with self._lock:
+                        self.manifest['streams'][name] = stream
+                    written = True
+                if written:
+                    self._write_manifest()
+            finally:
+                with self._lock:
+                    self._flushing = {}
+
+    def _write_manifest(self):
+        self.manifest['updated'] = datetime.datetime.now().isoformat()
+        data = json.dumps(self.manifest, ensure_ascii=False, indent=2).encode('utf-8')
+        _write_atomic(os.path.join(self.directory, MANIFEST), lambda f: f.write(data))
+
+    def _checkpoint_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"定期存檔失敗: {e}")
+
+    def has(self, name):
+        """資料流是否已有資料（含尚未寫出的暫存資料）"""
+        with self._lock:
+            return (bool(self._pending.get(name)) or bool(self._flushing.get(name))
+                    or name in self.manifest['streams'])
+
+    def read(self, name):
+        """寫出暫存資料後從磁碟讀回整個資料流，回傳 (times, data)"""
+        self.flush()
+        with self._flush_lock:
+            return _read_stream(self.directory, self.manifest['streams'].get(name))
+
+    def close(self):
+        """最後一次存檔並在 manifest 標記為完成（可重複呼叫）"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        with self._flush_lock:
+            self.manifest['complete'] = True
+            self._write_manifest()
+
+
+def _read_stream(directory, stream):
+    if not stream or not stream['segments']:
+        return np.zeros(0), np.zeros(0)
+    times, rows = [], []
+    for segment in stream['segments']:
+        with np.load(os.path.join(directory, segment['file'])) as npz:
+            times.append(npz['time'])
+            rows.append(npz['data'])
+    return np.concatenate(times), np.concatenate(rows)
+
+
+def load_checkpoint(directory, names=None):
+    """
+    讀取存檔資料夾，回傳 ({資料流名稱: (times, data)}, manifest)；只讀取 manifest 中記錄的區段。
+    names 可指定只讀取部分資料流（例如略過較大的音訊頻譜圖）
+    """
+    with open(os.path.join(directory, MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    streams = {name: _read_stream(directory, stream) for name, stream in manifest['streams'].items()
+               if names is None or name in names}
+    return streams, manifest
+
+
+def mark_complete(directory, **info):
+    """把未正常結束的存檔標記為完成（例如資料已匯出），find_incomplete_checkpoints 不再列出"""
+    path = os.path.join(directory, MANIFEST)
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest.update(info)
+    manifest['complete'] = True
+    manifest['updated'] = datetime.datetime.now().isoformat()
+    data = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    _write_atomic(path, lambda f: f.write(data))
+
+
+def find_incomplete_checkpoints(base_dir="Sensor_Data"):
+    """列出未正常結束（manifest 未標記完成）的實驗存檔資料夾，可用 load_checkpoint 或 resume=True 接續"""
+    incomplete = []
+    for path in sorted(glob.glob(os.path.join(base_dir, '*', 'checkpoint', MANIFEST))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if not json.load(f).get('complete', False):
+                    incomplete.append(os.path.dirname(path))
+        except (OSError, ValueError) as e:
+            print(f"無法讀取 {path}: {e}")
+    return incomplete
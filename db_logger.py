@@ -1,27 +1,231 @@
 import pymongo
 import datetime
+import queue
+import threading
+import time
 import numpy as np
 
+# 單點量測的儲存方式：timeseries 為 MongoDB 5.0+ 的時間序列集合，
+# bucket 為手動分桶（每份文件存同一實驗、同一感測器的多筆量測），document 為每筆一份文件（舊格式）
+MEASUREMENT_SCHEMAS = ('timeseries', 'bucket', 'document')
+
+
+def bucket_updates(docs, bucket_size=200):
+    """
+    把單筆量測文件依 (experiment_id, sensor, unit) 分組、依時間排序，轉成併入分桶的 UpdateOne：
+    每次最多推入 bucket_size 筆，只併入還放得下的分桶（count 加上本次筆數不超過 bucket_size），
+    沒有時 upsert 建立新桶，因此每次 flush 都接續填滿目前的分桶。
+    回傳 (requests, counts)，counts[i] 為第 i 個更新推入的量測筆數
+    """
+    groups = {}
+    for doc in docs:
+        groups.setdefault((doc['experiment_id'], doc['sensor'], doc['unit']), []).append(doc)
+    requests, counts = [], []
+    for (experiment_id, sensor, unit), group in groups.items():
+        group.sort(key=lambda d: d['timestamp'])
+        for i in range(0, len(group), bucket_size):
+            chunk = group[i:i + bucket_size]
+            requests.append(pymongo.UpdateOne(
+                {'experiment_id': experiment_id, 'sensor': sensor, 'unit': unit,
+                 'count': {'$lte': bucket_size - len(chunk)}},
+                {'$push': {'timestamps': {'$each': [d['timestamp'] for d in chunk]},
+                           'values': {'$each': [d['value'] for d in chunk]}},
+                 '$inc': {'count': len(chunk)},
+                 '$min': {'start': chunk[0]['timestamp']},
+                 '$max': {'end': chunk[-1]['timestamp']}},
+                upsert=True))
+            counts.append(len(chunk))
+    return requests, counts
+
+
+class BufferedWriter:
+    """
+    背景批次寫入器：put() 只把文件放進有上限的佇列、不等待資料庫，
+    背景執行緒依集合累積文件，達到 batch_size 筆或距上次寫入超過 flush_interval 秒時以
+    insert_many(ordered=False) 一次寫入。佇列滿時捨棄該筆並記錄在 dropped。
+    連線類錯誤以指數退避重試（文件的 _id 在第一次送出前就已產生，重試時已寫入的文件只會造成
+    重複鍵錯誤而不會重複寫入）；close() 會先寫完佇列中剩餘的文件。
+    writers 為 {集合: 函式(docs)}，以自訂方式寫入該集合的一批文件（例如併入分桶）取代 insert_many，
+    回傳實際寫入的文件數。
+    at_most_once 中的集合重送可能造成重複（時間序列集合沒有唯一的 _id、分桶的 $push 不是冪等），
+    只在確定尚未送出（找不到伺服器）時重試，其餘錯誤直接捨棄該批。
+    """
+
+    def __init__(self, db, batch_size=500, flush_interval=1.0, max_queue=10000,
+                 max_retries=5, backoff=0.5, writers=None, at_most_once=()):
+        self.db = db
+        self.writers = writers or {}
+        self.at_most_once = set(at_most_once)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.inserted = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def put(self, collection, doc):
+        """加入一筆待寫入的文件，不阻塞"""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait((collection, doc))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _insert(self, collection, docs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                if collection in self.writers:
+                    written = self.writers[collection](docs)
+                    self.inserted += written
+                    self.failed += len(docs) - written
+                    return
+                self.db[collection].insert_many(docs, ordered=False)
+                self.inserted += len(docs)
+                return
+            except pymongo.errors.BulkWriteError as e:
+                # 無序寫入時其餘文件已寫入；重試後出現的重複鍵表示該筆先前已寫入成功
+                errors = [err for err in e.details.get('writeErrors', []) if err.get('code') != 11000]
+                self.inserted += len(docs) - len(errors)
+                if errors:
+                    self.failed += len(errors)
+                    print(f"DatabaseLogger: {collection} 有 {len(errors)} 筆寫入失敗: {errors[0].get('errmsg')}")
+                return
+            except pymongo.errors.PyMongoError as e:
+                # 找不到伺服器時請求尚未送出，可安全重試；其他錯誤下該批可能已部分寫入
+                unsent = isinstance(e, pymongo.errors.ServerSelectionTimeoutError)
+                if attempt == self.max_retries or (collection in self.at_most_once and not unsent):
+                    self.failed += len(docs)
+                    print(f"DatabaseLogger: 寫入 {collection} 失敗，捨棄 {len(docs)} 筆: {e}")
+                    return
+                time.sleep(self.backoff * 2 ** attempt)
+            except Exception as e:
+                # 非資料庫錯誤（例如文件無法編碼）重試也不會成功；不能讓背景執行緒結束，否則 flush() 會一直等待
+                self.failed += len(docs)
+                print(f"DatabaseLogger: 寫入 {collection} 失敗，捨棄 {len(docs)} 筆: {e}")
+                return
+
+    def _flush(self, batches):
+        for collection, docs in batches.items():
+            if docs:
+                self._insert(collection, docs)
+        batches.clear()
+
+    def _writer_loop(self):
+        batches = {}
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(self.flush_interval - (time.monotonic() - last_flush), 0.0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # 逾時：檢查是否到了寫入時間
+            if isinstance(item, tuple):
+                batches.setdefault(item[0], []).append(item[1])
+                pending += 1
+            # None 為結束訊號，Event 為 flush() 的請求
+            requested = item is None or isinstance(item, threading.Event)
+            if requested or pending >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush(batches)
+                pending = 0
+                last_flush = time.monotonic()
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                break
+
+    def flush(self, timeout=None):
+        """等待目前佇列中的文件全部寫入"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """寫完佇列中剩餘的文件後結束背景執行緒（可重複呼叫）"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        if self.dropped:
+            print(f"DatabaseLogger: 佇列已滿，共捨棄 {self.dropped} 筆文件")
+
+
 class DatabaseLogger:
-    """一個專門用來處理 MongoDB 資料庫連接和寫入的類別。"""
-    def __init__(self, uri="mongodb://localhost:27017/", db_name="sensor_data"):
-        """初始化並連接到資料庫。"""
+    """
+    一個專門用來處理 MongoDB 資料庫連接和寫入的類別。
+    buffered=True 時單點量測與音訊特徵經由 BufferedWriter 在背景批次寫入，擷取執行緒不必等待資料庫。
+    單點量測依 measurement_schema 寫入 measurements_ts（時間序列集合）、measurement_buckets（分桶）
+    或 measurements（每筆一份文件）；伺服器不支援時間序列集合時自動改用分桶。
+    """
+    def __init__(self, uri="mongodb://localhost:27017/", db_name="sensor_data", client=None,
+                 buffered=True, batch_size=500, flush_interval=1.0, max_queue=10000,
+                 measurement_schema='timeseries', bucket_size=200):
+        """初始化並連接到資料庫；可傳入既有的 client（例如測試用的 mongomock）。"""
+        if measurement_schema not in MEASUREMENT_SCHEMAS:
+            raise ValueError(f"不支援的 measurement_schema: {measurement_schema}（可用: {', '.join(MEASUREMENT_SCHEMAS)}）")
         self.uri = uri
         self.db_name = db_name
-        self.client = None
+        self.client = client
         self.db = None
+        self.writer = None
+        self.measurement_schema = measurement_schema
+        self.bucket_size = bucket_size
         self.connect()
+        if buffered and self.is_connected():
+            self.writer = BufferedWriter(self.db, batch_size=batch_size, flush_interval=flush_interval,
+                                         max_queue=max_queue,
+                                         writers={'measurement_buckets': self._write_buckets},
+                                         at_most_once=('measurements_ts', 'measurement_buckets'))
 
     def connect(self):
         """執行資料庫連接。"""
         try:
-            self.client = pymongo.MongoClient(self.uri, serverSelectionTimeoutMS=5000)
-            self.client.admin.command('ismaster')
+            if self.client is None:
+                self.client = pymongo.MongoClient(self.uri, serverSelectionTimeoutMS=5000)
+            self.client.admin.command('ping')
             self.db = self.client[self.db_name]
             print("DatabaseLogger: MongoDB 連接成功。")
         except pymongo.errors.ConnectionFailure as e:
             self.db = None
             print(f"DatabaseLogger: MongoDB 連接失敗: {e}")
+            return
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        """建立時間序列集合（需要 MongoDB 5.0 以上，否則改用分桶）與查詢用的索引"""
+        if self.measurement_schema == 'timeseries' and 'measurements_ts' not in self.db.list_collection_names():
+            try:
+                self.db.create_collection('measurements_ts', timeseries={
+                    'timeField': 'timestamp', 'metaField': 'meta', 'granularity': 'seconds'})
+            except (pymongo.errors.PyMongoError, NotImplementedError) as e:
+                # 舊版伺服器或 mongomock 不支援時間序列集合
+                print(f"DatabaseLogger: 無法建立時間序列集合，改用分桶格式: {e}")
+                self.measurement_schema = 'bucket'
+
+        indexes = {
+            'measurement_buckets': [('experiment_id', 1), ('sensor', 1), ('start', 1)],
+            'measurements': [('experiment_id', 1), ('sensor', 1), ('timestamp', 1)],
+            'audio_features': [('experiment_id', 1), ('timestamp', 1)],
+            'spectrograms': [('experiment_id', 1)],
+        }
+        if self.measurement_schema == 'timeseries':
+            indexes['measurements_ts'] = [('meta.experiment_id', 1), ('meta.sensor', 1), ('timestamp', 1)]
+        for collection, keys in indexes.items():
+            try:
+                self.db[collection].create_index(keys)
+            except pymongo.errors.PyMongoError as e:
+                print(f"DatabaseLogger: 建立 {collection} 索引失敗: {e}")
 
     def is_connected(self):
         """檢查是否已成功連接到資料庫。"""
@@ -32,17 +236,111 @@ class DatabaseLogger:
         if not self.is_connected():
             return
         
+        timestamp = datetime.datetime.utcnow()
+        if self.measurement_schema == 'timeseries':
+            doc = {
+                'timestamp': timestamp,
+                'meta': {'experiment_id': experiment_id, 'sensor': sensor_type, 'unit': unit},
+                'value': value
+            }
+            self._insert('measurements_ts', doc, sensor_type)
+            return
+
         doc = {
             'experiment_id': experiment_id,
-            'timestamp': datetime.datetime.utcnow(),
+            'timestamp': timestamp,
             'sensor': sensor_type,
             'value': value,
             'unit': unit
         }
+        if self.measurement_schema == 'document':
+            self._insert('measurements', doc, sensor_type)
+        elif self.writer is not None:
+            # 背景寫入器每次 flush 把整批量測併入目前的分桶（_write_buckets）
+            self.writer.put('measurement_buckets', doc)
+        else:
+            try:
+                self._write_buckets([doc])
+            except Exception as e:
+                print(f"DatabaseLogger: 寫入 {sensor_type} 數據失敗: {e}")
+
+    def _write_buckets(self, docs):
+        """
+        把一批單筆量測併入各感測器尚未滿的分桶，沒有則建立新桶（依序執行，後面的更新才看得到新桶）。
+        回傳實際寫入的量測筆數
+        """
+        requests, counts = bucket_updates(docs, self.bucket_size)
         try:
-            self.db.measurements.insert_one(doc)
+            self.db.measurement_buckets.bulk_write(requests, ordered=True)
+        except pymongo.errors.BulkWriteError as e:
+            # 依序寫入在第一個失敗的更新就停止：之前的更新已寫入，之後的都沒有執行
+            errors = e.details.get('writeErrors', [])
+            failed_at = errors[0]['index'] if errors else len(requests)
+            written = sum(counts[:failed_at])
+            print(f"DatabaseLogger: measurement_buckets 有 {len(docs) - written} 筆寫入失敗: "
+                  f"{errors[0].get('errmsg') if errors else e}")
+            return written
+        return len(docs)
+
+    def query_measurements(self, experiment_id, sensor_type, start=None, end=None):
+        """讀回某實驗某感測器在 [start, end] 期間的量測，回傳 (timestamps, values)；三種儲存方式皆適用"""
+        if not self.is_connected():
+            return [], []
+        self.flush()
+
+        def time_range(field):
+            condition = {}
+            if start is not None:
+                condition['$gte'] = start
+            if end is not None:
+                condition['$lte'] = end
+            return {field: condition} if condition else {}
+
+        samples = []
+        if self.measurement_schema == 'timeseries':
+            query = {'meta.experiment_id': experiment_id, 'meta.sensor': sensor_type, **time_range('timestamp')}
+            samples = [(d['timestamp'], d['value']) for d in self.db.measurements_ts.find(query)]
+        elif self.measurement_schema == 'document':
+            query = {'experiment_id': experiment_id, 'sensor': sensor_type, **time_range('timestamp')}
+            samples = [(d['timestamp'], d['value']) for d in self.db.measurements.find(query)]
+        else:
+            # 只讀取時間範圍有重疊的分桶，再逐筆篩選
+            query = {'experiment_id': experiment_id, 'sensor': sensor_type}
+            if start is not None:
+                query['end'] = {'$gte': start}
+            if end is not None:
+                query['start'] = {'$lte': end}
+            for bucket in self.db.measurement_buckets.find(query):
+                samples.extend((t, v) for t, v in zip(bucket['timestamps'], bucket['values'])
+                               if (start is None or t >= start) and (end is None or t <= end))
+        samples.sort(key=lambda s: s[0])
+        return [t for t, _ in samples], [v for _, v in samples]
+
+    def log_audio_features(self, experiment_id, features):
+        """記錄一個音訊區塊的特徵（RMS、頻帶能量、質心等，見 signal_package.features）。"""
+        if not self.is_connected():
+            return
+
+        doc = dict(features)
+        doc['experiment_id'] = experiment_id
+        doc['timestamp'] = datetime.datetime.utcfromtimestamp(features['timestamp'])
+        self._insert('audio_features', doc, '音訊特徵')
+
+    def _insert(self, collection, doc, label):
+        """有背景寫入器時排入佇列，否則直接寫入"""
+        if self.writer is not None:
+            self.writer.put(collection, doc)
+            return
+        try:
+            self.db[collection].insert_one(doc)
         except Exception as e:
-            print(f"DatabaseLogger: 寫入 {sensor_type} 數據失敗: {e}")
+            print(f"DatabaseLogger: 寫入 {label} 數據失敗: {e}")
+
+    def flush(self, timeout=None):
+        """等待背景佇列中的文件全部寫入"""
+        if self.writer is not None:
+            return self.writer.flush(timeout)
+        return True
 
     def log_spectrogram(self, experiment_id, start_time, end_time, sample_rate, nfft, noverlap, bins, freqs, spec, backup_filename=None):
         """記錄一整塊頻譜圖數據。"""
@@ -75,7 +373,10 @@ class DatabaseLogger:
             print(f"DatabaseLogger: 儲存頻譜圖失敗: {e}")
     
     def close(self):
-        """關閉資料庫連接。"""
+        """寫完背景佇列中的文件後關閉資料庫連接。"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
         if self.client:
             self.client.close()
             print("DatabaseLogger: 資料庫連接已關閉。")
@@ -0,0 +1,264 @@
+import glob
+import gzip
+import io
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CACHE_VERSION = 1
+SPECTROGRAM_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst', '.npz', '.npz.zst')
+
+# save_spectrogram_to_csv 的欄位名稱，例如 "172.27Hz_DB_like"、"172.27Hz_Power"、"172.27Hz_SNR(dB)"
+_COLUMN_PATTERN = re.compile(r"^([-\d.]+)Hz_(DB_like|Power|SNR\(dB\))$")
+_COLUMN_KINDS = {'DB_like': 'spec', 'Power': 'power', 'SNR(dB)': 'snr'}
+
+
+@dataclass
+class SpectrogramData:
+    """由 save_spectrogram_to_csv／save_spectrogram 的輸出讀回的頻譜圖；spec/power/snr 形狀皆為 (頻率點數, 時間點數)"""
+    filename: str
+    freqs: np.ndarray
+    bins: np.ndarray
+    spec: np.ndarray
+    power: np.ndarray = None
+    snr: np.ndarray = None
+    metadata: dict = field(default_factory=dict)
+
+
+def _open_input(filename, text=True):
+    """開啟輸入檔，.gz／.zst 結尾時以串流方式解壓縮"""
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rt' if text else 'rb', newline='' if text else None)
+    if filename.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("讀取 .zst 檔需要 zstandard 套件，請先安裝：pip install zstandard")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'), closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='') if text else stream
+    return open(filename, 'r' if text else 'rb', newline='' if text else None)
+
+
+def _base_filename(filename):
+    """去除壓縮與資料副檔名（與 signal_package.audio_save.base_filename 相同）"""
+    if filename.endswith(('.gz', '.zst')):
+        filename = os.path.splitext(filename)[0]
+    return os.path.splitext(filename)[0]
+
+
+def snr_per_frequency(spec):
+    """
+    每個頻率的 SNR（dB），公式與 signal_package.audio_save.snr_per_frequency 相同；
+    此模組只依賴 numpy，不匯入 signal_package（避免讀取資料也需要 pyaudio）
+    """
+    magnitude = np.abs(spec)
+    if magnitude.shape[1] == 0:
+        return np.zeros(magnitude.shape[0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(magnitude.mean(axis=1) > 1e-9,
+                        20 * np.log10(magnitude.max(axis=1) / magnitude.mean(axis=1)), 0.0)
+
+
+def read_numeric_csv(filename):
+    """讀取單行表頭的數值 CSV（可為 .gz／.zst 壓縮檔），回傳 (欄位名稱, 形狀 (列數, 欄數) 的 float64 陣列)"""
+    with _open_input(filename) as f:
+        header = f.readline().strip().split(',')
+        # numpy 1.23 起 loadtxt 使用 C 實作的解析器，比逐行 split 快一個數量級以上
+        data = np.loadtxt(f, delimiter=',', dtype=np.float64, ndmin=2)
+    if data.size == 0:
+        data = np.zeros((0, len(header)))
+    return header, data
+
+
+def read_metadata(filename):
+    """
+    讀取 save_spectrogram_to_csv 寫出的 *_metadata.txt，回傳 dict；
+    可傳入 CSV 檔名或元數據檔名，檔案不存在時回傳空 dict
+    """
+    if not filename.endswith('_metadata.txt'):
+        filename = _base_filename(filename) + '_metadata.txt'
+    metadata = {}
+    if not os.path.exists(filename):
+        return metadata
+    with open(filename, 'r') as f:
+        for line in f:
+            key, sep, value = line.partition(':')
+            if not sep:
+                continue
+            key, value = key.strip(), value.strip()
+            number = re.match(r"^([-\d.]+)( Hz| seconds)?$", value)
+            if number:
+                value = float(number.group(1)) if '.' in number.group(1) or number.group(2) else int(number.group(1))
+            metadata[key] = value
+    return metadata
+
+
+def _cache_filename(filename):
+    return _base_filename(filename) + '_cache.npz'
+
+
+def _load_cache(filename):
+    """快取檔的來源修改時間與大小都與目前的 CSV 相同時才使用"""
+    cache = _cache_filename(filename)
+    if not os.path.exists(cache):
+        return None
+    stat = os.stat(filename)
+    try:
+        with np.load(cache) as npz:
+            if (int(npz['version']) != CACHE_VERSION or int(npz['source_mtime_ns']) != stat.st_mtime_ns
+                    or int(npz['source_size']) != stat.st_size):
+                return None
+            return {name: npz[name] for name in ('freqs', 'bins', 'spec', 'power', 'snr', 'columns')}
+    except Exception as e:
+        print(f"讀取快取檔失敗，將重新解析 CSV: {e}")
+        return None
+
+
+def _save_cache(filename, arrays):
+    stat = os.stat(filename)
+    try:
+        np.savez(_cache_filename(filename), version=CACHE_VERSION,
+                 source_mtime_ns=stat.st_mtime_ns, source_size=stat.st_size, **arrays)
+    except OSError as e:
+        print(f"無法寫入快取檔: {e}")
+
+
+def read_spectrogram_csv(filename, use_cache=True, derive=True):
+    """
+    將 save_spectrogram_to_csv 的 CSV 讀回 SpectrogramData（含 *_metadata.txt 的內容）。
+    解析結果會存成旁邊的 *_cache.npz，之後 CSV 未變更時直接載入二進位快取。
+    derive=True 時，檔案中沒有的 Power、SNR 欄（例如 'raw' 匯出設定）由 DB-like 欄重新計算
+    """
+    arrays = _load_cache(filename) if use_cache else None
+    if arrays is None:
+        header, data = read_numeric_csv(filename)
+        if not header or header[0] != 'Time(s)':
+            raise ValueError(f"{filename} 不是頻譜圖 CSV（第一欄應為 Time(s)）")
+
+        columns = {'spec': [], 'power': [], 'snr': []}
+        freqs = []
+        for index, name in enumerate(header[1:], start=1):
+            match = _COLUMN_PATTERN.match(name)
+            if match is None:
+                raise ValueError(f"無法辨識的欄位名稱: {name}")
+            kind = _COLUMN_KINDS[match.group(2)]
+            if kind == 'spec':
+                freqs.append(float(match.group(1)))
+            columns[kind].append(index)
+
+        arrays = {'freqs': np.array(freqs), 'bins': data[:, 0]}
+        for kind, indices in columns.items():
+            arrays[kind] = data[:, indices].T
+        # 欄位是否存在另外記錄（不存在時為空陣列，方便寫入快取）
+        arrays['columns'] = np.array([bool(columns['power']), bool(columns['snr'])])
+        if use_cache:
+            _save_cache(filename, arrays)
+
+    has_power, has_snr = arrays['columns']
+    data = SpectrogramData(
+        filename=filename,
+        freqs=arrays['freqs'],
+        bins=arrays['bins'],
+        spec=arrays['spec'],
+        power=arrays['power'] if has_power else None,
+        snr=arrays['snr'] if has_snr else None,
+        metadata=read_metadata(filename)
+    )
+    return _derive(data) if derive else data
+
+
+def _derive(data):
+    """補上未儲存的衍生欄位：Power = DB-like²，SNR 為每個頻率一個值並沿時間軸廣播"""
+    if data.power is None:
+        data.power = np.square(data.spec)
+    if data.snr is None:
+        data.snr = np.broadcast_to(snr_per_frequency(data.spec)[:, None], data.spec.shape)
+    return data
+
+
+def read_spectrogram_binary(filename, derive=True):
+    """讀取 save_spectrogram_binary 的 .npz（或 .npz.zst），int16 量化資料會還原為 float64"""
+    source = filename
+    if filename.endswith('.zst'):
+        # np.load 需要可隨機存取的檔案，zstd 壓縮檔先解壓到記憶體
+        with _open_input(filename, text=False) as f:
+            source = io.BytesIO(f.read())
+    with np.load(source) as npz:
+        spec = npz['spec']
+        if spec.dtype == np.int16:
+            spec = spec * npz['scale'][:, None] + npz['offset'][:, None]
+        data = SpectrogramData(
+            filename=filename,
+            freqs=npz['freqs'],
+            bins=npz['bins'],
+            spec=spec.astype(np.float64),
+            metadata=json.loads(str(npz['metadata']))
+        )
+    return _derive(data) if derive else data
+
+
+def read_spectrogram(filename, use_cache=True, derive=True):
+    """依副檔名讀取任一匯出設定的頻譜圖檔（.csv、.csv.gz、.csv.zst、.npz、.npz.zst）"""
+    if filename.endswith(('.npz', '.npz.zst')):
+        return read_spectrogram_binary(filename, derive=derive)
+    return read_spectrogram_csv(filename, use_cache=use_cache, derive=derive)
+
+
+def read_spectrum_csv(filename):
+    """
+    讀取 spectrum_main.py 輸出的單筆光譜 CSV，
+    回傳 (wavelength, intensity, elapsed_time_s, integration_time_ms)
+    """
+    _, data = read_numeric_csv(filename)
+    if data.shape[0] == 0:
+        return np.zeros(0), np.zeros(0), None, None
+    return data[:, 0], data[:, 1], float(data[0, 2]), float(data[0, 3])
+
+
+def read_distance_csv(filename):
+    """讀取監測程式輸出的距離 CSV，回傳 (timestamp, elapsed, absolute, relative) 四個陣列"""
+    _, data = read_numeric_csv(filename)
+    return data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+
+
+def find_spectrogram_files(base_dir="Sensor_Data"):
+    """列出 base_dir 下各實驗資料夾中的頻譜圖檔（不含快取檔）"""
+    return sorted(name for name in glob.glob(os.path.join(base_dir, '*', 'spectrogram_*'))
+                  if name.endswith(SPECTROGRAM_SUFFIXES) and not name.endswith('_cache.npz'))
+
+
+def load_experiments(filenames=None, base_dir="Sensor_Data", workers=None, use_cache=True):
+    """
+    以多個行程平行載入多個頻譜圖檔，回傳 {檔名: SpectrogramData}；
+    未指定 filenames 時載入 base_dir 下的所有實驗。讀取失敗的檔案會印出錯誤並略過
+    """
+    if filenames is None:
+        filenames = find_spectrogram_files(base_dir)
+    results = {}
+    if not filenames:
+        return results
+    if len(filenames) == 1 or workers == 1:
+        loaded = ((name, _safe_read(name, use_cache)) for name in filenames)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        with executor:
+            loaded = list(zip(filenames, executor.map(_safe_read, filenames, [use_cache] * len(filenames))))
+    for name, data in loaded:
+        if data is not None:
+            results[name] = data
+    return results
+
+
+def _safe_read(filename, use_cache=True):
+    try:
+        return read_spectrogram(filename, use_cache=use_cache)
+    except Exception as e:
+        print(f"讀取 {filename} 失敗: {e}")
+        return None
@@ -0,0 +1,159 @@
+import datetime
+import threading
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+class ExperimentStore:
+    """
+    單一實驗的二進位資料容器（HDF5）：每個感測器資料流是一個群組，
+    內含可延伸的 time（秒，float64）與 data（第一維為時間）兩個分塊資料集，
+    實驗與資料流的設定以屬性保存。
+
+    量測期間以 append() 分塊附加（先暫存在記憶體，累積 buffer_rows 筆才寫入），
+    之後可用 read(name, start, stop) 只讀取指定時間範圍，不必載入整個檔案。
+    """
+
+    def __init__(self, path, mode='a', buffer_rows=256, **attrs):
+        if h5py is None:
+            raise ImportError("ExperimentStore 需要 h5py，請先安裝：pip install h5py")
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self._file = h5py.File(path, mode)
+        self._lock = threading.Lock()
+        self._pending = {}
+        if mode != 'r':
+            self._file.attrs.setdefault('created', datetime.datetime.now().isoformat())
+            for key, value in attrs.items():
+                self._file.attrs[key] = value
+
+    @property
+    def attrs(self):
+        return dict(self._file.attrs)
+
+    @property
+    def streams(self):
+        return list(self._file.keys())
+
+    def create_stream(self, name, row_shape=(), dtype=np.float32, chunk_rows=1024, **attrs):
+        """
+        建立資料流（已存在則直接沿用）。row_shape 為每筆資料的形狀，
+        例如溫度為 ()、頻譜圖為 (頻率點數,)、光譜為 (像素數,)
+        """
+        with self._lock:
+            if name in self._file:
+                group = self._file[name]
+            else:
+                group = self._file.create_group(name)
+                row_shape = tuple(row_shape)
+                group.create_dataset('time', shape=(0,), maxshape=(None,), dtype=np.float64,
+                                     chunks=(chunk_rows,))
+                group.create_dataset('data', shape=(0,) + row_shape, maxshape=(None,) + row_shape,
+                                     dtype=dtype, chunks=(chunk_rows,) + row_shape)
+            for key, value in attrs.items():
+                group.attrs[key] = value
+            self._pending.setdefault(name, [])
+
+    def append(self, name, times, rows):
+        """附加一批資料（times 形狀 (n,)，rows 形狀 (n,) + row_shape）；單筆資料請傳入長度 1 的陣列"""
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        with self._lock:
+            dataset = self._file[name]['data']
+            rows = np.asarray(rows, dtype=dataset.dtype).reshape((len(times),) + dataset.shape[1:])
+            pending = self._pending.setdefault(name, [])
+            pending.append((times, rows))
+            if sum(len(t) for t, _ in pending) >= self.buffer_rows:
+                self._flush_stream(name)
+
+    def _flush_stream(self, name):
+        pending = self._pending.get(name)
+        if not pending:
+            return
+        times = np.concatenate([t for t, _ in pending])
+        rows = np.concatenate([r for _, r in pending])
+        group = self._file[name]
+        n = group['time'].shape[0]
+        group['time'].resize((n + len(times),))
+        group['data'].resize((n + len(times),) + group['data'].shape[1:])
+        group['time'][n:] = times
+        group['data'][n:] = rows
+        self._pending[name] = []
+
+    def flush(self):
+        """將所有暫存資料寫入檔案"""
+        with self._lock:
+            for name in list(self._pending):
+                self._flush_stream(name)
+            self._file.flush()
+
+    def length(self, name):
+        return self._file[name]['time'].shape[0]
+
+    def read(self, name, start=None, stop=None):
+        """
+        讀取資料流在時間 [start, stop) 範圍內的 (times, data)；
+        只會從磁碟讀取該範圍對應的分塊（time 需遞增）
+        """
+        self.flush()
+        group = self._file[name]
+        times = group['time']
+        n = times.shape[0]
+        i0, i1 = 0, n
+        if start is not None or stop is not None:
+            all_times = times[:]
+            if start is not None:
+                i0 = int(np.searchsorted(all_times, start, side='left'))
+            if stop is not None:
+                i1 = int(np.searchsorted(all_times, stop, side='left'))
+        return times[i0:i1], group['data'][i0:i1]
+
+    def stream_attrs(self, name):
+        return dict(self._file[name].attrs)
+
+    def export_npz(self, path):
+        """將整個實驗匯出為單一 .npz（方便分享或在沒有 h5py 的環境中讀取）"""
+        self.flush()
+        arrays = {}
+        for name in self.streams:
+            arrays[f"{name}/time"] = self._file[name]['time'][:]
+            arrays[f"{name}/data"] = self._file[name]['data'][:]
+        np.savez(path, **arrays)
+
+    def close(self):
+        with self._lock:
+            if not self._file:
+                return
+            for name in list(self._pending):
+                self._flush_stream(name)
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_experiment(path, start=None, stop=None):
+    """
+    載入實驗資料，回傳 {資料流名稱: (times, data)}。
+    支援 ExperimentStore 的 .h5 檔與 export_npz() 匯出的 .npz 檔
+    """
+    if str(path).endswith('.npz'):
+        with np.load(path) as npz:
+            names = sorted({key.rsplit('/', 1)[0] for key in npz.files})
+            result = {}
+            for name in names:
+                times, data = npz[f"{name}/time"], npz[f"{name}/data"]
+                i0 = 0 if start is None else np.searchsorted(times, start)
+                i1 = len(times) if stop is None else np.searchsorted(times, stop)
+                result[name] = (times[i0:i1], data[i0:i1])
+            return result
+
+    with ExperimentStore(path, mode='r') as store:
+        return {name: store.read(name, start, stop) for name in store.streams}
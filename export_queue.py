@@ -0,0 +1,137 @@
+import csv
+import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from checkpoint import load_checkpoint, mark_complete
+
+
+class ExportJob:
+    """一次實驗的匯出工作：多個輸出（sink）並行寫入，errors 記錄失敗的 sink 與錯誤"""
+
+    def __init__(self, job_id, names):
+        self.job_id = job_id
+        self.names = list(names)
+        self.completed = []
+        self.errors = {}
+        self.started = time.time()
+        self.finished = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+class ExportQueue:
+    """
+    背景匯出佇列：submit() 立即返回，各 sink 由執行緒池並行執行，擷取或 GUI 執行緒不必等待磁碟與資料庫。
+    sink 為不帶參數的函式，呼叫端需先把資料複製成快照（之後開始的新量測不會影響正在匯出的資料）。
+    每完成一個 sink 呼叫 on_progress(job, name, error)；error 為 None 表示成功
+    """
+
+    def __init__(self, max_workers=4, on_progress=None):
+        self.on_progress = on_progress
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self._lock = threading.Lock()
+        self._jobs = []
+
+    def submit(self, job_id, sinks):
+        """sinks: {名稱: 無參數函式}，回傳 ExportJob"""
+        job = ExportJob(job_id, sinks)
+        with self._lock:
+            self._jobs.append(job)
+        if not sinks:
+            job.finished = time.time()
+            job._done.set()
+            return job
+        for name, sink in sinks.items():
+            self._pool.submit(self._run, job, name, sink)
+        return job
+
+    def _run(self, job, name, sink):
+        error = None
+        try:
+            sink()
+        except Exception as e:
+            error = e
+            print(f"匯出 {job.job_id} 的 {name} 失敗: {e}")
+        with self._lock:
+            job.completed.append(name)
+            if error is not None:
+                job.errors[name] = error
+            finished = len(job.completed) == len(job.names)
+            if finished:
+                job.finished = time.time()
+        if self.on_progress:
+            try:
+                self.on_progress(job, name, error)
+            except Exception as e:
+                print(f"匯出進度回報失敗: {e}")
+        if finished:
+            # 進度回報完成後才從 pending() 移除，呼叫端看到佇列清空時已不會再有回報
+            with self._lock:
+                self._jobs.remove(job)
+            job._done.set()
+
+    def pending(self):
+        """尚未完成的匯出工作"""
+        with self._lock:
+            return list(self._jobs)
+
+    def shutdown(self, wait=True):
+        """不再接受新工作；wait=True 時等待所有匯出完成（關閉程式前呼叫）"""
+        self._pool.shutdown(wait=wait)
+
+
+def write_distance_csv(filename, timestamps, values):
+    """寫出距離紀錄：timestamps 形狀 (n,)，values 形狀 (n, 2) 依序為絕對與相對距離"""
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Elapsed(s)', 'Absolute(mm)', 'Relative(mm)'])
+        start_time = float(timestamps[0]) if len(timestamps) else time.time()
+        for timestamp, (absolute, relative) in zip(timestamps.tolist(), values.tolist()):
+            writer.writerow([
+                timestamp,
+                f"{timestamp - start_time:.3f}",
+                f"{absolute:.3f}",
+                f"{relative:.3f}"
+            ])
+    print(f"距離數據已儲存至: {filename}")
+
+
+def write_temperature_csv(filename, timestamps, values):
+    """寫出溫度紀錄：timestamps 與 values 形狀皆為 (n,)"""
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Elapsed(s)', 'Temperature(C)'])
+        start_time = float(timestamps[0]) if len(timestamps) else time.time()
+        for timestamp, temp in zip(timestamps.tolist(), values.tolist()):
+            writer.writerow([
+                timestamp,
+                f"{timestamp - start_time:.3f}",
+                f"{temp:.2f}"
+            ])
+    print(f"溫度數據已儲存至: {filename}")
+
+
+def export_checkpoint_csv(directory, experiment_id, output_dir):
+    """
+    把未正常結束的量測存檔（find_incomplete_checkpoints 列出的資料夾）中的距離與溫度匯出成 CSV，
+    全部寫出後才把存檔標記為完成，匯出失敗時下次啟動仍會列出。回傳寫出的檔名
+    """
+    streams, _ = load_checkpoint(directory, names=('distance', 'temperature'))
+    files = []
+    if 'distance' in streams:
+        files.append(os.path.join(output_dir, f'distance_{experiment_id}.csv'))
+        write_distance_csv(files[-1], *streams['distance'])
+    if 'temperature' in streams:
+        files.append(os.path.join(output_dir, f'temperature_{experiment_id}.csv'))
+        write_temperature_csv(files[-1], *streams['temperature'])
+    mark_complete(directory, recovered=datetime.datetime.now().isoformat())
+    return files
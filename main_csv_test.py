@@ -6,14 +6,17 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import datetime
+import os
 import serial.tools.list_ports
-import pyaudio
 from rangefinder import LKIF2Device
 from rangefinder.constants import RC_OK, LKIF_ABLEMODE_AUTO
 
 # 導入你的自定義模組
 from temp_py_package import continuous_read
-from signal_package import AudioRecorder, process_and_plot, plot_spectrogram, save_spectrogram_to_tdms
+from experiment_store import ExperimentStore
+from checkpoint import CheckpointWriter, find_incomplete_checkpoints
+from export_queue import ExportQueue, export_checkpoint_csv, write_distance_csv, write_temperature_csv
+from signal_package import AudioDeviceRegistry, StreamingWavWriter, SpectrogramTdmsWriter, AudioFeatureExtractor, FeatureStream, RingBuffer, IncrementalSpectrogram, LivePlotRenderer, spectrogram, to_db, to_mono, AudioRecorder, process_and_plot, get_analyzer, render_spectrogram, save_spectrogram_to_tdms
 
 class SensorIntegrationGUI:
     def __init__(self, root):
@@ -23,10 +26,22 @@ class SensorIntegrationGUI:
         
         # 狀態變數
         self.running = False
+        self.stopping = False
+        self.closing = False
         self.temp_thread = None
         self.audio_thread = None
         self.audio_recorder = None
-        self.audio_history = np.array([], dtype=np.int16)
+        self.audio_history = RingBuffer(0, dtype=np.int16)
+        self.spectrogram_engine = None
+        # 擷取執行緒寫入音訊歷史與頻譜圖引擎、GUI 執行緒繪圖時讀取，以此鎖保護
+        self.audio_lock = threading.Lock()
+        self.live_plot = None
+        self.experiment_id = None
+        self.wav_writer = None
+        self.experiment_store = None
+        # 量測結束後的存檔在背景執行緒池進行，不阻塞擷取與 GUI，下一次量測可立即開始
+        self.export_queue = ExportQueue(on_progress=self.on_export_progress)
+        self.feature_stream = FeatureStream()
         self.colorbar_added = False
         
         # 音訊設備列表
@@ -39,14 +54,18 @@ class SensorIntegrationGUI:
         # 測距儀相關變數
         self.rangefinder_device = None
         self.rangefinder_thread = None
-        self.distance_data = []  # 儲存距離數據
-        self.temperature_data = []   # ← 放在 self.distance_data 之後
+        # 距離、溫度等資料定期寫入磁碟（Sensor_Data/<實驗編號>/checkpoint），不再全部保留在記憶體
+        self.checkpoint = None
+        self.checkpoint_interval = 5.0  # 秒
 
         # 測距儀參數
         self.BASIC_REF = 50.0
         self.OUT_NO = 0
         self.SAMPLING_US = 1000
         self.RANGE_CODE = 0
+
+        # 視窗出現後檢查上次是否有未正常結束的量測
+        self.root.after(0, self.offer_checkpoint_recovery)
     def setup_gui(self):
         # 主框架
         main_frame = ttk.Frame(self.root, padding="10")
@@ -72,7 +91,7 @@ class SensorIntegrationGUI:
         refresh_frame = ttk.Frame(settings_frame)
         refresh_frame.grid(row=0, column=4, padx=5)
         ttk.Button(refresh_frame, text="重新整理COM", command=self.refresh_com_ports).pack(pady=1)
-        ttk.Button(refresh_frame, text="重新整理音訊", command=self.refresh_audio_devices).pack(pady=1)
+        ttk.Button(refresh_frame, text="重新整理音訊", command=lambda: self.refresh_audio_devices(rescan=True)).pack(pady=1)
         
         # 執行時間設定
         ttk.Label(settings_frame, text="執行時間(秒):").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
@@ -123,6 +142,10 @@ class SensorIntegrationGUI:
         self.status_label = ttk.Label(status_frame, text="狀態: 待機中", font=("Arial", 10))
         self.status_label.grid(row=2, column=0, sticky=tk.W, padx=10)
         
+        # 背景匯出進度
+        self.export_label = ttk.Label(status_frame, text="", font=("Arial", 10))
+        self.export_label.grid(row=3, column=0, columnspan=2, sticky=tk.W, padx=10)
+        
         # 圖形顯示區域
         plot_frame = ttk.LabelFrame(main_frame, text="音訊監測", padding="5")
         plot_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
@@ -171,28 +194,13 @@ class SensorIntegrationGUI:
         except Exception as e:
             print(f"刷新COM端口錯誤: {e}")
     
-    def refresh_audio_devices(self):
-        """重新整理可用的音訊設備"""
+    def refresh_audio_devices(self, rescan=False):
+        """重新整理可用的音訊設備；rescan=True 時重新列舉（監測中不重新列舉，以免影響使用中的串流）"""
         try:
-            p = pyaudio.PyAudio()
-            self.audio_devices = []
-            device_names = []
-            
-            for i in range(p.get_device_count()):
-                device_info = p.get_device_info_by_index(i)
-                # 只顯示有輸入通道的設備（麥克風）
-                if device_info['maxInputChannels'] > 0:
-                    device_name = f"{i}: {device_info['name']}"
-                    self.audio_devices.append({
-                        'index': i,
-                        'name': device_info['name'],
-                        'display_name': device_name,
-                        'channels': device_info['maxInputChannels'],
-                        'sample_rate': device_info['defaultSampleRate']
-                    })
-                    device_names.append(device_name)
-            
-            p.terminate()
+            registry = AudioDeviceRegistry.shared()
+            devices = registry.refresh() if rescan and not self.running else registry.input_devices
+            self.audio_devices = [device.as_dict() for device in devices]
+            device_names = [device.display_name for device in devices]
             
             self.audio_device_combo['values'] = device_names
             if device_names:
@@ -271,6 +279,9 @@ class SensorIntegrationGUI:
             
             # 設定狀態
             self.running = True
+            self.experiment_id = "EXP_" + datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.open_experiment_store(sample_rate)
+            self.open_checkpoint()
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
             
@@ -304,11 +315,13 @@ class SensorIntegrationGUI:
             messagebox.showerror("錯誤", f"啟動監測失敗: {e}")
     
     def stop_monitoring(self):
-        """停止監測"""
+        """停止監測：通知各執行緒結束，輸出檔等執行緒都結束後才關閉（見 finish_stopping）"""
+        if not self.running:
+            return
         self.running = False
-        self.start_button.config(state=tk.NORMAL)
+        self.stopping = True
         self.stop_button.config(state=tk.DISABLED)
-        self.status_label.config(text="狀態: 已停止")
+        self.status_label.config(text="狀態: 停止中...")
         
         # 關閉音訊錄音器
         if self.audio_recorder:
@@ -326,15 +339,24 @@ class SensorIntegrationGUI:
                 pass
             self.rangefinder_device = None
         
-        # 等待執行緒結束
-        if self.temp_thread and self.temp_thread.is_alive():
-            self.temp_thread.join(timeout=1)
-        if self.audio_thread and self.audio_thread.is_alive():
-            self.audio_thread.join(timeout=1)
-        if self.rangefinder_thread and self.rangefinder_thread.is_alive():  # 新增
-            self.rangefinder_thread.join(timeout=1)
+        self.finish_stopping()
+
+    def finish_stopping(self):
+        """
+        各擷取執行緒結束後才關閉 WAV、HDF5 與定期存檔，避免最後的寫入落在已關閉的檔案。
+        以 root.after 輪詢而不 join：執行緒結束前仍會透過 root.after 更新畫面，阻塞主執行緒會卡住
+        """
+        threads = (self.temp_thread, self.audio_thread, self.rangefinder_thread)
+        if any(t is not None and t.is_alive() for t in threads):
+            self.root.after(100, self.finish_stopping)
+            return
+        self.close_wav_writer()
+        self.close_experiment_store()
+        self.close_checkpoint()
+        self.stopping = False
+        self.start_button.config(state=tk.NORMAL)
+        self.status_label.config(text="狀態: 已停止")
 
-    
     def start_temperature_monitoring(self):
         """開始溫度監測執行緒"""
         def temp_worker():
@@ -350,11 +372,7 @@ class SensorIntegrationGUI:
                     
                     if temp is not None:
                         consecutive_failures = 0  # 重置失敗計數
-                        current_time = time.time()                       # 新增
-                        self.temperature_data.append({                   # 新增
-                            'timestamp': current_time,                   # 新增
-                            'temp': temp                                 # 新增
-                        })                                               # 新增
+                        self.store_append('temperature', time.time(), temp)
 
                         if sensor_disconnected:
                             # 感測器重新連接成功
@@ -395,8 +413,16 @@ class SensorIntegrationGUI:
         def audio_worker():
             try:
                 # 初始化音訊相關變數
-                self.audio_history = np.array([], dtype=np.int16)
                 max_history_samples = int(history_duration * sample_rate)
+                self.audio_history = RingBuffer(max_history_samples, dtype=np.int16)
+                # 增量式頻譜圖：每個區塊只計算新增的欄，繪圖與儲存都直接使用其結果
+                self.spectrogram_engine = IncrementalSpectrogram(
+                    sample_rate, NFFT=256, noverlap=128, history_duration=history_duration)
+                self.history_duration = history_duration
+                
+                # 每個區塊的音訊特徵（位準、頻帶能量、事件等），以區塊速率發布給資料庫等訂閱者
+                self.feature_extractor = AudioFeatureExtractor(int(sample_rate * update_interval), sample_rate)
+                self.feature_stream = FeatureStream()
                 
                 # 取得選中的音訊設備索引
                 device_index = self.get_selected_audio_device_index()
@@ -409,61 +435,94 @@ class SensorIntegrationGUI:
                     channels=None, 
                     chunk=1024, 
                     verbose=True,
-                    #device_index=device_index  # 傳入設備索引
+                    device_index=device_index  # 傳入設備索引
                 )
+                # 以回呼模式連續擷取，避免每次錄音之間的空檔遺失音訊
+                self.audio_recorder.start_continuous()
+                # 頻譜圖引擎的時間由樣本數計算（從 0 秒起），加上擷取開始的時間才能與溫度、距離的 time.time() 對齊
+                capture_start = self.audio_recorder.capture_started
                 
-                start_time = time.time()
-                iteration = 0
-                audio_error_notified = False
+                # 原始音訊同時以背景執行緒寫入 WAV 檔（每 10 分鐘換一個檔案），不影響擷取
+                self.wav_writer = StreamingWavWriter(
+                    os.path.join("Sensor_Data", self.experiment_id), sample_rate,
+                    channels=self.audio_recorder.channels, prefix=f"audio_{self.experiment_id}",
+                    rotate_seconds=600)
+                self.audio_recorder.add_listener(self.wav_writer.push)
+                if self.experiment_store is not None:
+                    self.experiment_store.create_stream(
+                        'audio_spectrogram', row_shape=(len(self.spectrogram_engine.freqs),),
+                        unit='PSD', freqs=self.spectrogram_engine.freqs, sample_rate=sample_rate,
+                        NFFT=256, noverlap=128)
                 
-                while self.running:
-                    current_time = time.time()
-                    elapsed_time = current_time - start_time
+                # 頻譜圖在量測期間即逐段附加到 TDMS 檔，不必等到結束才一次寫出
+                tdms_stream = SpectrogramTdmsWriter(
+                    os.path.join("Sensor_Data", self.experiment_id, f"spectrogram_{self.experiment_id}_stream.tdms"),
+                    self.spectrogram_engine.freqs, sample_rate, NFFT=256, noverlap=128,
+                    experiment_id=self.experiment_id)
+                
+                # 迴圈中途發生例外時也要關閉 TDMS 檔，否則其區段索引不完整
+                try:
+                    start_time = time.time()
+                    iteration = 0
+                    audio_error_notified = False
+                
+                    while self.running:
+                        current_time = time.time()
+                        elapsed_time = current_time - start_time
                     
-                    # 檢查是否達到設定時間
-                    if duration > 0 and elapsed_time >= duration:
-                        break
+                        # 檢查是否達到設定時間
+                        if duration > 0 and elapsed_time >= duration:
+                            break
                     
-                    # 更新時間顯示
-                    self.root.after(0, lambda t=elapsed_time: self.time_label.config(text=f"執行時間: {int(t)} 秒"))
+                        # 更新時間顯示
+                        self.root.after(0, lambda t=elapsed_time: self.time_label.config(text=f"執行時間: {int(t)} 秒"))
                     
-                    try:
-                        # 錄製音訊數據
-                        single_ori = self.audio_recorder.record_audio(update_interval)
+                        try:
+                            # 錄製音訊數據；多通道時先解交錯再混為單聲道，避免交錯樣本被當成單聲道處理
+                            single_ori = to_mono(self.audio_recorder.record_frames(update_interval))
                         
-                        if single_ori is not None and len(single_ori) > 0:
-                            self.audio_history = np.concatenate((self.audio_history, single_ori))
-                            if len(self.audio_history) > max_history_samples:
-                                self.audio_history = self.audio_history[-max_history_samples:]
+                            if single_ori is not None and len(single_ori) > 0:
+                                with self.audio_lock:
+                                    self.audio_history.append(single_ori)
+                                    new_columns = self.spectrogram_engine.push(single_ori)
+                                if new_columns:
+                                    new_spec, _, _ = self.spectrogram_engine.current(new_columns)
+                                    new_times = capture_start + self.spectrogram_engine.times(relative=False)[-new_columns:]
+                                    tdms_stream.append(new_spec, new_times)
+                                    self.store_append('audio_spectrogram', new_times, new_spec.T)
+                                self.feature_stream.publish(self.feature_extractor.process(single_ori))
                             
-                            # 更新圖形 (在主執行緒中執行)
-                            self.root.after(0, lambda s=single_ori.copy(), h=self.audio_history.copy(): 
-                                          self.update_plots_with_signal_package(s, h, sample_rate))
+                                # 更新圖形 (在主執行緒中執行)；頻譜圖在繪圖時才於鎖內取出快照，不需每個區塊都複製
+                                self.root.after(0, lambda s=single_ori: 
+                                              self.update_plots_with_signal_package(s, sample_rate))
                         
-                        # 重置錯誤通知標誌
-                        if audio_error_notified:
-                            audio_error_notified = False
-                            self.root.after(0, lambda: messagebox.showinfo("通知", "音訊設備已恢復正常"))
+                            # 重置錯誤通知標誌
+                            if audio_error_notified:
+                                audio_error_notified = False
+                                self.root.after(0, lambda: messagebox.showinfo("通知", "音訊設備已恢復正常"))
                             
-                    except Exception as audio_error:
-                        print(f"音訊錄製錯誤: {audio_error}")
+                        except Exception as audio_error:
+                            print(f"音訊錄製錯誤: {audio_error}")
                         
-                        # 只在第一次出現錯誤時通知用戶
-                        if not audio_error_notified:
-                            audio_error_notified = True
-                            self.root.after(0, lambda err=str(audio_error): messagebox.showwarning("警告", 
-                                f"音訊錄製出現錯誤: {err}\n監測將繼續但音訊數據可能不完整"))
+                            # 只在第一次出現錯誤時通知用戶
+                            if not audio_error_notified:
+                                audio_error_notified = True
+                                self.root.after(0, lambda err=str(audio_error): messagebox.showwarning("警告", 
+                                    f"音訊錄製出現錯誤: {err}\n監測將繼續但音訊數據可能不完整"))
                     
-                    iteration += 1
+                        iteration += 1
+                finally:
+                    tdms_stream.close()
                 
                 # 錄音結束處理
                 if self.audio_recorder:
                     self.audio_recorder.close()
                     self.audio_recorder = None
+                self.close_wav_writer()
                 
                 # 儲存最終數據
                 if len(self.audio_history) > 0:
-                    self.save_final_data_with_signal_package(self.audio_history, sample_rate)
+                    self.save_final_data_with_signal_package(self.audio_history.view(), sample_rate)
                 else:
                     self.root.after(0, lambda: messagebox.showwarning("警告", "沒有錄製到音訊數據"))
                 
@@ -514,11 +573,7 @@ class SensorIntegrationGUI:
                             
                             # 儲存數據
                             current_time = time.time()
-                            self.distance_data.append({
-                                'timestamp': current_time,
-                                'absolute': abs_distance,
-                                'relative': rel_distance
-                            })
+                            self.store_append('distance', current_time, [abs_distance, rel_distance])
                             
                             consecutive_failures = 0
                             if sensor_disconnected:
@@ -601,28 +656,108 @@ class SensorIntegrationGUI:
         timer_thread = threading.Thread(target=timer_worker, daemon=True)
         timer_thread.start()
     
-    def update_plots_with_signal_package(self, single_ori, audio_history, sample_rate):
+    def update_plots_with_signal_package(self, single_ori, sample_rate):
         """使用signal_package更新圖形顯示"""
         try:
-            # 使用你的signal_package來更新波形與頻譜圖
-            process_and_plot(
-                single_ori, sample_rate,
-                ax_waveform=self.ax_waveform,
-                ax_spectrum=self.ax_spectrum,
-                show_plots=False
-            )
+            # 圖形元件只建立一次，之後以 set_data 更新並以 blitting 只重繪變動的部分
+            if self.live_plot is None:
+                self.live_plot = LivePlotRenderer(
+                    self.fig, self.ax_waveform, self.ax_spectrum, self.ax_spectrogram,
+                    sample_rate, history_duration=self.history_duration)
             
-            # 即時更新頻譜圖，但不加 colorbar (避免重複添加)
-            plot_spectrogram(audio_history, sample_rate, self.ax_spectrogram, draw_colorbar=False)
+            # 使用你的signal_package計算頻譜（不傳入座標軸，只做計算）
+            frequencies, magnitudes_db = process_and_plot(single_ori, sample_rate, show_plots=False)
             
-            # 更新畫布
-            self.canvas.draw()
+            # 即時更新頻譜圖；使用增量計算好的結果。擷取執行緒會持續附加新欄，
+            # 在鎖內複製目前視窗，避免繪圖時欄與時間軸不一致
+            with self.audio_lock:
+                spec, freqs, bins = self.spectrogram_engine.current()
+                spec = spec.copy()
+            self.live_plot.update(single_ori, frequencies, magnitudes_db, spectrogram=(spec, freqs, bins))
             
         except Exception as e:
             print(f"圖形更新錯誤: {e}")
+            # 備用繪圖會清除座標軸，下次更新時重新建立繪製器
+            self.close_live_plot()
             # 如果signal_package函數出錯，使用備用的基本繪圖
+            with self.audio_lock:
+                audio_history = self.audio_history.view().copy()
             self.update_plots_basic(single_ori, audio_history, sample_rate)
     
+    def close_wav_writer(self):
+        # 監測執行緒與 stop_monitoring 都可能呼叫，先取出參考再關閉
+        writer, self.wav_writer = self.wav_writer, None
+        if writer is not None:
+            writer.close()
+            print(f"原始音訊已儲存至: {', '.join(writer.files)}")
+    
+    def open_experiment_store(self, sample_rate):
+        """建立本次實驗的 HDF5 容器，各感測器資料在量測期間即分塊附加"""
+        try:
+            output_dir = os.path.join("Sensor_Data", self.experiment_id)
+            os.makedirs(output_dir, exist_ok=True)
+            self.experiment_store = ExperimentStore(
+                os.path.join(output_dir, f"{self.experiment_id}.h5"), mode='w',
+                experiment_id=self.experiment_id, sample_rate=sample_rate)
+            self.experiment_store.create_stream('temperature', unit='°C')
+            self.experiment_store.create_stream('distance', row_shape=(2,), unit='mm',
+                                                columns=['absolute', 'relative'])
+        except Exception as e:
+            print(f"建立實驗資料檔失敗: {e}")
+            self.experiment_store = None
+    
+    def offer_checkpoint_recovery(self):
+        """程式當掉後重新啟動時，詢問是否把未正常結束的量測存檔匯出成 CSV（在背景匯出佇列執行）"""
+        directories = find_incomplete_checkpoints("Sensor_Data")
+        if not directories:
+            return
+        experiment_ids = [os.path.basename(os.path.dirname(d)) for d in directories]
+        listing = "\n".join(experiment_ids)
+        if not messagebox.askyesno("未完成的量測",
+                f"以下量測未正常結束:\n{listing}\n\n"
+                "是否將已存檔的距離與溫度資料匯出成 CSV？\n（選「否」會保留存檔，下次啟動時再詢問）"):
+            return
+        for directory, experiment_id in zip(directories, experiment_ids):
+            self.export_queue.submit(f"{experiment_id}（復原）", {
+                '存檔復原': lambda d=directory, e=experiment_id: export_checkpoint_csv(d, e, os.path.dirname(d))})
+    
+    def open_checkpoint(self):
+        """量測中定期存檔：每 checkpoint_interval 秒把新資料寫成區段檔，程式當掉時只遺失最後幾秒"""
+        try:
+            self.checkpoint = CheckpointWriter(
+                os.path.join("Sensor_Data", self.experiment_id, "checkpoint"),
+                interval=self.checkpoint_interval, experiment_id=self.experiment_id)
+        except Exception as e:
+            print(f"建立定期存檔失敗: {e}")
+            self.checkpoint = None
+    
+    def store_append(self, name, timestamps, values):
+        """寫入實驗資料檔與定期存檔"""
+        for sink in (self.experiment_store, self.checkpoint):
+            if sink is None:
+                continue
+            try:
+                sink.append(name, timestamps, values)
+            except Exception as e:
+                print(f"寫入實驗資料失敗 ({name}): {e}")
+    
+    def close_checkpoint(self):
+        # 參考保留給背景匯出讀取，這裡只寫出剩餘資料並標記完成
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+    
+    def close_experiment_store(self):
+        # 與 close_wav_writer 相同，先取出參考再關閉
+        store, self.experiment_store = self.experiment_store, None
+        if store is not None:
+            store.close()
+            print(f"實驗資料已儲存至: {store.path}")
+    
+    def close_live_plot(self):
+        if self.live_plot is not None:
+            self.live_plot.close()
+            self.live_plot = None
+    
     def update_plots_basic(self, single_ori, audio_history, sample_rate):
         """基本圖形更新（備用方法）"""
         try:
@@ -639,18 +774,18 @@ class SensorIntegrationGUI:
             
             # 繪製頻譜
             if len(single_ori) > 0:
-                fft = np.fft.rfft(single_ori)
-                freqs = np.fft.rfftfreq(len(single_ori), 1/sample_rate)
-                self.ax_spectrum.plot(freqs, np.abs(fft))
+                # 頻率軸與 FFT 設定由快取的分析器提供，不必每次重新計算
+                freqs, magnitudes_db = get_analyzer(len(single_ori), sample_rate).process(single_ori)
+                self.ax_spectrum.plot(freqs, magnitudes_db)
                 self.ax_spectrum.set_title("頻譜")
                 self.ax_spectrum.set_xlabel("頻率 (Hz)")
-                self.ax_spectrum.set_ylabel("振幅")
+                self.ax_spectrum.set_ylabel("振幅 (dB)")
                 self.ax_spectrum.set_xlim(0, sample_rate/2)
             
             # 繪製頻譜圖
             if len(audio_history) > 256:  # 確保有足夠的數據
-                f, t, Sxx = plt.mlab.specgram(audio_history, NFFT=256, Fs=sample_rate, noverlap=128)
-                self.ax_spectrogram.imshow(10 * np.log10(Sxx), aspect='auto', origin='lower', 
+                Sxx, f, t = spectrogram(audio_history, sample_rate, NFFT=256, noverlap=128)
+                self.ax_spectrogram.imshow(to_db(Sxx), aspect='auto', origin='lower', 
                                          extent=[0, len(audio_history)/sample_rate, 0, sample_rate/2])
                 self.ax_spectrogram.set_title("頻譜圖")
                 self.ax_spectrogram.set_xlabel("時間 (秒)")
@@ -663,62 +798,66 @@ class SensorIntegrationGUI:
             print(f"基本圖形更新錯誤: {e}")
     
     def save_final_data_with_signal_package(self, audio_history, sample_rate):
-        """使用signal_package儲存最終數據"""
+        """使用signal_package儲存最終數據：取出快照後交給背景匯出佇列，本函式立即返回"""
         try:
-            experiment_id = "EXP_" + datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # 生成最終頻譜圖並儲存數據
-            spec, freqs, bins = plot_spectrogram(audio_history, sample_rate, self.ax_spectrogram, draw_colorbar=True)
-            save_spectrogram_to_tdms(spec, freqs, bins, sample_rate, NFFT=256, noverlap=128, 
-                                 experiment_id=experiment_id,
-                                 filename=f'spectrogram_{experiment_id}.tdms')
-            
-            print(f"數據已儲存至: spectrogram_{experiment_id}.tdms")
-            
-            # 更新最終顯示
-            self.canvas.draw()
-            
-            # 顯示完成訊息
-            self.root.after(0, lambda: messagebox.showinfo("完成", 
-                f"監測完成！\n數據已儲存至: spectrogram_{experiment_id}.tdms"))
-            
-            if self.distance_data:
-                distance_filename = f'distance_{experiment_id}.csv'
-                with open(distance_filename, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['Timestamp', 'Elapsed(s)', 'Absolute(mm)', 'Relative(mm)'])
-                    start_time = self.distance_data[0]['timestamp'] if self.distance_data else time.time()
-                    for data in self.distance_data:
-                        elapsed = data['timestamp'] - start_time
-                        writer.writerow([
-                            data['timestamp'], 
-                            f"{elapsed:.3f}", 
-                            f"{data['absolute']:.3f}", 
-                            f"{data['relative']:.3f}"
-                        ])
-                print(f"距離數據已儲存至: {distance_filename}")
-            
-            if self.temperature_data:
-                temp_filename = f'temperature_{experiment_id}.csv'
-                with open(temp_filename, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['Timestamp', 'Elapsed(s)', 'Temperature(C)'])
-                    start_time = self.temperature_data[0]['timestamp']
-                    for entry in self.temperature_data:
-                        elapsed = entry['timestamp'] - start_time
-                        writer.writerow([
-                            entry['timestamp'],
-                            f"{elapsed:.3f}",
-                            f"{entry['temp']:.2f}"
-                        ])
-                print(f"溫度數據已儲存至: {temp_filename}")
+            # 與監測期間寫入的音訊特徵使用相同的實驗編號
+            experiment_id = self.experiment_id or "EXP_" + datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+            # 不可變的快照：頻譜圖引擎回傳的是環形緩衝區的視圖，需複製
+            spec, freqs, bins = self.spectrogram_engine.current()
+            spec, freqs, bins = spec.copy(), freqs.copy(), bins.copy()
+            # 距離與溫度由定期存檔讀回（匯出時才從磁碟讀取）
+            checkpoint = self.checkpoint
+
+            # 最終頻譜圖在主執行緒繪製
+            self.root.after(0, lambda: self.show_final_spectrogram(spec, freqs, bins))
+
+            def save_tdms():
+                # save_spectrogram_to_tdms 只印出錯誤，需轉成例外匯出佇列才會記錄失敗
+                filename = f'spectrogram_{experiment_id}.tdms'
+                if not save_spectrogram_to_tdms(spec, freqs, bins, sample_rate, NFFT=256, noverlap=128,
+                                                experiment_id=experiment_id, filename=filename):
+                    raise RuntimeError(f"頻譜圖未能儲存到 {filename}")
+
+            sinks = {'頻譜圖 TDMS': save_tdms}
+            if checkpoint is not None and checkpoint.has('distance'):
+                sinks['距離 CSV'] = lambda: write_distance_csv(
+                    f'distance_{experiment_id}.csv', *checkpoint.read('distance'))
+            if checkpoint is not None and checkpoint.has('temperature'):
+                sinks['溫度 CSV'] = lambda: write_temperature_csv(
+                    f'temperature_{experiment_id}.csv', *checkpoint.read('temperature'))
+
+            self.export_queue.submit(experiment_id, sinks)
+            print(f"{experiment_id} 已排入背景匯出: {', '.join(sinks)}")
 
-                        
         except Exception as e:
             print(f"使用signal_package儲存數據錯誤: {e}")
-            self.root.after(0, lambda: messagebox.showwarning("警告", 
+            self.root.after(0, lambda: messagebox.showwarning("警告",
                 f"數據儲存失敗: {e}"))
 
+    def show_final_spectrogram(self, spec, freqs, bins):
+        """量測結束後以完整的頻譜圖取代即時圖形（主執行緒）"""
+        try:
+            self.close_live_plot()
+            render_spectrogram(spec, freqs, bins, self.ax_spectrogram, draw_colorbar=True)
+            self.canvas.draw()
+        except Exception as e:
+            print(f"最終頻譜圖繪製錯誤: {e}")
+
+    def on_export_progress(self, job, name, error):
+        """背景匯出每完成一個輸出時呼叫（匯出執行緒），GUI 更新交給主執行緒"""
+        done, total = len(job.completed), len(job.names)
+        text = f"匯出 {job.job_id}: {done}/{total}" + (f"（{name} 失敗）" if error else "")
+        self.root.after(0, lambda: self.export_label.config(text=text))
+        if done < total or self.closing:
+            return
+        if job.errors:
+            failed = "\n".join(f"{n}: {e}" for n, e in job.errors.items())
+            self.root.after(0, lambda: messagebox.showwarning("警告", f"{job.job_id} 部分數據儲存失敗:\n{failed}"))
+        else:
+            self.root.after(0, lambda: messagebox.showinfo("完成",
+                f"監測完成！\n{job.job_id} 的數據已全部儲存（{job.finished - job.started:.1f} 秒）"))
+
 def main():
     try:
         root = tk.Tk()
@@ -726,8 +865,21 @@ def main():
         
         # 設定視窗關閉事件
         def on_closing():
+            if app.closing:
+                return
+            app.closing = True
             if app.running:
                 app.stop_monitoring()
+            close_when_idle()
+
+        def close_when_idle():
+            # 等待擷取執行緒結束（其匯出才會排入佇列）與背景匯出完成後再關閉，資料庫連線也需保留到匯出結束。
+            # 以 root.after 輪詢而不阻塞主執行緒：匯出執行緒回報進度時需要主迴圈處理 root.after
+            if app.stopping or app.export_queue.pending():
+                app.export_label.config(text="等待背景匯出完成後關閉...")
+                root.after(200, close_when_idle)
+                return
+            app.export_queue.shutdown(wait=True)
             root.destroy()
         
         root.protocol("WM_DELETE_WINDOW", on_closing)
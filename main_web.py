@@ -2,6 +2,9 @@ from flask import Flask, render_template, Response
 import time
 import datetime
 import random
+import json
+import queue
+import threading
 
 # 你自己的函式庫：temp_py_package
 from temp_py_package import continuous_read  
@@ -13,6 +16,77 @@ HISTORY_DATA_1 = []
 HISTORY_DATA_2 = []
 HISTORY_DATA_3 = []
 HISTORY_DATA_4 = []
+# 音訊特徵：由單一擷取執行緒發布（第一個連線時啟動、最後一個連線結束時停止），
+# 各 SSE 連線只訂閱，不另外開啟麥克風
+AUDIO_FEATURES = None
+_audio_lock = threading.Lock()
+_audio_clients = 0
+_audio_capture = None  # (擷取執行緒, 停止事件)
+
+
+def start_audio_features(sample_rate=22050, block_duration=0.1):
+    """
+    啟動共用的音訊特徵擷取執行緒（已啟動則直接使用）並登記一個連線，回傳 FeatureStream；
+    無法開啟音訊時回傳 None。連線結束時需呼叫 release_audio_features()
+    """
+    global AUDIO_FEATURES, _audio_clients, _audio_capture
+    with _audio_lock:
+        if AUDIO_FEATURES is not None:
+            _audio_clients += 1
+            return AUDIO_FEATURES
+        if _audio_capture is not None:
+            # 等上一次擷取關閉錄音設備，避免同一設備同時開啟兩次
+            _audio_capture[0].join(timeout=2)
+            _audio_capture = None
+        try:
+            # 延遲匯入：signal_package 需要 pyaudio，溫度等其他路由不受影響
+            from signal_package import AudioRecorder, AudioFeatureExtractor, FeatureStream, to_mono
+            recorder = AudioRecorder(sample_rate=sample_rate, channels=None, chunk=1024, verbose=False)
+            recorder.start_continuous()
+        except (Exception, SystemExit) as e:
+            # AudioRecorder 找不到設備時會呼叫 sys.exit，不能讓它結束請求執行緒
+            print(f"音訊特徵擷取無法啟動: {e!r}")
+            return None
+        AUDIO_FEATURES = FeatureStream(history=600)
+        extractor = AudioFeatureExtractor(int(sample_rate * block_duration), sample_rate)
+        stop = threading.Event()
+        thread = threading.Thread(target=_audio_capture_loop,
+                                  args=(recorder, extractor, AUDIO_FEATURES, to_mono, block_duration, stop),
+                                  daemon=True)
+        _audio_capture = (thread, stop)
+        _audio_clients = 1
+        thread.start()
+        return AUDIO_FEATURES
+
+
+def release_audio_features(stream):
+    """連線結束時呼叫：最後一個連線離開後停止擷取執行緒，由它關閉錄音設備"""
+    global AUDIO_FEATURES, _audio_clients
+    with _audio_lock:
+        if AUDIO_FEATURES is not stream:
+            return  # 擷取已因錯誤結束
+        _audio_clients -= 1
+        if _audio_clients == 0:
+            _audio_capture[1].set()
+            AUDIO_FEATURES = None
+
+
+def _audio_capture_loop(recorder, extractor, stream, to_mono, block_duration, stop):
+    global AUDIO_FEATURES, _audio_capture
+    try:
+        while not stop.is_set():
+            block = to_mono(recorder.record_frames(block_duration))
+            stream.publish(extractor.process(block))
+    except Exception as e:
+        print(f"音訊特徵擷取中止: {e}")
+    finally:
+        recorder.close()
+        if not stop.is_set():
+            with _audio_lock:
+                # 因錯誤結束：下一個連線會重新啟動擷取
+                if AUDIO_FEATURES is stream:
+                    AUDIO_FEATURES = None
+                    _audio_capture = None
 
 # ---------------------------------------------------------------------
 # 首頁，指示用
@@ -90,6 +164,41 @@ def chart_value_4():
             time.sleep(2)  # 每 2 秒推送一次
     return Response(generate_value_4(), mimetype="text/event-stream")
 
+# ---------------------------------------------------------------------
+# (5) SSE 路由：音訊特徵 - 每個區塊只推送精簡的特徵（位準、頻帶能量、質心、事件），不傳送原始音訊
+@app.route('/audio_features')
+def audio_features():
+    stream = start_audio_features()
+    if stream is None:
+        return Response("無法開啟音訊設備", status=503)
+
+    def generate_audio_features():
+        records = queue.Queue(maxsize=100)
+
+        def on_record(record):
+            try:
+                records.put_nowait(record)
+            except queue.Full:
+                pass  # 連線跟不上時捨棄，不影響擷取執行緒
+
+        stream.subscribe(on_record)
+        try:
+            while True:
+                try:
+                    record = records.get(timeout=5)
+                except queue.Empty:
+                    # 定期送出註解行，連線中斷時才能結束並取消訂閱
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(record)}\n\n"
+        finally:
+            stream.unsubscribe(on_record)
+
+    response = Response(generate_audio_features(), mimetype="text/event-stream")
+    # 連線結束（包含尚未開始串流就中斷）時一定會呼叫，最後一個連線離開後停止擷取
+    response.call_on_close(lambda: release_audio_features(stream))
+    return response
+
 
 # ---------------------------------------------------------------------
 if __name__ == '__main__':
@@ -1,3 +1,14 @@
 from .audio_recorder import AudioRecorder
-from .signal_processor import process_and_plot, plot_spectrogram
-from .audio_save import save_spectrogram_to_csv
\ No newline at end of file
+from .audio_devices import AudioDeviceRegistry, AudioDeviceInfo
+from .signal_processor import process_and_plot, get_analyzer, plot_spectrogram, render_spectrogram
+from .audio_save import (save_spectrogram_to_csv, save_spectrogram_to_tdms, save_spectrogram,
+                         save_spectrogram_binary, export_filename, EXPORT_PROFILES)
+from .ring_buffer import RingBuffer
+from .spectrogram import IncrementalSpectrogram, spectrogram, psd, to_db
+from .live_plot import LivePlotRenderer
+from .spectrum_analyzer import SpectrumAnalyzer
+from .multichannel import (deinterleave, to_mono, channel_spectra, channel_spectrograms,
+                           coherence, channel_levels_db, level_difference)
+from .features import AudioFeatureExtractor, FeatureStream, band_centers, band_matrix
+from .wav_writer import StreamingWavWriter
+from .tdms_writer import TdmsWriter, SpectrogramTdmsWriter
\ No newline at end of file
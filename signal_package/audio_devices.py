@@ -0,0 +1,131 @@
+import threading
+from dataclasses import dataclass
+
+import pyaudio
+
+
+@dataclass
+class AudioDeviceInfo:
+    index: int
+    name: str
+    max_input_channels: int
+    default_sample_rate: float
+
+    @property
+    def display_name(self):
+        return f"{self.index}: {self.name}"
+
+    def as_dict(self):
+        """與 GUI 原本使用的設備資料格式相同"""
+        return {
+            'index': self.index,
+            'name': self.name,
+            'display_name': self.display_name,
+            'channels': self.max_input_channels,
+            'sample_rate': self.default_sample_rate
+        }
+
+
+class AudioDeviceRegistry:
+    """
+    音訊輸入設備登錄表：整個程式共用一個 PyAudio 實例，設備只列舉一次並快取，
+    格式支援與否以 is_format_supported 查詢（同樣快取），不必實際開啟串流試探。
+    需要偵測新插入的設備時呼叫 refresh()。
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.pa = pyaudio.PyAudio()
+        self._lock = threading.Lock()
+        self._devices = None
+        self._support = {}
+
+    @classmethod
+    def shared(cls):
+        """取得全域共用的登錄表"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def refresh(self):
+        """重新初始化 PortAudio 並重新列舉設備（PortAudio 只在初始化時掃描設備）"""
+        with self._lock:
+            self.pa.terminate()
+            self.pa = pyaudio.PyAudio()
+            self._devices = None
+            self._support.clear()
+        return self.input_devices
+
+    @property
+    def input_devices(self):
+        """所有具有輸入通道的設備（第一次呼叫時列舉）"""
+        with self._lock:
+            if self._devices is None:
+                self._devices = []
+                for i in range(self.pa.get_device_count()):
+                    info = self.pa.get_device_info_by_index(i)
+                    if info['maxInputChannels'] > 0:
+                        self._devices.append(AudioDeviceInfo(
+                            index=i,
+                            name=info['name'],
+                            max_input_channels=int(info['maxInputChannels']),
+                            default_sample_rate=info['defaultSampleRate']
+                        ))
+            return list(self._devices)
+
+    def get(self, index):
+        for device in self.input_devices:
+            if device.index == index:
+                return device
+        raise ValueError(f"找不到音訊輸入設備 {index}")
+
+    def default_input(self):
+        """系統預設的輸入設備；無法取得時回傳第一個輸入設備"""
+        devices = self.input_devices
+        if not devices:
+            raise RuntimeError("找不到任何可用的音訊輸入設備")
+        try:
+            return self.get(self.pa.get_default_input_device_info()['index'])
+        except (IOError, ValueError):
+            return devices[0]
+
+    def supports(self, index, channels, sample_rate):
+        """設備是否支援指定的通道數與取樣率（int16）"""
+        key = (index, channels, sample_rate)
+        with self._lock:
+            if key in self._support:
+                return self._support[key]
+            try:
+                supported = bool(self.pa.is_format_supported(
+                    sample_rate,
+                    input_device=index,
+                    input_channels=channels,
+                    input_format=pyaudio.paInt16
+                ))
+            except ValueError:
+                supported = False
+            self._support[key] = supported
+            return supported
+
+    def pick_channels(self, index, sample_rate, preferred=(1, 2)):
+        """依偏好順序挑選設備支援的通道數；都不支援時回傳 None"""
+        max_channels = self.get(index).max_input_channels
+        for ch in preferred:
+            if ch <= max_channels and self.supports(index, ch, sample_rate):
+                return ch
+        return None
+
+    def open_input(self, index, channels, sample_rate, chunk=1024, stream_callback=None):
+        """直接以指定設備開啟 int16 輸入串流"""
+        return self.pa.open(
+            format=pyaudio.paInt16,
+            channels=channels,
+            rate=sample_rate,
+            input=True,
+            frames_per_buffer=chunk,
+            input_device_index=index,
+            stream_callback=stream_callback
+        )
@@ -5,83 +5,152 @@ import time
 import threading
 import queue
 
+try:
+    from .multichannel import deinterleave
+    from .audio_devices import AudioDeviceRegistry
+except ImportError:  # 直接執行 signal_package/sound_main.py 時以頂層模組匯入
+    from multichannel import deinterleave
+    from audio_devices import AudioDeviceRegistry
+
+
+class CaptureBuffer:
+    """
+    固定大小的 int16 環形緩衝區：由 PyAudio 回呼寫入，消費端取出固定長度、無間隙的區塊。
+    消費端來不及讀取時覆寫最舊的資料並記錄 overrun 次數。
+    """
+    def __init__(self, capacity_frames, channels):
+        self.channels = channels
+        self.capacity = capacity_frames * channels  # 以樣本數計
+        self.data = np.zeros(self.capacity, dtype=np.int16)
+        self.write_pos = 0  # 累計寫入的樣本數
+        self.read_pos = 0   # 累計讀出的樣本數
+        self.overruns = 0
+        self.dropped_samples = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def write(self, samples):
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+        with self.cond:
+            # 區塊超過容量時只保留最後 capacity 個樣本，其位置從被略過的樣本之後算起
+            start = (self.write_pos + n - len(samples)) % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self.data[start:start + first] = samples[:first]
+            self.data[:len(samples) - first] = samples[first:]
+            self.write_pos += n
+
+            overflow = self.write_pos - self.read_pos - self.capacity
+            if overflow > 0:
+                self.overruns += 1
+                self.dropped_samples += overflow
+                self.read_pos += overflow
+            self.cond.notify_all()
+
+    def available(self):
+        with self.cond:
+            return self.write_pos - self.read_pos
+
+    def read(self, n_samples, timeout=None):
+        """等待並取出 n_samples 個樣本；超時或已關閉時回傳 None"""
+        if n_samples > self.capacity:
+            raise ValueError(f"要求的樣本數 {n_samples} 超過緩衝區容量 {self.capacity}")
+        with self.cond:
+            ready = self.cond.wait_for(
+                lambda: self.closed or self.write_pos - self.read_pos >= n_samples, timeout)
+            if not ready or self.write_pos - self.read_pos < n_samples:
+                return None
+            start = self.read_pos % self.capacity
+            first = min(n_samples, self.capacity - start)
+            out = np.empty(n_samples, dtype=np.int16)
+            out[:first] = self.data[start:start + first]
+            out[first:] = self.data[:n_samples - first]
+            self.read_pos += n_samples
+            return out
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
 class AudioRecorder:
-    def __init__(self, sample_rate=22050, channels=None, chunk=1024, verbose=True):
+    def __init__(self, sample_rate=22050, channels=None, chunk=1024, verbose=True, device_index=None, registry=None):
         """
-        初始化音訊錄製器，自動檢測可用的輸入設備和通道數。
+        初始化音訊錄製器。指定 device_index 時直接開啟該設備；
+        未指定時使用系統預設輸入設備，開不起來才依序嘗試其他設備。
+        channels 為 None 時依設備支援情況自動選擇 1 或 2 通道。
+        設備清單與格式支援由共用的 AudioDeviceRegistry 快取，不會每次重新列舉。
         """
         self.sample_rate = sample_rate
         self.chunk = chunk
         self.verbose = verbose
         self.recording_queue = queue.Queue()
         self.stop_recording = threading.Event()
+        self.capture = None
+        self.capture_started = None  # 連續擷取開始時的 time.time()，第一個樣本的大約時間
+        self.input_overflows = 0
+        self.listeners = []
         
         try:
-            self.p = pyaudio.PyAudio()
+            self.registry = registry or AudioDeviceRegistry.shared()
         except Exception as e:
             print(f"PyAudio 初始化錯誤: {e}")
             print("請確認已安裝 PyAudio 並檢查音訊系統")
             sys.exit(1)
+        self.p = self.registry.pa
 
         # 檢查可用的輸入設備
-        input_devices = [
-            i for i in range(self.p.get_device_count())
-            if self.p.get_device_info_by_index(i)['maxInputChannels'] > 0
-        ]
-
+        input_devices = self.registry.input_devices
         if not input_devices:
             print("錯誤：找不到任何可用的音訊輸入設備")
             sys.exit(1)
 
         if self.verbose:
             print("可用音訊設備：")
-            for i in input_devices:
-                dev = self.p.get_device_info_by_index(i)
-                print(f"設備 {i}: {dev['name']} (通道數: {dev['maxInputChannels']})")
-
-        # 自動檢測通道數
-        if channels is None:
-            for device_index in input_devices:
-                dev_info = self.p.get_device_info_by_index(device_index)
-                max_channels = dev_info['maxInputChannels']
-                for ch in [1, 2]:
-                    if ch <= max_channels:
-                        try:
-                            self.stream = self.p.open(
-                                format=pyaudio.paInt16,
-                                channels=ch,
-                                rate=self.sample_rate,
-                                input=True,
-                                frames_per_buffer=self.chunk,
-                                input_device_index=device_index
-                            )
-                            self.channels = ch
-                            self.device_index = device_index
-                            print(f"成功使用設備 {device_index}，通道數：{ch}")
-                            return
-                        except Exception:
-                            continue
+            for dev in input_devices:
+                print(f"設備 {dev.index}: {dev.name} (通道數: {dev.max_input_channels})")
+
+        if device_index is not None:
+            candidates = [self.registry.get(device_index).index]
         else:
-            self.channels = channels
-            self.device_index = input_devices[0]
+            default = self.registry.default_input().index
+            candidates = [default] + [dev.index for dev in input_devices if dev.index != default]
+
+        for index in candidates:
+            if channels is None:
+                ch = self.registry.pick_channels(index, self.sample_rate)
+                if ch is None:
+                    continue
+            else:
+                ch = channels
             try:
-                self.stream = self.p.open(
-                    format=pyaudio.paInt16,
-                    channels=self.channels,
-                    rate=self.sample_rate,
-                    input=True,
-                    frames_per_buffer=self.chunk,
-                    input_device_index=self.device_index
-                )
+                self.stream = self.registry.open_input(index, ch, self.sample_rate, self.chunk)
             except Exception as e:
-                print(f"無法開啟音訊串流: {e}")
-                print("可能是音訊設備被佔用或權限問題")
-                sys.exit(1)
+                if device_index is not None:
+                    print(f"無法開啟音訊設備 {index}: {e}")
+                continue
+            self.channels = ch
+            self.device_index = index
+            print(f"成功使用設備 {index}，通道數：{ch}")
+            return
+
+        print("無法開啟音訊串流")
+        print("可能是音訊設備被佔用或權限問題")
+        sys.exit(1)
 
     def record_audio_with_timeout(self, duration=1, timeout=2):
         """
         帶超時機制的錄音方法
         """
+        if self.capture is not None:
+            audio_data = self.read_block(int(self.sample_rate * duration), timeout=timeout)
+            if audio_data is None:
+                print("錄音數據獲取失敗")
+                return np.zeros(int(self.sample_rate * duration) * self.channels, dtype=np.int16)
+            return audio_data
+
         self.stop_recording.clear()
         num_chunks = int(self.sample_rate / self.chunk * duration)
         
@@ -120,26 +189,86 @@ class AudioRecorder:
             frames = self.recording_queue.get_nowait()
         except queue.Empty:
             print("錄音數據獲取失敗")
-            return np.zeros(int(self.sample_rate * duration), dtype=np.int16)
+            return np.zeros(int(self.sample_rate * duration) * self.channels, dtype=np.int16)
         
         if frames:
             audio_data = b''.join(frames)
             return np.frombuffer(audio_data, dtype=np.int16)
         else:
-            return np.zeros(int(self.sample_rate * duration), dtype=np.int16)
+            return np.zeros(int(self.sample_rate * duration) * self.channels, dtype=np.int16)
 
     def record_audio(self, duration=1):
         """改進的錄音方法"""
         return self.record_audio_with_timeout(duration, timeout=duration + 1)
 
+    def record_frames(self, duration=1):
+        """
+        錄音並回傳 (音框數, 通道數) 的 int16 陣列。
+        record_audio 回傳的是交錯樣本（立體聲為 L R L R ...），多通道時請改用此方法
+        """
+        return deinterleave(self.record_audio(duration), self.channels)
+
+    def start_continuous(self, buffer_seconds=10.0):
+        """
+        改用 PyAudio 回呼模式連續擷取，資料寫入預先配置的環形緩衝區。
+        啟用後 record_audio / record_audio_with_timeout 改由緩衝區取出無間隙的區塊。
+        """
+        if self.capture is not None:
+            return
+        self.capture = CaptureBuffer(int(buffer_seconds * self.sample_rate), self.channels)
+        self.input_overflows = 0
+
+        # 關閉探測用的阻塞式串流，以相同設備與通道數重新開啟回呼串流
+        self.stream.stop_stream()
+        self.stream.close()
+        self.stream = self.registry.open_input(
+            self.device_index, self.channels, self.sample_rate, self.chunk,
+            stream_callback=self._stream_callback
+        )
+        self.capture_started = time.time()
+        self.stream.start_stream()
+
+    def _stream_callback(self, in_data, frame_count, time_info, status):
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        self.capture.write(samples)
+        for listener in self.listeners:
+            listener(samples)
+        return (None, pyaudio.paContinue)
+
+    def add_listener(self, callback):
+        """
+        註冊在 PyAudio 回呼中接收每個原始區塊（交錯的 int16 樣本）的函式，僅在連續擷取模式下呼叫。
+        callback 必須立即返回（例如 StreamingWavWriter.push），不可阻塞擷取執行緒
+        """
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def read_block(self, frames, timeout=None):
+        """連續擷取模式下取出剛好 frames 個音框（交錯的 int16 樣本）；超時回傳 None"""
+        if self.capture is None:
+            raise RuntimeError("尚未啟用連續擷取模式，請先呼叫 start_continuous()")
+        return self.capture.read(frames * self.channels, timeout)
+
+    @property
+    def overruns(self):
+        """緩衝區覆寫次數加上 PortAudio 回報的輸入溢位次數"""
+        if self.capture is None:
+            return 0
+        return self.capture.overruns + self.input_overflows
+
     def close(self):
-        """關閉音訊串流並終止 pyaudio。"""
+        """關閉音訊串流。PyAudio 實例由 AudioDeviceRegistry 共用，不在此終止"""
         try:
             self.stop_recording.set()
+            if self.capture is not None:
+                self.capture.close()
             if hasattr(self, 'stream'):
                 self.stream.stop_stream()
                 self.stream.close()
-            if hasattr(self, 'p'):
-                self.p.terminate()
         except Exception as e:
             print(f"關閉音訊串流時發生錯誤: {e}")
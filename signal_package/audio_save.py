@@ -1,14 +1,193 @@
 import numpy as np
 import datetime
+import gzip
+import io
+import json
 import os
 import traceback
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from .tdms_writer import SpectrogramTdmsWriter
+except ImportError:  # 直接執行 signal_package/sound_main.py 時以頂層模組匯入
+    from tdms_writer import SpectrogramTdmsWriter
+
+
+# 匯出設定：csv 為完整欄位（DB-like、Power、SNR），raw 只寫 DB-like 欄（Power、SNR 於讀取時重新計算），
+# float32／int16 為二進位 .npz（int16 以每個頻率的 scale/offset 量化）
+EXPORT_PROFILES = ('csv', 'raw', 'float32', 'int16')
+COMPRESSIONS = (None, 'gzip', 'zstd')
+_COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def compression_from_filename(filename):
+    """依副檔名判斷壓縮方式：.gz 為 gzip、.zst 為 zstd，其餘不壓縮"""
+    return _COMPRESSION_SUFFIXES.get(os.path.splitext(filename)[1])
+
+
+def base_filename(filename):
+    """去除壓縮副檔名與資料副檔名，例如 'a/spec.csv.gz' -> 'a/spec'（用於元數據等附屬檔名）"""
+    if compression_from_filename(filename):
+        filename = os.path.splitext(filename)[0]
+    return os.path.splitext(filename)[0]
+
+
+def export_filename(stem, profile='csv', compression=None):
+    """依匯出設定產生檔名，例如 ('spec', 'int16', 'zstd') -> 'spec.npz.zst'"""
+    binary = profile in ('float32', 'int16')
+    filename = stem + ('.npz' if binary else '.csv')
+    if compression == 'zstd':
+        filename += '.zst'
+    elif compression == 'gzip' and not binary:
+        # 二進位的 gzip 使用 .npz 內建的 deflate，副檔名不變
+        filename += '.gz'
+    return filename
+
+
+def open_output(filename, compression=None, text=True):
+    """開啟輸出檔，compression 為 'gzip' 或 'zstd' 時以串流方式邊寫邊壓縮"""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"不支援的壓縮方式: {compression}")
+    if compression == 'gzip':
+        return gzip.open(filename, 'wt' if text else 'wb', compresslevel=6, newline='' if text else None)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstd 壓縮需要 zstandard 套件，請先安裝：pip install zstandard")
+        stream = zstandard.ZstdCompressor(level=3).stream_writer(open(filename, 'wb'))
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='') if text else stream
+    return open(filename, 'w' if text else 'wb', newline='' if text else None)
+
+
+def quantize_int16(spec):
+    """
+    每個頻率以各自的 scale/offset 將 (頻率, 時間) 矩陣量化為 int16：
+    spec ≈ q * scale[:, None] + offset[:, None]，最大誤差為 scale / 2
+    """
+    spec = np.asarray(spec, dtype=np.float64)
+    if spec.shape[1] == 0:
+        return np.zeros(spec.shape, dtype=np.int16), np.ones(spec.shape[0]), np.zeros(spec.shape[0])
+    lo = spec.min(axis=1)
+    span = spec.max(axis=1) - lo
+    scale = np.where(span > 0, span / 65535.0, 1.0)
+    q = np.round((spec - lo[:, None]) / scale[:, None]) - 32768
+    return q.astype(np.int16), scale, lo + 32768 * scale
+
+
+def interp_weights(x_new, x):
+    """
+    計算線性內插的索引與權重，結果與 np.interp(x_new, x, y) 相同（超出範圍時取端點值）。
+    回傳 (left, w)：y_new = y[..., left] * (1 - w) + y[..., left + 1] * w
+    """
+    x = np.asarray(x, dtype=np.float64)
+    x_new = np.asarray(x_new, dtype=np.float64)
+    left = np.clip(np.searchsorted(x, x_new, side='right') - 1, 0, len(x) - 2)
+    x0, x1 = x[left], x[left + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = np.where(x1 > x0, (x_new - x0) / (x1 - x0), 0.0)
+    return left, np.clip(w, 0.0, 1.0)
+
+
+def resample_time_axis(spec, bins, new_bins):
+    """將 (頻率, 時間) 的頻譜圖一次內插到新的時間軸（整個矩陣共用同一組索引與權重）"""
+    left, w = interp_weights(new_bins, bins)
+    return spec[:, left] * (1.0 - w) + spec[:, left + 1] * w
+
+
+def resample_to_interval(spec, bins, time_interval=0.05):
+    """
+    將 (頻率, 時間) 的頻譜圖內插為固定 time_interval 秒間隔，回傳 (spec, bins)。
+    時間軸已是該間隔的均勻時間軸或只有一個時間點時原樣回傳
+    """
+    bins = np.asarray(bins, dtype=np.float64)
+    if len(bins) < 2:
+        return spec, bins
+
+    original_intervals = np.diff(bins)
+    current_interval_mean = np.mean(original_intervals)
+    needs_interpolation = len(np.unique(np.round(original_intervals, 6))) > 1 or \
+                        abs(current_interval_mean - time_interval) > 1e-6
+    if not needs_interpolation:
+        print(f"原始時間軸已為均勻 {time_interval}s 間隔，無需插值。")
+        return spec, bins
+
+    print(f"原始時間軸平均間隔 {current_interval_mean:.6f}s 或非均勻，將插值為 {time_interval}s 間隔。")
+    total_time_span = bins[-1] - bins[0]
+    if total_time_span < 0:
+        raise ValueError("時間軸範圍無效 (結束時間早於開始時間)。")
+
+    num_new_points = max(int(round(total_time_span / time_interval)) + 1, 1)
+    new_bins = np.linspace(bins[0], bins[0] + time_interval * (num_new_points - 1), num_new_points)
+    print(f"時間軸已插值，新時間點數量: {num_new_points}。")
+    return resample_time_axis(spec, bins, new_bins), new_bins
+
+
+def snr_per_frequency(data):
+    """每個頻率的 SNR（dB）：20·log10(最大絕對值 / 平均絕對值)，平均值過小時為 0"""
+    magnitude = np.abs(data)
+    signal_max = magnitude.max(axis=1)
+    noise_level = magnitude.mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(noise_level > 1e-9, 20 * np.log10(signal_max / noise_level), 0.0)
+
+
+def interleave_columns(times, *blocks):
+    """
+    將時間欄與多個 (頻率, 時間) 矩陣交錯成 CSV 欄位順序：
+    Time, f0_a, f0_b, ..., f1_a, f1_b, ...，回傳形狀 (時間, 1 + 頻率 × 區塊數)
+    """
+    n_times = len(times)
+    stacked = np.stack([np.asarray(b, dtype=np.float64).T for b in blocks], axis=2)
+    return np.hstack([np.asarray(times, dtype=np.float64)[:, None], stacked.reshape(n_times, -1)])
+
+
+class ChunkedCsvWriter:
+    """
+    分塊寫入的 CSV：每次寫入一個 (列數, 欄數) 區塊，整個區塊以單一字串格式化運算轉成文字，
+    不必先組出完整矩陣，記憶體用量只與區塊大小有關。輸出格式與 np.savetxt(fmt=fmt) 相同；
+    compression 為 'gzip' 或 'zstd' 時邊寫邊壓縮
+    """
+
+    def __init__(self, filename, header=None, fmt="%.6f", delimiter=",", compression=None):
+        self.fmt = fmt
+        self.delimiter = delimiter
+        self.rows_written = 0
+        self._row_fmt = None
+        self._file = open_output(filename, compression)
+        if header:
+            self._file.write(header + "\n")
+
+    def write_block(self, block):
+        block = np.atleast_2d(np.asarray(block, dtype=np.float64))
+        if block.size == 0:
+            return
+        if self._row_fmt is None:
+            self._row_fmt = self.delimiter.join([self.fmt] * block.shape[1]) + "\n"
+        self._file.write((self._row_fmt * block.shape[0]) % tuple(block.ravel().tolist()))
+        self.rows_written += block.shape[0]
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
 def save_spectrogram_to_csv(spec, freqs, bins, sample_rate, NFFT, noverlap,
                             experiment_id=None, filename='spectrogram_data.csv',
-                            save_power=True, save_snr=True):
+                            save_power=True, save_snr=True, block_rows=2048, compression=None):
     """
     將 spectrogram 相關數據 (dB-like, Power, SNR) 合併儲存到單一 CSV 檔案中。
     數據點將以固定的0.05秒間隔進行插值。
+    以每 block_rows 個時間點為一塊逐塊寫出，不會一次建立完整的合併矩陣。
+    compression 未指定時依檔名判斷（.csv.gz 為 gzip、.csv.zst 為 zstd）。
+    錯誤只印出不拋出，成功時回傳 True、失敗時回傳 False。
     """
     
     if os.path.exists(filename):
@@ -37,68 +216,22 @@ def save_spectrogram_to_csv(spec, freqs, bins, sample_rate, NFFT, noverlap,
 
         if n_times_orig == 0:
             print("警告：頻譜數據中沒有時間點，無法儲存 CSV。")
-            return
-        elif n_times_orig == 1:
-            interpolated_spec = spec
-            interpolated_bins = bins
-            n_times_interpolated = 1
-        else:
-            original_intervals = np.diff(bins)
-            current_interval_mean = np.mean(original_intervals) if len(original_intervals) > 0 else time_interval
-            needs_interpolation = len(np.unique(np.round(original_intervals, 6))) > 1 or \
-                                abs(current_interval_mean - time_interval) > 1e-6
-
-            if needs_interpolation:
-                print(f"原始時間軸平均間隔 {current_interval_mean:.6f}s 或非均勻，將插值為 {time_interval}s 間隔。")
-                total_time_span = bins[-1] - bins[0]
-                if total_time_span < 0:
-                    raise ValueError("時間軸範圍無效 (結束時間早於開始時間)。")
-                
-                num_new_points = int(round(total_time_span / time_interval)) + 1
-                if num_new_points <= 0:
-                    num_new_points = 1
-                
-                interpolated_bins = np.linspace(bins[0], bins[0] + time_interval * (num_new_points - 1), num_new_points)
-                interpolated_spec = np.zeros((n_freqs, len(interpolated_bins)))
-                
-                for i in range(n_freqs):
-                    interpolated_spec[i, :] = np.interp(interpolated_bins, bins, spec[i, :])
-                
-                n_times_interpolated = len(interpolated_bins)
-                print(f"時間軸已插值，新時間點數量: {n_times_interpolated}。")
-            else:
-                print(f"原始時間軸已為均勻 {time_interval}s 間隔，無需插值。")
-                interpolated_spec = spec
-                interpolated_bins = bins
-                n_times_interpolated = n_times_orig
+            return False
+        interpolated_spec, interpolated_bins = resample_to_interval(spec, bins, time_interval)
+        n_times_interpolated = len(interpolated_bins)
 
         if n_times_interpolated == 0:
             print("錯誤：插值後沒有時間點，無法儲存。")
-            return
+            return False
 
         # --- 計算三種信號 ---
         db_like_data = interpolated_spec
 
-        # 條件性計算功率和SNR數據
-        power_data = None
-        if save_power:
-            power_data = np.power(db_like_data, 2)
-
+        # SNR 需要整段時間的統計，先計算；功率在寫入時逐塊計算
         snr_data = None
         if save_snr:
-            snr_data = np.zeros_like(db_like_data)
-            for i in range(n_freqs):
-                signal_at_freq = db_like_data[i, :]
-                if n_times_interpolated > 0:
-                    signal_max = np.max(np.abs(signal_at_freq))
-                    noise_level = np.mean(np.abs(signal_at_freq))
-                    if noise_level > 1e-9:
-                        snr_val = 20 * np.log10(signal_max / noise_level)
-                        snr_data[i, :] = snr_val
-                    else:
-                        snr_data[i, :] = 0
-                else:
-                    snr_data[i, :] = 0
+            # 每個頻率一個 SNR 值，沿時間軸廣播（不複製）
+            snr_data = np.broadcast_to(snr_per_frequency(db_like_data)[:, None], db_like_data.shape)
 
         # --- 準備 CSV 表頭和數據 ---
         header_parts = ["Time(s)"]
@@ -111,32 +244,21 @@ def save_spectrogram_to_csv(spec, freqs, bins, sample_rate, NFFT, noverlap,
 
         full_header = ",".join(header_parts)
 
-        # 計算列數
-        cols_per_freq = 1 + (1 if save_power else 0) + (1 if save_snr else 0)
-        n_cols = 1 + n_freqs * cols_per_freq
-        merged_csv_data = np.zeros((n_times_interpolated, n_cols))
-        merged_csv_data[:, 0] = interpolated_bins
-
-        for i in range(n_freqs):
-            col_idx = 1 + i * cols_per_freq
-            
-            # DB-like 數據
-            merged_csv_data[:, col_idx] = db_like_data[i, :]
-            
-            # 功率數據（如果啟用）
-            if save_power:
-                merged_csv_data[:, col_idx + 1] = power_data[i, :]
-            
-            # SNR數據（如果啟用）
-            if save_snr:
-                snr_col_idx = col_idx + 1 + (1 if save_power else 0)
-                merged_csv_data[:, snr_col_idx] = snr_data[i, :]
-
-        # 保存為 CSV
-        np.savetxt(filename, merged_csv_data, delimiter=",", header=full_header, comments="", fmt="%.6f")
+        # 依 Time, 每個頻率的 (DB-like, Power, SNR) 順序交錯欄位，逐塊寫入
+        compression = compression or compression_from_filename(filename)
+        with ChunkedCsvWriter(filename, header=full_header, fmt="%.6f", compression=compression) as writer:
+            for start in range(0, n_times_interpolated, block_rows):
+                stop = min(start + block_rows, n_times_interpolated)
+                db_block = db_like_data[:, start:stop]
+                blocks = [db_block]
+                if save_power:
+                    blocks.append(np.power(db_block, 2))
+                if save_snr:
+                    blocks.append(snr_data[:, start:stop])
+                writer.write_block(interleave_columns(interpolated_bins[start:stop], *blocks))
 
         # --- 創建元數據檔案 ---
-        metadata_filename = os.path.splitext(filename)[0] + '_metadata.txt'
+        metadata_filename = base_filename(filename) + '_metadata.txt'
         with open(metadata_filename, 'w') as f:
             f.write(f"Experiment ID: {experiment_id}\n")
             f.write(f"Timestamp: {timestamp}\n")
@@ -163,7 +285,132 @@ def save_spectrogram_to_csv(spec, freqs, bins, sample_rate, NFFT, noverlap,
         
         print(success_msg)
         print(f"元數據已儲存到 {metadata_filename}")
+        return True
 
     except Exception as e:
         print(f"保存合併的 CSV 文件時出錯: {str(e)}")
         traceback.print_exc()
+        return False
+
+
+def save_spectrogram_to_tdms(spec, freqs, bins, sample_rate, NFFT, noverlap,
+                             experiment_id=None, filename='spectrogram_data.tdms',
+                             save_power=True, save_snr=True, block_cols=2048):
+    """
+    將頻譜圖 (DB-like, Power, SNR) 以 float32 儲存為 TDMS 檔，每 block_cols 個時間點寫成一個 segment。
+    時間軸維持原始的 bins，不做插值。長時間量測中逐段寫入請直接使用 SpectrogramTdmsWriter。
+    成功時回傳 True、失敗時回傳 False
+    """
+    try:
+        spec = np.asarray(spec, dtype=np.float64)
+        if len(spec.shape) != 2:
+            raise ValueError(f"頻譜圖數據應為二維數組，但得到的形狀為: {spec.shape}")
+        if len(freqs) != spec.shape[0]:
+            raise ValueError(f"頻率軸長度 ({len(freqs)}) 與頻譜圖行數 ({spec.shape[0]}) 不匹配")
+        if len(bins) != spec.shape[1]:
+            raise ValueError(f"時間軸長度 ({len(bins)}) 與頻譜圖列數 ({spec.shape[1]}) 不匹配")
+        if spec.shape[1] == 0:
+            print("警告：頻譜數據中沒有時間點，無法儲存 TDMS。")
+            return False
+
+        snr = snr_per_frequency(spec) if save_snr else None
+        writer = SpectrogramTdmsWriter(filename, freqs, sample_rate, NFFT, noverlap,
+                                       experiment_id=experiment_id,
+                                       save_power=save_power, save_snr=save_snr)
+        try:
+            for start in range(0, spec.shape[1], block_cols):
+                stop = start + block_cols
+                writer.append(spec[:, start:stop], bins[start:stop], snr=snr)
+        finally:
+            writer.close()
+
+        print(f"成功將頻譜數據儲存到 {filename}（{writer.columns_written} 個時間點）")
+        return True
+
+    except Exception as e:
+        print(f"保存 TDMS 文件時出錯: {str(e)}")
+        traceback.print_exc()
+        return False
+
+
+def save_spectrogram_binary(spec, freqs, bins, sample_rate, NFFT, noverlap,
+                            experiment_id=None, filename='spectrogram_data.npz',
+                            dtype='float32', compression=None, time_interval=0.05):
+    """
+    以二進位 .npz 儲存頻譜圖：dtype='float32' 直接存 float32；dtype='int16' 以每個頻率的 scale/offset 量化。
+    時間軸與 CSV 相同先內插為 time_interval 秒間隔（None 時維持原始的 bins），各匯出設定的時間基準與 SNR 一致。
+    Power、SNR 不儲存，由 experiment_reader.read_spectrogram() 讀取時重新計算。
+    compression='gzip' 使用 zip deflate（np.savez_compressed），'zstd' 將整個 .npz 以 zstd 串流壓縮（檔名 .npz.zst）。
+    成功時回傳 True、失敗時回傳 False
+    """
+    try:
+        spec = np.asarray(spec, dtype=np.float64)
+        if len(spec.shape) != 2:
+            raise ValueError(f"頻譜圖數據應為二維數組，但得到的形狀為: {spec.shape}")
+        if len(freqs) != spec.shape[0] or len(bins) != spec.shape[1]:
+            raise ValueError(f"頻譜圖形狀 {spec.shape} 與頻率軸 ({len(freqs)})、時間軸 ({len(bins)}) 不匹配")
+        if dtype not in ('float32', 'int16'):
+            raise ValueError(f"不支援的資料型別: {dtype}")
+        compression = compression or compression_from_filename(filename)
+        if time_interval is not None and spec.shape[1] > 0:
+            spec, bins = resample_to_interval(spec, bins, time_interval)
+
+        metadata = {
+            'experiment_id': experiment_id or f"EXP_NPZ_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'timestamp': datetime.datetime.now().isoformat(),
+            'sample_rate': sample_rate, 'NFFT': int(NFFT), 'noverlap': int(noverlap), 'dtype': dtype,
+            'time_interval': time_interval
+        }
+        arrays = {'freqs': np.asarray(freqs, dtype=np.float64), 'bins': np.asarray(bins, dtype=np.float64),
+                  'metadata': np.array(json.dumps(metadata))}
+        if dtype == 'int16':
+            arrays['spec'], arrays['scale'], arrays['offset'] = quantize_int16(spec)
+        else:
+            arrays['spec'] = spec.astype(np.float32)
+
+        if compression == 'zstd':
+            # zipfile 需要正確的檔案位置，先在記憶體中組成 .npz 再整個壓縮
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+            with open_output(filename, 'zstd', text=False) as f:
+                f.write(buffer.getbuffer())
+        else:
+            # 傳入檔案物件，避免 numpy 自動補上 .npz 副檔名
+            with open(filename, 'wb') as f:
+                (np.savez_compressed if compression == 'gzip' else np.savez)(f, **arrays)
+
+        print(f"成功將頻譜數據 ({dtype}) 儲存到 {filename}")
+        return True
+
+    except Exception as e:
+        print(f"保存二進位頻譜文件時出錯: {str(e)}")
+        traceback.print_exc()
+        return False
+
+
+def save_spectrogram(spec, freqs, bins, sample_rate, NFFT, noverlap, experiment_id=None,
+                     filename=None, profile='csv', compression=None, time_interval=0.05):
+    """
+    依匯出設定 (EXPORT_PROFILES) 儲存頻譜圖，回傳實際的檔名：
+    'csv' 與原本的 save_spectrogram_to_csv 相同，'raw' 只寫 DB-like 欄，
+    'float32'／'int16' 寫成二進位 .npz。compression 可為 None、'gzip' 或 'zstd'。
+    time_interval 為二進位設定內插的時間間隔（CSV 固定為 0.05 秒），None 時保留原始時間軸。
+    儲存失敗時拋出 RuntimeError，背景匯出佇列才會記錄為失敗
+    """
+    if profile not in EXPORT_PROFILES:
+        raise ValueError(f"不支援的匯出設定: {profile}（可用: {', '.join(EXPORT_PROFILES)}）")
+    if filename is None:
+        filename = export_filename('spectrogram_data', profile, compression)
+
+    if profile in ('float32', 'int16'):
+        saved = save_spectrogram_binary(spec, freqs, bins, sample_rate, NFFT, noverlap,
+                                experiment_id=experiment_id, filename=filename,
+                                dtype=profile, compression=compression, time_interval=time_interval)
+    else:
+        full = profile == 'csv'
+        saved = save_spectrogram_to_csv(spec, freqs, bins, sample_rate, NFFT, noverlap,
+                                        experiment_id=experiment_id, filename=filename,
+                                        save_power=full, save_snr=full, compression=compression)
+    if not saved:
+        raise RuntimeError(f"頻譜圖未能儲存到 {filename}")
+    return filename
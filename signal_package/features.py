@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+def band_centers(fraction=1, fmin=20.0, fmax=20000.0):
+    """
+    1/fraction 倍頻程的中心頻率（以 1 kHz 為基準，底數 2）。
+    fraction=1 為倍頻程，fraction=3 為 1/3 倍頻程
+    """
+    k_min = int(np.ceil(fraction * np.log2(fmin / 1000.0)))
+    k_max = int(np.floor(fraction * np.log2(fmax / 1000.0)))
+    return 1000.0 * 2.0 ** (np.arange(k_min, k_max + 1) / fraction)
+
+
+def band_matrix(freqs, centers, fraction=1):
+    """
+    建立形狀 (頻率點數, 頻帶數) 的濾波器組矩陣：頻率點落在頻帶 [fc·2^(-1/2b), fc·2^(1/2b)) 內為 1。
+    power @ matrix 即為各頻帶能量
+    """
+    freqs = np.asarray(freqs)
+    edges = 2.0 ** (0.5 / fraction)
+    lower = np.asarray(centers) / edges
+    upper = np.asarray(centers) * edges
+    return ((freqs[:, None] >= lower) & (freqs[:, None] < upper)).astype(np.float64)
+
+
+class AudioFeatureExtractor:
+    """
+    逐區塊的音訊特徵：RMS／峰值位準（dBFS）、倍頻程與 1/3 倍頻程頻帶能量、頻譜質心與平坦度，
+    以及以門檻（含遲滯）判斷的事件。窗函數、頻率軸與濾波器組矩陣只在建立時計算一次，
+    compute() 可一次處理 (區塊數, 區塊長度) 的批次資料
+    """
+
+    def __init__(self, block_size, sample_rate, full_scale=32768.0,
+                 event_threshold_db=-30.0, event_hysteresis_db=3.0):
+        self.block_size = int(block_size)
+        self.sample_rate = sample_rate
+        self.full_scale = full_scale
+        self.window = np.hanning(self.block_size)
+        self.freqs = np.fft.rfftfreq(self.block_size, d=1 / sample_rate)
+
+        nyquist = sample_rate / 2
+        self.octave_centers = band_centers(1, fmax=nyquist / 2 ** 0.5)
+        self.third_octave_centers = band_centers(3, fmax=nyquist / 2 ** (1 / 6))
+        self.octave_matrix = band_matrix(self.freqs, self.octave_centers, 1)
+        self.third_octave_matrix = band_matrix(self.freqs, self.third_octave_centers, 3)
+
+        self.event_threshold_db = event_threshold_db
+        self.event_hysteresis_db = event_hysteresis_db
+        self.event_active = False
+        self._event = None
+
+    def compute(self, blocks):
+        """
+        計算一批區塊的特徵，blocks 形狀為 (區塊數, 區塊長度)（單一區塊亦可）。
+        回傳 dict，每個值的第一維為區塊數
+        """
+        x = np.atleast_2d(np.asarray(blocks, dtype=np.float64)) / self.full_scale
+        if x.shape[1] != self.block_size:
+            raise ValueError(f"區塊長度 {x.shape[1]} 與設定的 {self.block_size} 不符")
+
+        rms = np.sqrt(np.mean(x ** 2, axis=1))
+        peak = np.max(np.abs(x), axis=1)
+
+        spectrum = np.fft.rfft(x * self.window, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        total = power.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centroid = np.where(total > 0, power @ self.freqs / total, 0.0)
+            # 平坦度：幾何平均 / 算術平均（忽略 DC）
+            p = np.maximum(power[:, 1:], 1e-20)
+            flatness = np.exp(np.mean(np.log(p), axis=1)) / np.mean(p, axis=1)
+
+        return {
+            'rms_db': 20 * np.log10(np.maximum(rms, 1e-10)),
+            'peak_db': 20 * np.log10(np.maximum(peak, 1e-10)),
+            'centroid_hz': centroid,
+            'flatness': flatness,
+            'octave_db': 10 * np.log10(np.maximum(power @ self.octave_matrix, 1e-20)),
+            'third_octave_db': 10 * np.log10(np.maximum(power @ self.third_octave_matrix, 1e-20)),
+        }
+
+    def _update_event(self, level_db, timestamp):
+        """門檻判斷：高於門檻開始事件，低於（門檻 - 遲滯）結束；結束時回傳事件資訊"""
+        if not self.event_active:
+            if level_db >= self.event_threshold_db:
+                self.event_active = True
+                self._event = {'start': timestamp, 'peak_db': level_db}
+            return None
+
+        self._event['peak_db'] = max(self._event['peak_db'], level_db)
+        if level_db < self.event_threshold_db - self.event_hysteresis_db:
+            self.event_active = False
+            event, self._event = self._event, None
+            event['end'] = timestamp
+            event['duration'] = timestamp - event['start']
+            return event
+        return None
+
+    def process(self, block, timestamp=None):
+        """串流處理單一區塊，回傳可直接序列化（JSON/MongoDB）的特徵紀錄"""
+        timestamp = time.time() if timestamp is None else timestamp
+        features = self.compute(block)
+        record = {name: values[0].tolist() for name, values in features.items()}
+        record['timestamp'] = timestamp
+        record['event'] = self._update_event(record['rms_db'], timestamp)
+        record['event_active'] = self.event_active
+        return record
+
+
+class FeatureStream:
+    """
+    以區塊速率發布特徵紀錄：保留最新一筆與有限長度的歷史，
+    並同步呼叫訂閱者（例如寫入資料庫、推送到網頁）
+    """
+
+    def __init__(self, history=600):
+        self._history = deque(maxlen=history)
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, record):
+        with self._lock:
+            self._history.append(record)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(record)
+            except Exception as e:
+                print(f"特徵訂閱者處理失敗: {e}")
+
+    @property
+    def latest(self):
+        with self._lock:
+            return self._history[-1] if self._history else None
+
+    def history(self, n=None):
+        with self._lock:
+            records = list(self._history)
+        return records if n is None else records[-n:]
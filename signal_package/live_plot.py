@@ -0,0 +1,127 @@
+import numpy as np
+
+try:
+    from .spectrogram import to_db
+except ImportError:  # 直接執行 signal_package/sound_main.py 時以頂層模組匯入
+    from spectrogram import to_db
+
+
+class LivePlotRenderer:
+    """
+    即時音訊圖形的 blitting 繪製器：波形線、頻譜線與頻譜圖影像只建立一次，
+    之後每次更新只以 set_data 替換資料，並只重繪這三個 artist。
+    座標軸、標題、刻度等靜態部分存成背景，只有在座標範圍改變或視窗縮放時才完整重繪。
+    """
+
+    def __init__(self, fig, ax_waveform, ax_spectrum, ax_spectrogram, sample_rate,
+                 history_duration=100, amplitude=32768, db_range=(0, 160)):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.ax_waveform = ax_waveform
+        self.ax_spectrum = ax_spectrum
+        self.ax_spectrogram = ax_spectrogram
+        self.sample_rate = sample_rate
+        self.history_duration = history_duration
+        self.amplitude = amplitude
+        self.db_range = db_range
+
+        self.background = None
+        self._needs_full_draw = True
+        self._setup_axes()
+        # 視窗縮放或其他原因造成完整重繪後，需重新擷取背景
+        self._cid = self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _setup_axes(self):
+        for ax in (self.ax_waveform, self.ax_spectrum, self.ax_spectrogram):
+            ax.clear()
+
+        self.ax_waveform.set_title('Real-Time Waveform')
+        self.ax_waveform.set_xlabel('Time (s)')
+        self.ax_waveform.set_ylabel('Amplitude')
+        self.ax_waveform.set_ylim(-self.amplitude, self.amplitude)
+        (self.waveform_line,) = self.ax_waveform.plot([], [], color='blue', animated=True)
+
+        self.ax_spectrum.set_title('Real-Time Frequency Spectrum')
+        self.ax_spectrum.set_xlabel('Frequency (Hz)')
+        self.ax_spectrum.set_ylabel('Magnitude (dB)')
+        self.ax_spectrum.set_xlim(0, self.sample_rate / 2)
+        self.ax_spectrum.set_ylim(*self.db_range)
+        (self.spectrum_line,) = self.ax_spectrum.plot([], [], color='red', animated=True)
+
+        self.ax_spectrogram.set_title('Spectrogram')
+        self.ax_spectrogram.set_xlabel('Time (s)')
+        self.ax_spectrogram.set_ylabel('Frequency (Hz)')
+        self.spectrogram_image = self.ax_spectrogram.imshow(
+            np.zeros((2, 2)), origin='lower', aspect='auto', cmap='jet',
+            interpolation='bilinear', animated=True,
+            extent=(0, self.history_duration, 0, self.sample_rate / 2)
+        )
+        self.ax_spectrogram.set_xlim(0, self.history_duration)
+        self.ax_spectrogram.set_ylim(0, self.sample_rate / 2)
+
+        self.artists = (self.waveform_line, self.spectrum_line, self.spectrogram_image)
+        self._needs_full_draw = True
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        self.ax_waveform.draw_artist(self.waveform_line)
+        self.ax_spectrum.draw_artist(self.spectrum_line)
+        self.ax_spectrogram.draw_artist(self.spectrogram_image)
+
+    def update(self, signal, freqs=None, magnitudes_db=None, spectrogram=None):
+        """
+        更新圖形。signal 為最新的音訊區塊；freqs/magnitudes_db 為頻譜；
+        spectrogram 為 (spec, freqs, bins)（例如 IncrementalSpectrogram.current()），皆可省略
+        """
+        signal = np.asarray(signal)
+        if len(signal):
+            duration = len(signal) / self.sample_rate
+            self.waveform_line.set_data(np.arange(len(signal)) / self.sample_rate, signal)
+            if self.ax_waveform.get_xlim() != (0, duration):
+                self.ax_waveform.set_xlim(0, duration)
+                self._needs_full_draw = True
+
+        if freqs is not None and magnitudes_db is not None and len(freqs):
+            self.spectrum_line.set_data(freqs, magnitudes_db)
+            low, high = self.ax_spectrum.get_ylim()
+            peak = np.max(magnitudes_db)
+            if peak > high:
+                self.ax_spectrum.set_ylim(low, peak + 10)
+                self._needs_full_draw = True
+
+        if spectrogram is not None:
+            spec, spec_freqs, bins = spectrogram
+            if spec.size:
+                Z = to_db(spec)
+                half_step = (bins[1] - bins[0]) / 2 if len(bins) > 1 else 0
+                self.spectrogram_image.set_data(Z)
+                self.spectrogram_image.set_extent(
+                    (bins[0] - half_step, bins[-1] + half_step, spec_freqs[0], spec_freqs[-1]))
+                self.spectrogram_image.set_clim(Z.min(), Z.max())
+
+        self.refresh()
+
+    def refresh(self):
+        """只重繪動態 artist；背景不存在或座標範圍改變時才完整重繪"""
+        if not getattr(self.canvas, 'supports_blit', True):
+            self.canvas.draw_idle()
+            return
+        if self._needs_full_draw or self.background is None:
+            self._needs_full_draw = False
+            # 完整重繪會觸發 draw_event，於 _on_draw 擷取背景並畫上 artist
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_artists()
+        self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+
+    def close(self):
+        """停止使用 blitting，恢復成一般的 artist，方便之後以 canvas.draw() 繪製最終結果"""
+        self.canvas.mpl_disconnect(self._cid)
+        for artist in self.artists:
+            artist.set_animated(False)
+        self.background = None
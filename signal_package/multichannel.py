@@ -0,0 +1,100 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from .spectrogram import _psd_frames, to_db
+except ImportError:  # 直接執行 signal_package/sound_main.py 時以頂層模組匯入
+    from spectrogram import _psd_frames, to_db
+
+
+def deinterleave(samples, channels):
+    """
+    將交錯的樣本（L R L R ...）轉成 (音框數, 通道數) 陣列。
+    以 reshape 取得視圖，不複製資料；不足一個音框的尾端樣本會被捨棄
+    """
+    samples = np.asarray(samples)
+    n_frames = len(samples) // channels
+    return samples[:n_frames * channels].reshape(n_frames, channels)
+
+
+def to_mono(frames):
+    """(音框數, 通道數) 轉單聲道；單通道時直接回傳該欄的視圖，多通道時取平均並保持原 dtype"""
+    frames = np.asarray(frames)
+    if frames.ndim == 1:
+        return frames
+    if frames.shape[1] == 1:
+        return frames[:, 0]
+    mono = frames.mean(axis=1)
+    if np.issubdtype(frames.dtype, np.integer):
+        mono = np.round(mono).astype(frames.dtype)
+    return mono
+
+
+def _channel_frames(frames, NFFT, noverlap):
+    """(音框數, 通道數) → (通道數, 分析音框數, NFFT) 的重疊音框視圖"""
+    if not 0 <= noverlap < NFFT:
+        raise ValueError("noverlap 必須介於 0 與 NFFT 之間")
+    x = np.asarray(frames, dtype=np.float64).T
+    if x.shape[1] < NFFT:
+        return np.zeros((x.shape[0], 0, NFFT))
+    return sliding_window_view(x, NFFT, axis=-1)[:, ::NFFT - noverlap]
+
+
+def channel_spectra(frames, sample_rate, window='hanning'):
+    """
+    一次計算所有通道的幅度頻譜（dB），回傳 (freqs, magnitudes_db)，
+    magnitudes_db 形狀為 (頻率點數, 通道數)
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    if window is not None:
+        w = np.hanning(len(frames)) if window == 'hanning' else np.asarray(window)
+        frames = frames * w[:, None]
+    spectrum = np.fft.rfft(frames, axis=0)
+    freqs = np.fft.rfftfreq(len(frames), d=1 / sample_rate)
+    return freqs, to_db(spectrum.real ** 2 + spectrum.imag ** 2)
+
+
+def channel_spectrograms(frames, sample_rate, NFFT=256, noverlap=128):
+    """
+    所有通道的頻譜圖，回傳 (spec, freqs, bins)，spec 形狀為 (通道數, 頻率點數, 時間點數)；
+    每個通道的數值與 spectrogram() 對該通道單獨計算的結果相同
+    """
+    window = np.hanning(NFFT)
+    segments = _channel_frames(frames, NFFT, noverlap)
+    freqs = np.fft.rfftfreq(NFFT, d=1 / sample_rate)
+    bins = (np.arange(segments.shape[1]) * (NFFT - noverlap) + NFFT / 2) / sample_rate
+    if segments.shape[1] == 0:
+        return np.zeros((segments.shape[0], len(freqs), 0)), freqs, bins
+    return _psd_frames(segments, window, sample_rate).transpose(0, 2, 1), freqs, bins
+
+
+def coherence(frames, sample_rate, NFFT=256, noverlap=128, pair=(0, 1)):
+    """
+    兩通道的幅度平方相干性 |Pxy|² / (Pxx·Pyy)（Welch 平均），回傳 (freqs, Cxy)，數值介於 0 到 1
+    """
+    window = np.hanning(NFFT)
+    segments = _channel_frames(np.asarray(frames)[:, list(pair)], NFFT, noverlap)
+    freqs = np.fft.rfftfreq(NFFT, d=1 / sample_rate)
+    if segments.shape[1] == 0:
+        return freqs, np.zeros(len(freqs))
+
+    X = np.fft.rfft(segments * window, axis=-1)
+    Pxx = np.mean(np.abs(X[0]) ** 2, axis=0)
+    Pyy = np.mean(np.abs(X[1]) ** 2, axis=0)
+    Pxy = np.mean(np.conj(X[0]) * X[1], axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Cxy = np.where(Pxx * Pyy > 0, np.abs(Pxy) ** 2 / (Pxx * Pyy), 0.0)
+    return freqs, Cxy
+
+
+def channel_levels_db(frames):
+    """各通道的 RMS 位準（dB），回傳形狀 (通道數,)"""
+    frames = np.asarray(frames, dtype=np.float64)
+    rms = np.sqrt(np.mean(frames ** 2, axis=0))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def level_difference(frames, pair=(0, 1)):
+    """兩通道的 RMS 位準差（dB），為 pair[1] 相對於 pair[0]"""
+    levels = channel_levels_db(np.asarray(frames)[:, list(pair)])
+    return levels[1] - levels[0]
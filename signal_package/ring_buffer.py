@@ -0,0 +1,61 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    固定容量的 NumPy 環形緩衝區，用於保存最近的歷史資料（例如音訊歷史）。
+    資料在底層陣列中存放兩份（鏡像），因此任何長度不超過容量的最新視窗
+    都是連續記憶體，可直接回傳 view 而不必複製；append 的成本只與區塊大小有關。
+
+    注意：view() 回傳的是唯讀視圖，之後的 append 會覆寫其內容，
+    需要長期保存時請自行 .copy()。
+    """
+
+    def __init__(self, capacity, dtype=np.float64, item_shape=()):
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self.item_shape = tuple(item_shape)
+        self._data = np.zeros((2 * self.capacity,) + self.item_shape, dtype=self.dtype)
+        self._pos = 0    # 下一筆資料寫入的位置，範圍 [0, capacity)
+        self._size = 0   # 目前保存的資料筆數
+        self.total_written = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, chunk):
+        """加入一個區塊（第一維為時間軸）；超過容量時只保留最後 capacity 筆"""
+        chunk = np.asarray(chunk, dtype=self.dtype)
+        n = len(chunk)
+        self.total_written += n
+        if self.capacity == 0 or n == 0:
+            return
+        if n > self.capacity:
+            chunk = chunk[-self.capacity:]
+            n = self.capacity
+
+        cap, pos = self.capacity, self._pos
+        first = min(n, cap - pos)
+        # 前半段與鏡像的後半段各寫一次
+        self._data[pos:pos + first] = chunk[:first]
+        self._data[pos + cap:pos + cap + first] = chunk[:first]
+        if first < n:
+            rest = n - first
+            self._data[:rest] = chunk[first:]
+            self._data[cap:cap + rest] = chunk[first:]
+
+        self._pos = (pos + n) % cap
+        self._size = min(self._size + n, cap)
+
+    def view(self, n=None):
+        """回傳最新 n 筆資料（預設為全部）的唯讀連續視圖"""
+        n = self._size if n is None else min(int(n), self._size)
+        end = self._pos + self.capacity
+        out = self._data[end - n:end]
+        out.flags.writeable = False
+        return out
+
+    def clear(self):
+        self._pos = 0
+        self._size = 0
+        self.total_written = 0
@@ -1,23 +1,33 @@
+import functools
+
 import numpy as np
-import matplotlib.pyplot as plt
 
-def process_and_plot(signal_ori, sample_rate, ax_waveform=None, ax_spectrum=None, show_plots=True, persistent_plot=False):
+try:
+    from .spectrogram import spectrogram, to_db
+    from .spectrum_analyzer import SpectrumAnalyzer
+except ImportError:  # 直接執行 signal_package/sound_main.py 時以頂層模組匯入
+    from spectrogram import spectrogram, to_db
+    from spectrum_analyzer import SpectrumAnalyzer
+
+@functools.lru_cache(maxsize=16)
+def get_analyzer(block_size, sample_rate):
     """
-    對原始信號進行傅立葉轉換並更新或生成圖表。
+    依 (區塊長度, 取樣率) 快取的頻譜分析器，避免每次重新建立頻率軸；只保留最近用過的 16 組。
+    分析器不做平均、每次呼叫各自配置輸出，可由多個執行緒共用
     """
-    try:
-        # 進行傅立葉轉換
-        signal_fft = np.fft.fft(signal_ori)
-        frequencies = np.fft.fftfreq(len(signal_ori), d=1/sample_rate)
+    return SpectrumAnalyzer(block_size, sample_rate, window=None)
 
-        # 只取前半部分頻譜
-        n = len(signal_ori)
-        signal_fft = signal_fft[:n//2]
-        frequencies = frequencies[:n//2]
 
-        # 計算幅度
-        magnitudes = np.abs(signal_fft)
-        magnitudes_db = 20 * np.log10(np.maximum(magnitudes, 1e-10))
+def process_and_plot(signal_ori, sample_rate, ax_waveform=None, ax_spectrum=None, show_plots=True, persistent_plot=False, analyzer=None):
+    """
+    對原始信號進行傅立葉轉換並更新或生成圖表。
+    可傳入 SpectrumAnalyzer（例如啟用 Welch 平均）；未指定時使用依區塊長度快取的分析器
+    """
+    try:
+        # 以實數 FFT 只計算非負頻率的頻譜（dB）
+        if analyzer is None:
+            analyzer = get_analyzer(len(signal_ori), sample_rate)
+        frequencies, magnitudes_db = analyzer.process(signal_ori)
 
         if ax_waveform is not None and ax_spectrum is not None:
             # 更新即時波形圖
@@ -41,37 +51,38 @@ def process_and_plot(signal_ori, sample_rate, ax_waveform=None, ax_spectrum=None
         print(f"信號處理時發生錯誤: {e}")
         return np.array([]), np.array([])
 
-def plot_spectrogram(signal_history, sample_rate, ax_spectrogram, draw_colorbar=False):
+def plot_spectrogram(signal_history, sample_rate, ax_spectrogram, draw_colorbar=False, NFFT=256, noverlap=128):
     """
-    根據累積的音訊數據繪製频谱图
+    根據累積的音訊數據計算並繪製頻譜圖。
+    計算部分由 spectrogram()（純 NumPy）負責，這裡只負責繪圖；不需要繪圖時請直接呼叫 spectrogram()
     """
     try:
-        ax_spectrogram.clear()
-        NFFT = 256
-        noverlap = 128
-
-        # 使用 matplotlib 的 specgram 函數生成頻譜圖
-        spec, freqs, bins, im = ax_spectrogram.specgram(
-            signal_history,
-            NFFT=NFFT,
-            Fs=sample_rate,
-            noverlap=noverlap,
-            cmap='jet'
-        )
-
-        # 確保 spec 是實數數據
-        if np.iscomplexobj(spec):
-            spec = np.abs(spec)
+        spec, freqs, bins = spectrogram(signal_history, sample_rate, NFFT=NFFT, noverlap=noverlap)
+        render_spectrogram(spec, freqs, bins, ax_spectrogram, draw_colorbar=draw_colorbar)
+        return spec, freqs, bins
 
-        # 確保數據類型是 float64
-        spec = spec.astype(np.float64)
-        freqs = freqs.astype(np.float64)
-        bins = bins.astype(np.float64)
+    except Exception as e:
+        print(f"生成頻譜圖時發生錯誤: {e}")
+        # 返回空數據以避免程序崩潰
+        return np.array([[]]), np.array([]), np.array([])
 
-        # 設定圖像平滑效果
-        im.set_interpolation('bilinear')
+def render_spectrogram(spec, freqs, bins, ax_spectrogram, draw_colorbar=False):
+    """
+    繪製已計算好的頻譜圖（例如 IncrementalSpectrogram.current() 的結果），不重新計算 FFT
+    """
+    try:
+        ax_spectrogram.clear()
+        if spec.size == 0:
+            return None
+
+        # 與 specgram 相同：以 dB 顯示，時間軸左右各延伸半個音框間隔
+        Z = to_db(spec)
+        half_step = (bins[1] - bins[0]) / 2 if len(bins) > 1 else 0
+        im = ax_spectrogram.imshow(
+            Z, origin='lower', aspect='auto', cmap='jet', interpolation='bilinear',
+            extent=(bins[0] - half_step, bins[-1] + half_step, freqs[0], freqs[-1])
+        )
 
-        # 當 draw_colorbar 為 True 時加入 colorbar
         if draw_colorbar:
             try:
                 cbar = ax_spectrogram.figure.colorbar(im, ax=ax_spectrogram)
@@ -82,10 +93,8 @@ def plot_spectrogram(signal_history, sample_rate, ax_spectrogram, draw_colorbar=
         ax_spectrogram.set_title('Spectrogram')
         ax_spectrogram.set_xlabel('Time (s)')
         ax_spectrogram.set_ylabel('Frequency (Hz)')
-
-        return spec, freqs, bins
+        return im
 
     except Exception as e:
-        print(f"生成頻譜圖時發生錯誤: {e}")
-        # 返回空數據以避免程序崩潰
-        return np.array([[]]), np.array([]), np.array([])
+        print(f"繪製頻譜圖時發生錯誤: {e}")
+        return None
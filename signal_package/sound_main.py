@@ -2,7 +2,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib
 from audio_recorder import AudioRecorder
-from signal_processor import process_and_plot, plot_spectrogram
+from audio_devices import AudioDeviceRegistry
+from ring_buffer import RingBuffer
+from multichannel import deinterleave, to_mono
+from signal_processor import process_and_plot, render_spectrogram
+from spectrogram import IncrementalSpectrogram, spectrogram
 from audio_save import save_spectrogram_to_csv
 import datetime
 import time
@@ -43,11 +47,9 @@ class SoundRecordingApp:
         
         # 檢查音頻設備
         try:
-            import pyaudio
-            p = pyaudio.PyAudio()
-            device_count = p.get_device_count()
-            print(f"音頻設備數量: {device_count}")
-            p.terminate()
+            # 列舉結果會被快取，之後建立錄音器時不必重新列舉
+            devices = AudioDeviceRegistry.shared().input_devices
+            print(f"音頻輸入設備數量: {len(devices)}")
         except Exception as e:
             print(f"音頻系統檢查失敗: {e}")
             return False
@@ -100,6 +102,8 @@ class SoundRecordingApp:
                 chunk=1024, 
                 verbose=True
             )
+            # 以回呼模式連續擷取，區塊之間不會有空檔
+            self.recorder.start_continuous()
             
             num_iterations = int(self.duration / self.update_interval)
             print(f"開始錄音，總時長 {self.duration} 秒，每 {self.update_interval} 秒更新一次...")
@@ -114,6 +118,8 @@ class SoundRecordingApp:
                         duration=self.update_interval, 
                         timeout=self.update_interval + 0.5
                     )
+                    # 多通道時解交錯並混為單聲道
+                    single_ori = to_mono(deinterleave(single_ori, self.recorder.channels))
                     
                     if len(single_ori) > 0:
                         # 將音頻數據放入隊列
@@ -129,9 +135,6 @@ class SoundRecordingApp:
                     
                     print(f"錄音進度: {i+1}/{num_iterations}", end='\r')
                     
-                    # 控制錄音頻率
-                    time.sleep(max(0.01, self.update_interval * 0.8))
-                    
                 except Exception as e:
                     print(f"錄音線程錯誤: {e}")
                     continue
@@ -140,12 +143,16 @@ class SoundRecordingApp:
             print(f"錄音線程初始化錯誤: {e}")
         finally:
             if self.recorder:
+                print(f"\n緩衝區溢位次數: {self.recorder.overruns}")
                 self.recorder.close()
     
     def display_thread(self):
         """顯示線程"""
-        audio_history = np.array([], dtype=np.int16)
         max_history_samples = int(self.history_duration * self.sample_rate)
+        audio_history = RingBuffer(max_history_samples, dtype=np.int16)
+        # 增量式頻譜圖：每個區塊只計算新增的欄，不必每次重算整段歷史
+        spectrogram_engine = IncrementalSpectrogram(
+            self.sample_rate, NFFT=256, noverlap=128, history_duration=self.history_duration)
         last_update = time.time()
         
         while self.running:
@@ -163,9 +170,8 @@ class SoundRecordingApp:
                         single_ori, iteration = self.audio_queue.get_nowait()
                         
                         # 更新音訊歷史數據
-                        audio_history = np.concatenate((audio_history, single_ori))
-                        if len(audio_history) > max_history_samples:
-                            audio_history = audio_history[-max_history_samples:]
+                        audio_history.append(single_ori)
+                        spectrogram_engine.push(single_ori)
                         
                         audio_data_available = True
                         
@@ -178,7 +184,7 @@ class SoundRecordingApp:
                     try:
                         # 使用最新的數據片段進行顯示
                         if len(audio_history) > int(self.sample_rate * self.update_interval):
-                            recent_data = audio_history[-int(self.sample_rate * self.update_interval):]
+                            recent_data = audio_history.view(int(self.sample_rate * self.update_interval))
                             
                             # 更新波形圖與頻譜圖
                             process_and_plot(
@@ -189,8 +195,9 @@ class SoundRecordingApp:
                             )
                             
                             # 更新頻譜圖
-                            plot_spectrogram(
-                                audio_history, self.sample_rate, 
+                            spec, freqs, bins = spectrogram_engine.current()
+                            render_spectrogram(
+                                spec, freqs, bins,
                                 self.ax_spectrogram, 
                                 draw_colorbar=False
                             )
@@ -219,7 +226,7 @@ class SoundRecordingApp:
         
         # 保存最終數據
         if len(audio_history) > 0:
-            self.save_final_data(audio_history)
+            self.save_final_data(audio_history.view())
     
     def run(self):
         """主運行方法"""
@@ -258,27 +265,17 @@ class SoundRecordingApp:
         try:
             print("\n正在生成最終頻譜圖並儲存數據...")
             
-            # 檢查窗口是否仍然存在
+            # 頻譜計算不依賴圖形；窗口仍存在時才繪製
+            spec, freqs, bins = spectrogram(audio_history, self.sample_rate, NFFT=256, noverlap=128)
             if plt.fignum_exists(self.fig.number):
-                spec, freqs, bins = plot_spectrogram(
-                    audio_history, self.sample_rate, 
-                    self.ax_spectrogram, draw_colorbar=True
-                )
+                render_spectrogram(spec, freqs, bins, self.ax_spectrogram, draw_colorbar=True)
                 
                 # 強制更新顯示
                 self.fig.canvas.draw()
                 self.fig.canvas.flush_events()
-            else:
-                # 如果窗口不存在，創建臨時圖形進行計算
-                temp_fig, temp_ax = plt.subplots(1, 1)
-                spec, freqs, bins = plot_spectrogram(
-                    audio_history, self.sample_rate, 
-                    temp_ax, draw_colorbar=False
-                )
-                plt.close(temp_fig)
             
             # 檢查數據有效性
-            if len(spec) == 0 or len(freqs) == 0 or len(bins) == 0:
+            if spec.size == 0 or len(freqs) == 0 or len(bins) == 0:
                 print("警告：無法生成有效的頻譜數據")
                 return
             
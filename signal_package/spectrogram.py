@@ -0,0 +1,133 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from .ring_buffer import RingBuffer
+except ImportError:  # 直接執行 signal_package/sound_main.py 時以頂層模組匯入
+    from ring_buffer import RingBuffer
+
+
+def _psd_frames(frames, window, sample_rate):
+    """
+    對 (n_frames, NFFT) 的音框計算單邊功率譜密度，回傳 (n_frames, NFFT//2 + 1)。
+    縮放方式與 matplotlib specgram（mode='psd', scale_by_freq=True）一致
+    """
+    spectrum = np.fft.rfft(frames * window, axis=-1)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+    nfft = frames.shape[-1]
+    # 單邊頻譜：除 DC（與偶數 NFFT 的 Nyquist）外乘 2
+    if nfft % 2 == 0:
+        power[..., 1:-1] *= 2
+    else:
+        power[..., 1:] *= 2
+    power /= sample_rate * np.sum(window ** 2)
+    return power
+
+
+def frame_signal(signal, NFFT=256, noverlap=128):
+    """將一維信號切成 (n_frames, NFFT) 的重疊音框（唯讀視圖，不複製資料）"""
+    if not 0 <= noverlap < NFFT:
+        raise ValueError("noverlap 必須介於 0 與 NFFT 之間")
+    signal = np.asarray(signal, dtype=np.float64)
+    if len(signal) < NFFT:
+        return np.zeros((0, NFFT))
+    step = NFFT - noverlap
+    n_frames = (len(signal) - NFFT) // step + 1
+    return sliding_window_view(signal, NFFT)[::step][:n_frames]
+
+
+def spectrogram(signal, sample_rate, NFFT=256, noverlap=128, window=None):
+    """
+    純 NumPy 頻譜圖計算（不需要 matplotlib），回傳 (spec, freqs, bins)，
+    spec 形狀為 (NFFT//2 + 1, n_frames)，數值與 Axes.specgram 的 PSD 相同
+    """
+    window = np.hanning(NFFT) if window is None else np.asarray(window)
+    frames = frame_signal(signal, NFFT, noverlap)
+    step = NFFT - noverlap
+    freqs = np.fft.rfftfreq(NFFT, d=1 / sample_rate)
+    bins = (np.arange(len(frames)) * step + NFFT / 2) / sample_rate
+    if len(frames) == 0:
+        return np.zeros((len(freqs), 0)), freqs, bins
+    return _psd_frames(frames, window, sample_rate).T, freqs, bins
+
+
+def psd(signal, sample_rate, NFFT=256, noverlap=128, window=None):
+    """以各音框 PSD 的平均估計功率譜密度（Welch 法），回傳 (psd, freqs)"""
+    spec, freqs, _ = spectrogram(signal, sample_rate, NFFT, noverlap, window)
+    if spec.shape[1] == 0:
+        return np.zeros(len(freqs)), freqs
+    return spec.mean(axis=1), freqs
+
+
+def to_db(power, floor=1e-20):
+    """功率轉 dB（10·log10），以 floor 避免 log(0)"""
+    return 10. * np.log10(np.maximum(power, floor))
+
+
+class IncrementalSpectrogram:
+    """
+    增量式 STFT 頻譜圖：每次只對新到的樣本計算新的時間列，
+    保留不足一個音框的尾端樣本（重疊部分）給下一次使用，
+    結果存放在固定容量的環形緩衝區中，current() 可取得目前視窗而不需重算。
+    """
+
+    def __init__(self, sample_rate, NFFT=256, noverlap=128, history_duration=100):
+        if not 0 <= noverlap < NFFT:
+            raise ValueError("noverlap 必須介於 0 與 NFFT 之間")
+        self.sample_rate = sample_rate
+        self.NFFT = NFFT
+        self.noverlap = noverlap
+        self.step = NFFT - noverlap
+        self.window = np.hanning(NFFT)
+        self.freqs = np.fft.rfftfreq(NFFT, d=1 / sample_rate)
+
+        history_samples = int(history_duration * sample_rate)
+        self.max_columns = max((history_samples - NFFT) // self.step + 1, 1)
+        self._columns = RingBuffer(self.max_columns, dtype=np.float64, item_shape=(len(self.freqs),))
+
+        self._pending = np.zeros(0, dtype=np.float64)
+        self.frames_total = 0   # 累計計算的音框數（用於時間軸）
+
+    def __len__(self):
+        return len(self._columns)
+
+    def push(self, samples):
+        """加入新樣本，回傳本次新增的欄數"""
+        samples = np.asarray(samples, dtype=np.float64)
+        buf = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        if len(buf) < self.NFFT:
+            self._pending = buf.copy()
+            return 0
+
+        frames = frame_signal(buf, self.NFFT, self.noverlap)
+        n_frames = len(frames)
+        self._columns.append(_psd_frames(frames, self.window, self.sample_rate))
+
+        self._pending = buf[n_frames * self.step:].copy()
+        self.frames_total += n_frames
+        return n_frames
+
+    def times(self, relative=True):
+        """
+        目前視窗中每一欄的中心時間（秒）。relative=True 時以視窗起點為 0，
+        與 specgram 對同一段歷史資料回傳的 bins 對應
+        """
+        n = len(self._columns)
+        first = self.frames_total - n
+        t = ((first + np.arange(n)) * self.step + self.NFFT / 2) / self.sample_rate
+        if relative and n:
+            t = t - t[0] + self.NFFT / 2 / self.sample_rate
+        return t
+
+    def current(self, n_columns=None):
+        """回傳 (spec, freqs, bins)：spec 形狀為 (n_freqs, n_columns)，為環形緩衝區的唯讀視圖"""
+        columns = self._columns.view(n_columns)
+        bins = self.times()[len(self._columns) - len(columns):]
+        if len(bins):
+            bins = bins - bins[0] + self.NFFT / 2 / self.sample_rate
+        return columns.T, self.freqs, bins
+
+    def reset(self):
+        self._columns.clear()
+        self._pending = np.zeros(0, dtype=np.float64)
+        self.frames_total = 0
@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+
+try:
+    from .ring_buffer import RingBuffer
+    from .spectrogram import to_db
+except ImportError:  # 直接執行 signal_package/sound_main.py 時以頂層模組匯入
+    from ring_buffer import RingBuffer
+    from spectrogram import to_db
+
+
+class SpectrumAnalyzer:
+    """
+    固定區塊大小的即時頻譜分析器：窗函數、頻率軸與縮放係數只在建立時計算一次，
+    每個區塊只做一次 rfft（只計算非負頻率，工作量約為完整 fft 的一半）。
+    averages > 1 時對最近幾個區塊的功率譜取平均（Welch 法），降低雜訊起伏。
+    power() 與 process() 每次回傳新配置的陣列；averages = 1 時不保留狀態，可由多個執行緒共用。
+
+    scaling:
+      'magnitude' - 20·log10|X|，與原本 process_and_plot 的輸出相同（window=None 時）
+      'psd'       - 功率譜密度（dB/Hz），縮放方式與 spectrogram() 相同
+    """
+
+    def __init__(self, block_size, sample_rate, window='hanning', averages=1, scaling='magnitude'):
+        if scaling not in ('magnitude', 'psd'):
+            raise ValueError(f"不支援的 scaling: {scaling}")
+        self.block_size = int(block_size)
+        self.sample_rate = sample_rate
+        self.scaling = scaling
+
+        if window is None:
+            self.window = None
+            window_values = np.ones(self.block_size)
+        else:
+            self.window = np.hanning(self.block_size) if window == 'hanning' else np.array(window, dtype=np.float64)
+            window_values = self.window
+        self.freqs = np.fft.rfftfreq(self.block_size, d=1 / sample_rate)
+
+        # 每個頻率點的縮放係數
+        if scaling == 'psd':
+            self.scale = np.full(len(self.freqs), 2.0 / (sample_rate * np.sum(window_values ** 2)))
+            self.scale[0] /= 2
+            if self.block_size % 2 == 0:
+                self.scale[-1] /= 2
+        else:
+            self.scale = None
+
+        # 頻率軸等設定由所有呼叫端共用，設為唯讀避免被意外修改
+        for values in (self.window, self.freqs, self.scale):
+            if values is not None:
+                values.flags.writeable = False
+        self._lock = threading.Lock()
+        self._history = RingBuffer(max(int(averages), 1), dtype=np.float64, item_shape=(len(self.freqs),))
+
+    @property
+    def averages(self):
+        return self._history.capacity
+
+    def power(self, block):
+        """計算單一區塊的（已縮放）功率譜，不影響平均"""
+        block = np.asarray(block, dtype=np.float64)
+        if len(block) != self.block_size:
+            raise ValueError(f"區塊長度 {len(block)} 與設定的 {self.block_size} 不符")
+        if self.window is not None:
+            block = block * self.window
+        spectrum = np.fft.rfft(block)
+        power = np.square(spectrum.real)
+        power += spectrum.imag ** 2
+        if self.scale is not None:
+            power *= self.scale
+        return power
+
+    def process(self, block):
+        """加入一個區塊並回傳 (freqs, 平均後的 dB 頻譜)"""
+        power = self.power(block)
+        if self.averages == 1:
+            return self.freqs, to_db(power)
+        with self._lock:
+            self._history.append(power[None, :])
+            averaged = self._history.view().mean(axis=0)
+        return self.freqs, to_db(averaged)
+
+    def reset(self):
+        with self._lock:
+            self._history.clear()
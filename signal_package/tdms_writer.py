@@ -0,0 +1,221 @@
+import datetime
+import os
+import struct
+
+import numpy as np
+
+# TDMS 檔案格式常數（NI TDMS 2.0，little-endian）
+TDMS_VERSION = 4713
+TOC_META_DATA = 1 << 1
+TOC_NEW_OBJ_LIST = 1 << 2
+TOC_RAW_DATA = 1 << 3
+NO_RAW_DATA = 0xFFFFFFFF
+
+TDS_TYPE_I32 = 0x03
+TDS_TYPE_U32 = 0x07
+TDS_TYPE_I64 = 0x04
+TDS_TYPE_SINGLE = 0x09
+TDS_TYPE_DOUBLE = 0x0A
+TDS_TYPE_STRING = 0x20
+TDS_TYPE_BOOL = 0x21
+
+_NUMPY_TYPES = {
+    np.dtype('<i4'): TDS_TYPE_I32,
+    np.dtype('<u4'): TDS_TYPE_U32,
+    np.dtype('<i8'): TDS_TYPE_I64,
+    np.dtype('<f4'): TDS_TYPE_SINGLE,
+    np.dtype('<f8'): TDS_TYPE_DOUBLE,
+}
+
+
+def object_path(group=None, channel=None):
+    """TDMS 物件路徑：'/'、"/'群組'"、"/'群組'/'通道'"（名稱中的單引號需重複）"""
+    if group is None:
+        return '/'
+    path = "/'" + group.replace("'", "''") + "'"
+    if channel is not None:
+        path += "/'" + channel.replace("'", "''") + "'"
+    return path
+
+
+def _pack_string(value):
+    data = value.encode('utf-8')
+    return struct.pack('<I', len(data)) + data
+
+
+def _pack_property(name, value):
+    if isinstance(value, str):
+        return _pack_string(name) + struct.pack('<I', TDS_TYPE_STRING) + _pack_string(value)
+    if isinstance(value, (bool, np.bool_)):
+        return _pack_string(name) + struct.pack('<IB', TDS_TYPE_BOOL, bool(value))
+    if isinstance(value, (int, np.integer)):
+        return _pack_string(name) + struct.pack('<Ii', TDS_TYPE_I32, int(value))
+    if isinstance(value, (float, np.floating)):
+        return _pack_string(name) + struct.pack('<Id', TDS_TYPE_DOUBLE, float(value))
+    if isinstance(value, datetime.datetime):
+        return _pack_property(name, value.isoformat())
+    raise TypeError(f"不支援的 TDMS 屬性型別: {name}={value!r}")
+
+
+class TdmsWriter:
+    """
+    不依賴外部套件的 TDMS 寫入器，可逐段（segment）附加資料。
+    每次 write_segment() 寫入一個完整的 segment；若通道清單與每通道筆數都與上一段相同，
+    只寫入原始資料而省略中繼資料（TDMS 規格允許沿用上一段的設定），長時間量測的檔案負擔很小。
+    mode='a' 時附加到既有檔案的尾端。
+    """
+
+    def __init__(self, filename, mode='w'):
+        if mode not in ('w', 'a'):
+            raise ValueError("mode 必須為 'w' 或 'a'")
+        self.filename = filename
+        self._file = open(filename, mode + 'b')
+        self._last_layout = None
+        self.segments_written = 0
+
+    def write_segment(self, channels, properties=None):
+        """
+        channels: [(群組, 通道, ndarray)]，資料依序以非交錯方式寫入；
+        properties: {物件路徑: {名稱: 值}}，可包含只有屬性、沒有資料的物件（例如根物件與群組）
+        """
+        properties = properties or {}
+        arrays = []
+        layout = []
+        for group, channel, data in channels:
+            data = np.ascontiguousarray(data)
+            dtype = data.dtype.newbyteorder('<') if data.dtype.byteorder == '>' else data.dtype
+            if dtype not in _NUMPY_TYPES:
+                raise TypeError(f"不支援的 TDMS 資料型別: {data.dtype}")
+            arrays.append(data.astype(dtype, copy=False))
+            layout.append((object_path(group, channel), _NUMPY_TYPES[dtype], data.size))
+        layout = tuple(layout)
+
+        raw = b''.join(a.tobytes() for a in arrays)
+        if not properties and layout == self._last_layout and layout:
+            # 與上一段完全相同的結構：只寫原始資料
+            toc = TOC_RAW_DATA
+            meta = b''
+        else:
+            toc = TOC_META_DATA | TOC_NEW_OBJ_LIST | (TOC_RAW_DATA if raw else 0)
+            meta = self._pack_metadata(layout, properties)
+
+        lead_in = b'TDSm' + struct.pack('<IIQQ', toc, TDMS_VERSION, len(meta) + len(raw), len(meta))
+        self._file.write(lead_in + meta + raw)
+        self._file.flush()
+        self._last_layout = layout if layout else self._last_layout
+        self.segments_written += 1
+
+    @staticmethod
+    def _pack_metadata(layout, properties):
+        channel_paths = {path for path, _, _ in layout}
+        paths = [path for path in properties if path not in channel_paths]
+        parts = [struct.pack('<I', len(paths) + len(layout))]
+        for path in paths:
+            props = properties[path]
+            parts.append(_pack_string(path) + struct.pack('<II', NO_RAW_DATA, len(props)))
+            parts.extend(_pack_property(k, v) for k, v in props.items())
+        for path, tds_type, count in layout:
+            props = properties.get(path, {})
+            # 原始資料索引：長度(20)、型別、維度(1)、筆數
+            parts.append(_pack_string(path) + struct.pack('<IIIQ', 20, tds_type, 1, count))
+            parts.append(struct.pack('<I', len(props)))
+            parts.extend(_pack_property(k, v) for k, v in props.items())
+        return b''.join(parts)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SpectrogramTdmsWriter:
+    """
+    以 TDMS 逐段儲存頻譜圖：群組 'Spectrogram' 下有 Time、Frequencies，
+    以及每個頻率的 dB_<f>Hz（與 CSV 的 DB_like 相同）、Power_<f>Hz、SNR_<f>Hz 通道（float32）。
+    長時間量測中可隨時以 append() 寫入新的時間欄，檔案隨時都是可讀取的完整 TDMS。
+    """
+
+    GROUP = 'Spectrogram'
+
+    def __init__(self, filename, freqs, sample_rate, NFFT, noverlap, experiment_id=None,
+                 save_power=True, save_snr=False, mode='w'):
+        self.freqs = np.asarray(freqs, dtype=np.float64)
+        self.save_power = save_power
+        self.save_snr = save_snr
+        self.experiment_id = experiment_id or f"EXP_TDMS_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.columns_written = 0
+        # 附加到既有檔案時，頻率軸與各項屬性已在檔案中，不再重複寫入
+        appending = mode == 'a' and os.path.exists(filename) and os.path.getsize(filename) > 0
+        self.writer = TdmsWriter(filename, mode=mode)
+
+        timestamp = datetime.datetime.now().isoformat()
+        self._pending_properties = {
+            object_path(): {
+                'EId': self.experiment_id, 'timestamp': timestamp,
+                'sample_rate': float(sample_rate), 'NFFT': int(NFFT), 'noverlap': int(noverlap)
+            },
+            object_path(self.GROUP): {
+                'EId': self.experiment_id, 'timestamp': timestamp, 'description': '頻譜圖數據及相關信息'
+            },
+            object_path(self.GROUP, 'Time'): {'unit_string': 's', 'description': '時間軸'},
+        }
+        for f in self.freqs:
+            label = f"{f:.2f}Hz"
+            self._pending_properties[object_path(self.GROUP, f"dB_{label}")] = {
+                'unit_string': 'dB_like', 'description': f'{label} 頻率的類dB數據', 'frequency': float(f)}
+            if save_power:
+                self._pending_properties[object_path(self.GROUP, f"Power_{label}")] = {
+                    'unit_string': 'Power_Unit', 'description': f'{label} 頻率的功率數據', 'frequency': float(f)}
+            if save_snr:
+                self._pending_properties[object_path(self.GROUP, f"SNR_{label}")] = {
+                    'unit_string': 'dB', 'description': f'{label} 頻率的信噪比數據', 'frequency': float(f)}
+
+        if appending:
+            self._pending_properties = {}
+            return
+
+        # 頻率軸只寫一次
+        self.writer.write_segment(
+            [(self.GROUP, 'Frequencies', self.freqs)],
+            {object_path(self.GROUP, 'Frequencies'): {'unit_string': 'Hz', 'description': '頻率軸'},
+             object_path(): self._pending_properties.pop(object_path()),
+             object_path(self.GROUP): self._pending_properties.pop(object_path(self.GROUP))}
+        )
+
+    def append(self, spec, bins, snr=None):
+        """
+        寫入新的時間欄：spec 形狀 (頻率點數, 新欄數)，bins 為對應的時間（秒）；
+        save_snr=True 時需提供每個頻率的 snr（形狀 (頻率點數,)）
+        """
+        spec = np.asarray(spec, dtype=np.float64)
+        if spec.ndim != 2 or spec.shape[0] != len(self.freqs):
+            raise ValueError(f"頻譜圖形狀 {spec.shape} 與頻率軸長度 {len(self.freqs)} 不符")
+        n = spec.shape[1]
+        if n == 0:
+            return
+        if self.save_snr and snr is None:
+            raise ValueError("save_snr=True 時需提供 snr")
+
+        channels = [(self.GROUP, 'Time', np.asarray(bins, dtype=np.float64))]
+        spec32 = spec.astype(np.float32)
+        power32 = np.square(spec).astype(np.float32) if self.save_power else None
+        for i, f in enumerate(self.freqs):
+            label = f"{f:.2f}Hz"
+            channels.append((self.GROUP, f"dB_{label}", spec32[i]))
+            if self.save_power:
+                channels.append((self.GROUP, f"Power_{label}", power32[i]))
+            if self.save_snr:
+                channels.append((self.GROUP, f"SNR_{label}", np.full(n, snr[i], dtype=np.float32)))
+
+        # 通道屬性只在第一次寫入資料時附上
+        properties, self._pending_properties = self._pending_properties, {}
+        self.writer.write_segment(channels, properties)
+        self.columns_written += n
+
+    def close(self):
+        self.writer.close()
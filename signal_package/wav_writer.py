@@ -0,0 +1,116 @@
+import datetime
+import os
+import queue
+import threading
+import wave
+
+import numpy as np
+
+
+class StreamingWavWriter:
+    """
+    將擷取到的原始 int16 PCM 以大區塊持續寫入 WAV 檔（無損），並依時間或大小輪替檔案。
+    push() 只把資料放進佇列、絕不阻塞，可直接在 PyAudio 回呼中呼叫；
+    實際的檔案寫入由背景執行緒負責，佇列滿時捨棄該區塊並記錄在 dropped_blocks。
+    wave 模組在每次寫入後都會更新檔頭，程式中途當掉時已寫入的部分仍可讀取。
+    """
+
+    def __init__(self, directory, sample_rate, channels=1, prefix='audio',
+                 rotate_seconds=600, rotate_bytes=None, block_seconds=1.0, max_queue=256):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.prefix = prefix
+        self.sample_width = 2  # int16
+
+        # 檔案輪替門檻（以音框數計），兩者都設定時先到者為準
+        limits = []
+        if rotate_seconds:
+            limits.append(int(rotate_seconds * sample_rate))
+        if rotate_bytes:
+            limits.append(int(rotate_bytes) // (self.sample_width * channels))
+        self.rotate_frames = min(limits) if limits else None
+        self.block_frames = max(int(block_seconds * sample_rate), 1)
+
+        self.files = []
+        self.frames_written = 0
+        self.dropped_blocks = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._wav = None
+        self._file_frames = 0
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def push(self, samples):
+        """加入交錯的 int16 樣本（或 (音框數, 通道數) 陣列），不阻塞"""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(samples)
+            return True
+        except queue.Full:
+            self.dropped_blocks += 1
+            return False
+
+    def _open_next(self):
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = os.path.join(self.directory, f"{self.prefix}_{stamp}_{len(self.files):03d}.wav")
+        self._wav = wave.open(filename, 'wb')
+        self._wav.setnchannels(self.channels)
+        self._wav.setsampwidth(self.sample_width)
+        self._wav.setframerate(self.sample_rate)
+        self._file_frames = 0
+        self.files.append(filename)
+
+    def _write(self, data):
+        """寫入一個大區塊，必要時切割到下一個檔案"""
+        frames = data.reshape(-1, self.channels)
+        while len(frames):
+            if self._wav is None:
+                self._open_next()
+            n = len(frames)
+            if self.rotate_frames is not None:
+                n = min(n, self.rotate_frames - self._file_frames)
+            self._wav.writeframes(frames[:n].tobytes())
+            self._file_frames += n
+            self.frames_written += n
+            frames = frames[n:]
+            if self.rotate_frames is not None and self._file_frames >= self.rotate_frames:
+                self._wav.close()
+                self._wav = None
+
+    def _writer_loop(self):
+        pending = []
+        pending_frames = 0
+        while True:
+            item = self._queue.get()
+            if item is not None:
+                data = np.asarray(item, dtype=np.int16).reshape(-1)
+                pending.append(data)
+                pending_frames += len(data) // self.channels
+            # 累積到一個大區塊（或收到結束訊號）才寫入磁碟
+            if pending and (item is None or pending_frames >= self.block_frames):
+                try:
+                    self._write(np.concatenate(pending))
+                except Exception as e:
+                    print(f"寫入音訊檔失敗: {e}")
+                pending = []
+                pending_frames = 0
+            if item is None:
+                break
+
+    def close(self):
+        """寫完佇列中剩餘的資料並關閉檔案（可重複呼叫）"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+        if self.dropped_blocks:
+            print(f"音訊檔寫入期間捨棄了 {self.dropped_blocks} 個區塊")
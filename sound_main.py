@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from signal_package import AudioRecorder,process_and_plot, plot_spectrogram,save_spectrogram_to_tdms
+from signal_package import RingBuffer, to_mono, AudioRecorder,process_and_plot, plot_spectrogram,save_spectrogram_to_tdms
 
 import datetime
 
@@ -17,18 +17,17 @@ def main(sample_rate = 22050, #  # 音訊採樣率
     ax_spectrum = ax[1]
     ax_spectrogram = ax[2]
 
-    audio_history = np.array([], dtype=np.int16)
     max_history_samples = int(history_duration * sample_rate)
+    audio_history = RingBuffer(max_history_samples, dtype=np.int16)
 
     # 初始化錄音器
     recorder = AudioRecorder(sample_rate=sample_rate, channels=None, chunk=1024, verbose=True)
+    recorder.start_continuous()
 
     num_iterations = int(duration / update_interval)
     for i in range(num_iterations):
-        singel_ori = recorder.record_audio(update_interval)
-        audio_history = np.concatenate((audio_history, singel_ori))
-        if len(audio_history) > max_history_samples:
-            audio_history = audio_history[-max_history_samples:]
+        singel_ori = to_mono(recorder.record_frames(update_interval))
+        audio_history.append(singel_ori)
         
         # 更新波形與頻譜圖 (不影響 colorbar)
         process_and_plot(
@@ -39,7 +38,7 @@ def main(sample_rate = 22050, #  # 音訊採樣率
         )
 
         # 即時更新頻譜圖，但不加 colorbar
-        plot_spectrogram(audio_history, sample_rate, ax_spectrogram, draw_colorbar=False)
+        plot_spectrogram(audio_history.view(), sample_rate, ax_spectrogram, draw_colorbar=False)
         
         plt.pause(update_interval)
 
@@ -47,7 +46,7 @@ def main(sample_rate = 22050, #  # 音訊採樣率
     recorder.close()
 
     # 生成最終頻譜圖並儲存數據
-    spec, freqs, bins = plot_spectrogram(audio_history, sample_rate, ax_spectrogram, draw_colorbar=True)
+    spec, freqs, bins = plot_spectrogram(audio_history.view(), sample_rate, ax_spectrogram, draw_colorbar=True)
     save_spectrogram_to_tdms(spec, freqs, bins, sample_rate, NFFT=256, noverlap=128, 
                          experiment_id="EXP_" + datetime.datetime.now().strftime("%Y%m%d_%H%M%S"),
                          filename='spectrogram.tdms')
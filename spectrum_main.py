@@ -5,11 +5,50 @@ import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
 from spectrum_py_package.spectrometer import Spectrometer
+from experiment_store import ExperimentStore
 
-BUFFER_PATH = "spectra_logs/spectra_buffer.npy"
+STORE_PATH = "spectra_logs/spectra.h5"
+BUFFER_PATH = "spectra_logs/spectra_buffer.npy"  # 舊版的光譜緩衝檔
 CSV_DIR = "spectra_logs"
 os.makedirs(CSV_DIR, exist_ok=True)
 
+
+def import_legacy_buffer(store, n_pixels):
+    """HDF5 容器為空時匯入舊版 spectra_buffer.npy 的歷史光譜；舊檔沒有時間，以序號 0..n-1 代替"""
+    if not os.path.exists(BUFFER_PATH):
+        return
+    legacy = np.load(BUFFER_PATH)
+    if legacy.ndim != 2 or legacy.shape[1] != n_pixels:
+        print(f"⚠️ {BUFFER_PATH} 的形狀 {legacy.shape} 與目前的波長點數 {n_pixels} 不符，未匯入")
+        return
+    store.append('spectra', np.arange(len(legacy), dtype=np.float64), legacy)
+    store.create_stream('spectra', legacy_rows=len(legacy), legacy_source=BUFFER_PATH)
+    print(f"已匯入 {len(legacy)} 筆舊版光譜（{BUFFER_PATH}）")
+
+
+def append_to_store(wavelength, integration_time_ms, spectral_data):
+    """附加到 HDF5 容器（只寫入新的一列，不必每次讀出再覆寫整個緩衝檔），回傳全部光譜"""
+    with ExperimentStore(STORE_PATH, mode='a') as store:
+        store.create_stream('spectra', row_shape=(len(wavelength),), unit='Intensity',
+                            wavelength=wavelength, integration_time_ms=integration_time_ms)
+        if store.length('spectra') == 0:
+            import_legacy_buffer(store, len(wavelength))
+        store.append('spectra', time.time(), spectral_data)
+        _, spectra_buffer = store.read('spectra')
+    return spectra_buffer
+
+
+def append_to_buffer(spectral_data):
+    """沒有 h5py 時沿用舊版的 .npy 緩衝檔"""
+    if os.path.exists(BUFFER_PATH):
+        spectra_buffer = np.load(BUFFER_PATH)
+        spectra_buffer = np.vstack([spectra_buffer, spectral_data])
+    else:
+        spectra_buffer = np.array([spectral_data])
+    np.save(BUFFER_PATH, spectra_buffer)
+    return spectra_buffer
+
+
 def main():
     print("初始化光譜儀...")
     spec = Spectrometer()
@@ -45,13 +84,11 @@ def main():
     np.savetxt(output_path, data, delimiter=",", fmt="%s", header=header, comments='')
     print(f"✅ 已儲存光譜資料到：{output_path}")
 
-    # 更新 buffer
-    if os.path.exists(BUFFER_PATH):
-        spectra_buffer = np.load(BUFFER_PATH)
-        spectra_buffer = np.vstack([spectra_buffer, spectral_data])
-    else:
-        spectra_buffer = np.array([spectral_data])
-    np.save(BUFFER_PATH, spectra_buffer)
+    try:
+        spectra_buffer = append_to_store(wavelength, integration_time_ms, spectral_data)
+    except ImportError as e:
+        print(f"⚠️ {e}；改用舊版緩衝檔 {BUFFER_PATH}")
+        spectra_buffer = append_to_buffer(spectral_data)
 
     # 顯示折線圖 + 熱圖
     fig, (ax_line, ax_heat) = plt.subplots(2, 1, figsize=(12, 8), gridspec_kw={'height_ratios': [1, 1]})
@@ -1,2 +1,2 @@
 from .spectrometer.spectrometer import Spectrometer
-
+from .analysis import SpectralFeatureExtractor
@@ -0,0 +1,113 @@
+# analysis.py
+# 光譜特徵擷取：對 (掃描數, 像素) 的二維批次資料一次計算峰值位置（次像素內插）、
+# 波段積分與質心偏移，輸出精簡的每筆掃描特徵向量，供儀表板與資料庫使用
+import numpy as np
+
+# 每個波段輸出的特徵（依序）
+BAND_FEATURES = ("peak_nm", "peak_height", "integral", "centroid_nm", "centroid_shift_nm")
+
+
+def subpixel_peaks(spectra, start=0, stop=None):
+    """
+    在像素範圍 [start, stop) 內找出每筆掃描的最大值，並以三點拋物線內插求次像素位置。
+    回傳 (peak_pixel, peak_height)，皆為形狀 (n_scans,) 的陣列
+    """
+    spectra = np.atleast_2d(spectra)
+    n_scans, n_pixels = spectra.shape
+    stop = n_pixels if stop is None else stop
+
+    idx = start + np.argmax(spectra[:, start:stop], axis=1)
+    # 邊界像素無法取三點，改用相鄰的內側像素為中心
+    center = np.clip(idx, 1, n_pixels - 2)
+    rows = np.arange(n_scans)
+    y0 = spectra[rows, center - 1]
+    y1 = spectra[rows, center]
+    y2 = spectra[rows, center + 1]
+
+    denom = y0 - 2 * y1 + y2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = np.where(denom != 0, 0.5 * (y0 - y2) / denom, 0.0)
+    delta = np.clip(delta, -0.5, 0.5)
+    height = y1 - 0.25 * (y0 - y2) * delta
+    return center + delta, height
+
+
+def band_weights(wavelength, bands):
+    """
+    建立形狀 (pixels, n_bands) 的梯形積分權重矩陣；
+    spectra @ weights 即為各波段的積分值（強度 × nm）
+    """
+    wavelength = np.asarray(wavelength, dtype=np.float64)
+    weights = np.zeros((len(wavelength), len(bands)))
+    for k, (lo, hi) in enumerate(bands):
+        idx = np.flatnonzero((wavelength >= lo) & (wavelength <= hi))
+        if len(idx) < 2:
+            continue
+        dx = np.diff(wavelength[idx])
+        weights[idx[:-1], k] += dx / 2
+        weights[idx[1:], k] += dx / 2
+    return weights
+
+
+class SpectralFeatureExtractor:
+    """
+    依設定的波段預先計算權重矩陣，之後每個批次只需兩次矩陣乘法加上逐波段的峰值搜尋。
+    bands 為 {名稱: (起始 nm, 結束 nm)}
+    """
+
+    def __init__(self, wavelength, bands, reference_centroids=None):
+        self.wavelength = np.asarray(wavelength, dtype=np.float64)
+        self.band_names = list(bands)
+        self.bands = [tuple(bands[name]) for name in self.band_names]
+        self.pixel_axis = np.arange(len(self.wavelength), dtype=np.float64)
+
+        # 各波段對應的像素範圍（用於峰值搜尋）
+        self.pixel_ranges = []
+        for lo, hi in self.bands:
+            idx = np.flatnonzero((self.wavelength >= lo) & (self.wavelength <= hi))
+            if len(idx) == 0:
+                raise ValueError(f"波段 {lo}-{hi} nm 超出光譜儀波長範圍")
+            self.pixel_ranges.append((idx[0], idx[-1] + 1))
+
+        self.weights = band_weights(self.wavelength, self.bands)
+        self.moment_weights = self.weights * self.wavelength[:, None]
+        self.reference_centroids = None if reference_centroids is None else np.asarray(reference_centroids)
+
+    @property
+    def feature_names(self):
+        return [f"{band}_{feature}" for band in self.band_names for feature in BAND_FEATURES]
+
+    def extract(self, spectra):
+        """
+        計算一批光譜的特徵，回傳形狀 (n_scans, n_bands × 5) 的 float32 陣列，
+        欄位順序見 feature_names
+        """
+        spectra = np.atleast_2d(np.asarray(spectra, dtype=np.float64))
+        n_scans, n_bands = spectra.shape[0], len(self.bands)
+
+        integrals = spectra @ self.weights
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centroids = np.where(integrals != 0, (spectra @ self.moment_weights) / integrals, np.nan)
+
+        # 未指定參考質心時，以第一個批次的第一筆掃描作為基準
+        if self.reference_centroids is None:
+            self.reference_centroids = centroids[0].copy()
+
+        features = np.empty((n_scans, n_bands, len(BAND_FEATURES)), dtype=np.float32)
+        for k, (start, stop) in enumerate(self.pixel_ranges):
+            peak_pixel, peak_height = subpixel_peaks(spectra, start, stop)
+            features[:, k, 0] = np.interp(peak_pixel, self.pixel_axis, self.wavelength)
+            features[:, k, 1] = peak_height
+        features[:, :, 2] = integrals
+        features[:, :, 3] = centroids
+        features[:, :, 4] = centroids - self.reference_centroids
+        return features.reshape(n_scans, -1)
+
+    def to_records(self, features, timestamps=None):
+        """將特徵陣列轉成 dict 清單，方便寫入資料庫或推送到網頁"""
+        names = self.feature_names
+        records = [dict(zip(names, row.tolist())) for row in np.atleast_2d(features)]
+        if timestamps is not None:
+            for record, ts in zip(records, timestamps):
+                record["timestamp"] = float(ts)
+        return records
@@ -6,166 +6,41 @@ import struct
 # import globals
 from . import globals
 "---------------------------------------"
-from PyQt5.QtCore import *
-
-AVS_SERIAL_LEN = 10
-VERSION_LEN = 16
-DETECTOR_NAME_LEN = 20
-USER_ID_LEN = 64
-INVALID_AVS_HANDLE_VALUE = 1000
-ERR_ETHCONN_REUSE = -27
-SENS_HAMS9201 = 4
-SENS_TCD1304 = 5
-SENS_SU256LSB = 17
-SENS_SU512LDB = 18
-SENS_HAMS11639 = 22
-SENS_HAMG9208_512 = 24
-SENS_HAMS13496 = 26
-SENS_HAMS11155_2048_02_DIFF = 30
-SENSOR_OFFSET = 1
-NUMBER_OF_SENSOR_TYPES = 31
-NR_DEFECTIVE_PIXELS = 30
-MAX_NR_PIXELS = 4096
-CLIENT_ID_SIZE = 32
-
-DSTR_STATUS_DSS_MASK = 0x01   # DSTR Sequence Stop (DSS) bit of MEASUREMENT_DSTR_STATUS->DMS
-DSTR_STATUS_FOE_MASK = 0x02   # FIFO Overflow Error (FOE) bit of MEASUREMENT_DSTR_STATUS->DMS
-DSTR_STATUS_IERR_MASK = 0x04  # Internal Error (IERR) bit of MEASUREMENT_DSTR_STATUS->DMS
+
+from .avaspec_types import *
+
+# 原生函式庫在第一次呼叫 AVS_* 函式時才載入，匯入本模組不需要 DLL/.so
+_library = None
 
 if 'linux' in sys.platform: # Linux will have 'linux' or 'linux2'
-    lib = ctypes.CDLL("/usr/local/lib/libavs.so.0")
+    LIBRARY_PATH = "/usr/local/lib/libavs.so.0"
     func = ctypes.CFUNCTYPE
 elif 'darwin' in sys.platform: # macOS will have 'darwin'
-    lib = ctypes.CDLL("/usr/local/lib/libavs.0.dylib")
+    LIBRARY_PATH = "/usr/local/lib/libavs.0.dylib"
     func = ctypes.CFUNCTYPE
 else: # Windows will have 'win32' or 'cygwin'
     import ctypes.wintypes
     if (ctypes.sizeof(ctypes.c_voidp) == 8): # 64 bit
         WM_MEAS_READY = 0x8001
-        lib = ctypes.WinDLL("./avaspecx64.dll")
-        func = ctypes.WINFUNCTYPE
+        LIBRARY_PATH = "./avaspecx64.dll"
     else:
         WM_MEAS_READY = 0x0401
-        lib = ctypes.WinDLL("./avaspec.dll")
-        func = ctypes.WINFUNCTYPE
-
-class AvsIdentityType(ctypes.Structure):
-  _pack_ = 1
-  _fields_ = [("SerialNumber", ctypes.c_char * AVS_SERIAL_LEN),
-              ("UserFriendlyName", ctypes.c_char * USER_ID_LEN),
-              ("Status", ctypes.c_char)]
-
-class BroadcastAnswerType(ctypes.Structure):
-  _pack_ = 1
-  _fields_ = [("InterfaceType", ctypes.c_uint8),
-              ("serial", ctypes.c_char * AVS_SERIAL_LEN),
-              ("port", ctypes.c_uint16),
-              ("status", ctypes.c_uint8),
-              ("RemoteHostIp", ctypes.c_uint32),
-              ("LocalIp", ctypes.c_uint32),
-              ("reserved", ctypes.c_uint8 * 4)]
-
-class MeasConfigType(ctypes.Structure):
-  _pack_ = 1
-  _fields_ = [("m_StartPixel", ctypes.c_uint16),
-              ("m_StopPixel", ctypes.c_uint16),
-              ("m_IntegrationTime", ctypes.c_float),
-              ("m_IntegrationDelay", ctypes.c_uint32),
-              ("m_NrAverages", ctypes.c_uint32),
-              ("m_CorDynDark_m_Enable", ctypes.c_uint8), # nesting of types does NOT work!!
-              ("m_CorDynDark_m_ForgetPercentage", ctypes.c_uint8),
-              ("m_Smoothing_m_SmoothPix", ctypes.c_uint16),
-              ("m_Smoothing_m_SmoothModel", ctypes.c_uint8),
-              ("m_SaturationDetection", ctypes.c_uint8),
-              ("m_Trigger_m_Mode", ctypes.c_uint8),
-              ("m_Trigger_m_Source", ctypes.c_uint8),
-              ("m_Trigger_m_SourceType", ctypes.c_uint8),
-              ("m_Control_m_StrobeControl", ctypes.c_uint16),
-              ("m_Control_m_LaserDelay", ctypes.c_uint32),
-              ("m_Control_m_LaserWidth", ctypes.c_uint32),
-              ("m_Control_m_LaserWaveLength", ctypes.c_float),
-              ("m_Control_m_StoreToRam", ctypes.c_uint16)]
-
-class DeviceConfigType(ctypes.Structure):
-  _pack_ = 1
-  _fields_ = [("m_Len", ctypes.c_uint16),
-              ("m_ConfigVersion", ctypes.c_uint16),
-              ("m_aUserFriendlyId", ctypes.c_char * USER_ID_LEN),
-              ("m_Detector_m_SensorType", ctypes.c_uint8),                      
-              ("m_Detector_m_NrPixels", ctypes.c_uint16),
-              ("m_Detector_m_aFit", ctypes.c_float * 5),
-              ("m_Detector_m_NLEnable", ctypes.c_bool),
-              ("m_Detector_m_aNLCorrect", ctypes.c_double * 8),
-              ("m_Detector_m_aLowNLCounts", ctypes.c_double),
-              ("m_Detector_m_aHighNLCounts", ctypes.c_double),
-              ("m_Detector_m_Gain", ctypes.c_float * 2),
-              ("m_Detector_m_Reserved", ctypes.c_float),
-              ("m_Detector_m_Offset", ctypes.c_float * 2),
-              ("m_Detector_m_ExtOffset", ctypes.c_float),
-              ("m_Detector_m_DefectivePixels", ctypes.c_uint16 * 30),
-              ("m_Irradiance_m_IntensityCalib_m_Smoothing_m_SmoothPix", ctypes.c_uint16),
-              ("m_Irradiance_m_IntensityCalib_m_Smoothing_m_SmoothModel", ctypes.c_uint8),
-              ("m_Irradiance_m_IntensityCalib_m_CalInttime", ctypes.c_float),
-              ("m_Irradiance_m_IntensityCalib_m_aCalibConvers", ctypes.c_float * 4096),
-              ("m_Irradiance_m_CalibrationType", ctypes.c_uint8),
-              ("m_Irradiance_m_FiberDiameter", ctypes.c_uint32),  
-              ("m_Reflectance_m_Smoothing_m_SmoothPix", ctypes.c_uint16),
-              ("m_Reflectance_m_Smoothing_m_SmoothModel", ctypes.c_uint8),
-              ("m_Reflectance_m_CalInttime", ctypes.c_float),
-              ("m_Reflectance_m_aCalibConvers", ctypes.c_float * 4096),
-              ("m_SpectrumCorrect", ctypes.c_float * 4096),
-              ("m_StandAlone_m_Enable", ctypes.c_bool),
-              ("m_StandAlone_m_Meas_m_StartPixel", ctypes.c_uint16),
-              ("m_StandAlone_m_Meas_m_StopPixel", ctypes.c_uint16),
-              ("m_StandAlone_m_Meas_m_IntegrationTime", ctypes.c_float),
-              ("m_StandAlone_m_Meas_m_IntegrationDelay", ctypes.c_uint32),
-              ("m_StandAlone_m_Meas_m_NrAverages", ctypes.c_uint32),
-              ("m_StandAlone_m_Meas_m_CorDynDark_m_Enable", ctypes.c_uint8), 
-              ("m_StandAlone_m_Meas_m_CorDynDark_m_ForgetPercentage", ctypes.c_uint8),
-              ("m_StandAlone_m_Meas_m_Smoothing_m_SmoothPix", ctypes.c_uint16),
-              ("m_StandAlone_m_Meas_m_Smoothing_m_SmoothModel", ctypes.c_uint8),
-              ("m_StandAlone_m_Meas_m_SaturationDetection", ctypes.c_uint8),
-              ("m_StandAlone_m_Meas_m_Trigger_m_Mode", ctypes.c_uint8),
-              ("m_StandAlone_m_Meas_m_Trigger_m_Source", ctypes.c_uint8),
-              ("m_StandAlone_m_Meas_m_Trigger_m_SourceType", ctypes.c_uint8),
-              ("m_StandAlone_m_Meas_m_Control_m_StrobeControl", ctypes.c_uint16),
-              ("m_StandAlone_m_Meas_m_Control_m_LaserDelay", ctypes.c_uint32),
-              ("m_StandAlone_m_Meas_m_Control_m_LaserWidth", ctypes.c_uint32),
-              ("m_StandAlone_m_Meas_m_Control_m_LaserWaveLength", ctypes.c_float),
-              ("m_StandAlone_m_Meas_m_Control_m_StoreToRam", ctypes.c_uint16),
-              ("m_StandAlone_m_Nmsr", ctypes.c_int16),
-              ("m_DynamicStorage", ctypes.c_uint8 * 12), # ex SD Card, do not use
-              ("m_Temperature_1_m_aFit", ctypes.c_float * 5),
-              ("m_Temperature_2_m_aFit", ctypes.c_float * 5),
-              ("m_Temperature_3_m_aFit", ctypes.c_float * 5),
-              ("m_TecControl_m_Enable", ctypes.c_bool),
-              ("m_TecControl_m_Setpoint", ctypes.c_float),
-              ("m_TecControl_m_aFit", ctypes.c_float * 2),
-              ("m_ProcessControl_m_AnalogLow", ctypes.c_float * 2),
-              ("m_ProcessControl_m_AnalogHigh", ctypes.c_float * 2),
-              ("m_ProcessControl_m_DigitalLow", ctypes.c_float * 10),
-              ("m_ProcessControl_m_DigitalHigh", ctypes.c_float * 10),
-              ("m_EthernetSettings_m_IpAddr", ctypes.c_uint32),
-              ("m_EthernetSettings_m_NetMask", ctypes.c_uint32),
-              ("m_EthernetSettings_m_Gateway", ctypes.c_uint32), 
-              ("m_EthernetSettings_m_DhcpEnabled", ctypes.c_uint8), 
-              ("m_EthernetSettings_m_TcpPort", ctypes.c_uint16),
-              ("m_EthernetSettings_m_LinkStatus", ctypes.c_uint8),
-              ("m_EthernetSettings_m_ClientIdType", ctypes.c_uint8),
-              ("m_EthernetSettings_m_ClientIdCustom", ctypes.c_char * 32),
-              ("m_EthernetSettings_m_Reserved", ctypes.c_uint8 * 79),
-              ("m_Reserved", ctypes.c_uint8 * 9608),
-              ("m_OemData", ctypes.c_uint8 * 4096)]
-
-class DstrStatusType(ctypes.Structure):
-  _pack_ = 1
-  _fields_ = [("m_TotalScans", ctypes.c_uint32),
-              ("m_UsedScans", ctypes.c_uint32),
-              ("m_Flags", ctypes.c_uint32),
-              ("m_IsStopEvent", ctypes.c_uint8),
-              ("m_IsOverflowEvent", ctypes.c_uint8),
-              ("m_IsInternalErrorEvent", ctypes.c_uint8),
-              ("m_Reserved", ctypes.c_uint8)]
+        LIBRARY_PATH = "./avaspec.dll"
+    func = ctypes.WINFUNCTYPE
+
+def _lib():
+    """
+    Returns the loaded AvaSpec library, loading it on first use.
+    
+    :return: ctypes library handle (CDLL on Linux/macOS, WinDLL on Windows)
+    """
+    global _library
+    if _library is None:
+        if func is ctypes.CFUNCTYPE:
+            _library = ctypes.CDLL(LIBRARY_PATH)
+        else:
+            _library = ctypes.WinDLL(LIBRARY_PATH)
+    return _library
 
 def AVS_Init(a_Port = 0):
     """
@@ -179,7 +54,7 @@ def AVS_Init(a_Port = 0):
     """    
     prototype = func(ctypes.c_int, ctypes.c_int)
     paramflags = (1, "port",),
-    AVS_Init = prototype(("AVS_Init", lib), paramflags)
+    AVS_Init = prototype(("AVS_Init", _lib()), paramflags)
     ret = AVS_Init(a_Port) 
     return ret 
 
@@ -190,7 +65,7 @@ def AVS_Done():
     :return: SUCCESS = 0
     """
     prototype = func(ctypes.c_int)
-    AVS_Done = prototype(("AVS_Done",lib),)
+    AVS_Done = prototype(("AVS_Done", _lib()),)
     ret = AVS_Done()
     return ret  
 
@@ -202,7 +77,7 @@ def AVS_GetNrOfDevices():
     :return: Number of devices found.
     """
     prototype = func(ctypes.c_int)
-    AVS_GetNrOfDevices = prototype(("AVS_GetNrOfDevices", lib),)
+    AVS_GetNrOfDevices = prototype(("AVS_GetNrOfDevices", _lib()),)
     ret = AVS_GetNrOfDevices()
     return ret
 
@@ -215,7 +90,7 @@ def AVS_UpdateUSBDevices():
     :return: Number of devices found.    
     """
     prototype = func(ctypes.c_int)
-    AVS_UpdateUSBDevices = prototype(("AVS_UpdateUSBDevices", lib),)
+    AVS_UpdateUSBDevices = prototype(("AVS_UpdateUSBDevices", _lib()),)
     ret = AVS_UpdateUSBDevices()
     return ret
 
@@ -229,7 +104,7 @@ def AVS_UpdateETHDevices(spectrometers = 1):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(BroadcastAnswerType*spectrometers))
     paramflags = (1, "listsize",), (2, "requiredsize",), (2, "ETHlist",),
-    PT_AVS_UpdateETHDevices = prototype(("AVS_UpdateETHDevices", lib), paramflags)
+    PT_AVS_UpdateETHDevices = prototype(("AVS_UpdateETHDevices", _lib()), paramflags)
     reqBufferSize, ETHlist = PT_AVS_UpdateETHDevices(spectrometers*26)
     if reqBufferSize != spectrometers*26:
         ETHlist = AVS_UpdateETHDevices(reqBufferSize//26)
@@ -248,7 +123,7 @@ def AVS_GetList(spectrometers = 1):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(AvsIdentityType*spectrometers))
     paramflags = (1, "listsize",), (2, "requiredsize",), (2, "IDlist",),
-    PT_GetList = prototype(("AVS_GetList", lib), paramflags)
+    PT_GetList = prototype(("AVS_GetList", _lib()), paramflags)
     reqBufferSize, spectrometerList = PT_GetList(spectrometers*75)
     if reqBufferSize != spectrometers*75:
         spectrometerList = AVS_GetList(reqBufferSize//75)
@@ -265,7 +140,7 @@ def AVS_GetHandleFromSerial(deviceSerial):
     """
     prototype = func(ctypes.c_int, ctypes.c_char_p)
     paramflags = (1, "deviceSerial",),
-    AVS_Activate = prototype(("AVS_Activate", lib), paramflags)
+    AVS_Activate = prototype(("AVS_Activate", _lib()), paramflags)
     if type(deviceSerial) is str:
         deviceSerial = deviceSerial.encode("utf-8")
     ret = AVS_Activate(deviceSerial)
@@ -293,7 +168,7 @@ def AVS_Activate(deviceId):
     temp[74] = int.from_bytes(deviceId.Status, byteorder='big')  #  cannot assign directly here
     prototype = func(ctypes.c_int, ctypes.c_byte * 75)
     paramflags = (1, "deviceId",),
-    AVS_Activate = prototype(("AVS_Activate", lib), paramflags)
+    AVS_Activate = prototype(("AVS_Activate", _lib()), paramflags)
     ret = AVS_Activate(temp)
     return ret
 
@@ -307,7 +182,7 @@ def AVS_Deactivate(handle):
     prototype = func(ctypes.c_bool, ctypes.c_int)
     prototype.restype = ctypes.c_bool
     paramflags = (1, "handle",),
-    AVS_Deactivate = prototype(("AVS_Deactivate", lib), paramflags)
+    AVS_Deactivate = prototype(("AVS_Deactivate", _lib()), paramflags)
     ret = AVS_Deactivate(handle)
     return ret 
 
@@ -322,7 +197,7 @@ def AVS_UseHighResAdc(handle, enable):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_bool)
     paramflags = (1, "handle",), (1, "enable",),
-    AVS_UseHighResAdc = prototype(("AVS_UseHighResAdc", lib), paramflags)
+    AVS_UseHighResAdc = prototype(("AVS_UseHighResAdc", _lib()), paramflags)
     ret = AVS_UseHighResAdc(handle, enable)
     return ret
 
@@ -336,7 +211,7 @@ def AVS_GetVersionInfo(handle):
     """       
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_char * VERSION_LEN, ctypes.c_char * VERSION_LEN, ctypes.c_char * VERSION_LEN)
     paramflags = (1, "handle",), (2, "FPGAversion",), (2, "FWversion",), (2, "DLLversion",),
-    AVS_GetVersionInfo = prototype(("AVS_GetVersionInfo", lib), paramflags) 
+    AVS_GetVersionInfo = prototype(("AVS_GetVersionInfo", _lib()), paramflags) 
     ret = AVS_GetVersionInfo(handle)
     return ret    
 
@@ -349,7 +224,7 @@ def AVS_PrepareMeasure(handle, measconf):
     """    
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(MeasConfigType))
     paramflags = (1, "handle",), (1, "measconf",),  
-    AVS_PrepareMeasure = prototype(("AVS_PrepareMeasure", lib), paramflags)
+    AVS_PrepareMeasure = prototype(("AVS_PrepareMeasure", _lib()), paramflags)
     ret = AVS_PrepareMeasure(handle, measconf)
     return ret
 
@@ -372,15 +247,10 @@ def AVS_Measure(handle, windowhandle, nummeas):
     else:
         prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_uint16)
     paramflags = (1, "handle",), (1, "windowhandle",), (1, "nummeas"),
-    AVS_Measure = prototype(("AVS_Measure", lib), paramflags)
+    AVS_Measure = prototype(("AVS_Measure", _lib()), paramflags)
     ret = AVS_Measure(handle, windowhandle, nummeas) 
     return ret
 
-class AVS_MeasureCallbackFunc(object):
-    def __init__(self, function):
-        self.prototype = ctypes.CFUNCTYPE(None, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int))
-        self.callback = self.prototype(function)    
-
 def AVS_MeasureCallback(handle, cb, nummeas):
     """
     Starts measurement on the spectrometer, variant used with callbacks
@@ -394,15 +264,10 @@ def AVS_MeasureCallback(handle, cb, nummeas):
     """    
     prototype = func(ctypes.c_int, ctypes.c_int, cb.prototype, ctypes.c_uint16)
     paramflags = (1, "handle",), (1, "adres",), (1, "nummeas"),
-    AVS_MeasureCallback = prototype(("AVS_MeasureCallback", lib), paramflags)
+    AVS_MeasureCallback = prototype(("AVS_MeasureCallback", _lib()), paramflags)
     ret = AVS_MeasureCallback(handle, cb.callback, nummeas)
     return ret
 
-class AVS_DstrCallbackFunc(object):
-    def __init__(self, function):
-        self.prototype = ctypes.CFUNCTYPE(None, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_uint))
-        self.callback = self.prototype(function)
-
 def AVS_SetDstrStatusCallback(handle, cb):
     """    
     Sets the address of the callback function the library will call periodically when
@@ -415,7 +280,7 @@ def AVS_SetDstrStatusCallback(handle, cb):
     """    
     prototype = func(ctypes.c_int, ctypes.c_int, cb.prototype)
     paramflags = (1, "handle",), (1, "adres",), 
-    AVS_SetDstrStatusCallback = prototype(("AVS_SetDstrStatusCallback", lib), paramflags)
+    AVS_SetDstrStatusCallback = prototype(("AVS_SetDstrStatusCallback", _lib()), paramflags)
     ret = AVS_SetDstrStatusCallback(handle, cb.callback)
     return ret
 
@@ -428,7 +293,7 @@ def AVS_GetDstrStatus(handle):
     """      
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(DstrStatusType))
     paramflags = (1, "handle",), (2, "dstrstatus",),
-    AVS_GetDstrStatus = prototype(("AVS_GetDstrStatus", lib), paramflags)
+    AVS_GetDstrStatus = prototype(("AVS_GetDstrStatus", _lib()), paramflags)
     ret = AVS_GetDstrStatus(handle)
     return ret
 
@@ -441,7 +306,7 @@ def AVS_StopMeasure(handle):
     """      
     prototype = func(ctypes.c_int, ctypes.c_int)
     paramflags = (1, "handle",),
-    AVS_StopMeasure = prototype(("AVS_StopMeasure", lib), paramflags)
+    AVS_StopMeasure = prototype(("AVS_StopMeasure", _lib()), paramflags)
     ret = AVS_StopMeasure(handle)
     return ret
 
@@ -454,7 +319,7 @@ def AVS_PollScan(handle):
     """  
     prototype = func(ctypes.c_bool, ctypes.c_int)
     paramflags = (1, "handle",),
-    AVS_PollScan = prototype(("AVS_PollScan", lib), paramflags)
+    AVS_PollScan = prototype(("AVS_PollScan", _lib()), paramflags)
     ret = AVS_PollScan(handle)
     return ret
     
@@ -470,7 +335,7 @@ def AVS_GetScopeData(handle):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_uint32), ctypes.POINTER(ctypes.c_double * 4096))
     paramflags = (1, "handle",), (2, "timelabel",), (2, "spectrum",),
-    AVS_GetScopeData = prototype(("AVS_GetScopeData", lib), paramflags)
+    AVS_GetScopeData = prototype(("AVS_GetScopeData", _lib()), paramflags)
     timestamp, spectrum = AVS_GetScopeData(handle)
     return timestamp, spectrum
 
@@ -484,7 +349,7 @@ def AVS_GetSaturatedPixels(handle):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_uint8 * 4096))    
     paramflags = (1, "handle",), (2, "saturated",),
-    AVS_GetSaturatedPixels = prototype(("AVS_GetSaturatedPixels", lib), paramflags)
+    AVS_GetSaturatedPixels = prototype(("AVS_GetSaturatedPixels", _lib()), paramflags)
     saturated = AVS_GetSaturatedPixels(handle)
     return saturated 
 
@@ -499,7 +364,7 @@ def AVS_GetLambda(handle):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_double * 4096))
     paramflags = (1, "handle",), (2, "wavelength",),
-    AVS_GetLambda = prototype(("AVS_GetLambda", lib), paramflags)
+    AVS_GetLambda = prototype(("AVS_GetLambda", _lib()), paramflags)
     ret = AVS_GetLambda(handle)
     return ret
 
@@ -513,7 +378,7 @@ def AVS_GetNumPixels(handle):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_short))
     paramflags = (1, "handle",), (2, "numPixels",),
-    AVS_GetNumPixels = prototype(("AVS_GetNumPixels",lib), paramflags)
+    AVS_GetNumPixels = prototype(("AVS_GetNumPixels", _lib()), paramflags)
     ret = AVS_GetNumPixels(handle)
     return ret    
 
@@ -527,7 +392,7 @@ def AVS_GetDigIn(handle, portId):
     """    
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_uint8, ctypes.POINTER(ctypes.c_uint8))
     paramflags = (1, "handle",), (1, "portId",), (2, "value",),
-    AVS_GetDigIn = prototype(("AVS_GetDigIn", lib), paramflags)
+    AVS_GetDigIn = prototype(("AVS_GetDigIn", _lib()), paramflags)
     ret = AVS_GetDigIn(handle, portId) 
     return ret
 
@@ -542,7 +407,7 @@ def AVS_SetDigOut(handle, portId, value):
     """       
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_uint8, ctypes.c_uint8)
     paramflags = (1, "handle",), (1, "portId",), (1, "value",),
-    AVS_SetDigOut = prototype(("AVS_SetDigOut", lib), paramflags)
+    AVS_SetDigOut = prototype(("AVS_SetDigOut", _lib()), paramflags)
     ret = AVS_SetDigOut(handle, portId, value)
     return ret
 
@@ -558,7 +423,7 @@ def AVS_SetPwmOut(handle, portId, frequency, dutycycle):
     """       
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_uint8, ctypes.c_uint32, ctypes.c_uint8)
     paramflags = (1, "handle",), (1, "portId",), (1, "frequency",), (1, "dutycycle",),
-    AVS_SetPwmOut = prototype(("AVS_SetPwmOut", lib), paramflags)
+    AVS_SetPwmOut = prototype(("AVS_SetPwmOut", _lib()), paramflags)
     ret = AVS_SetPwmOut(handle, portId, frequency, dutycycle)
     return ret    
 
@@ -572,7 +437,7 @@ def AVS_GetAnalogIn(handle, portId):
     """      
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_uint8, ctypes.POINTER(ctypes.c_float))
     paramflags = (1, "handle",), (1, "portId",), (2, "value",),
-    AVS_GetAnalogIn = prototype(("AVS_GetAnalogIn", lib), paramflags)
+    AVS_GetAnalogIn = prototype(("AVS_GetAnalogIn", _lib()), paramflags)
     ret = AVS_GetAnalogIn(handle, portId)
     return ret
 
@@ -587,7 +452,7 @@ def AVS_SetAnalogOut(handle, portId, value):
     """      
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_uint8, ctypes.c_float)
     paramflags = (1, "handle",), (1, "portId",), (1, "value",),
-    AVS_SetAnalogOut = prototype(("AVS_SetAnalogOut", lib), paramflags)
+    AVS_SetAnalogOut = prototype(("AVS_SetAnalogOut", _lib()), paramflags)
     ret = AVS_SetAnalogOut(handle, portId, value)
     return ret
 
@@ -601,7 +466,7 @@ def AVS_GetParameter(handle, size = 63484):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_uint32, ctypes.POINTER(ctypes.c_uint32), ctypes.POINTER(DeviceConfigType))
     paramflags = (1, "handle",), (1, "size",), (2, "reqsize",), (2, "deviceconfig",),
-    AVS_GetParameter = prototype(("AVS_GetParameter", lib), paramflags)
+    AVS_GetParameter = prototype(("AVS_GetParameter", _lib()), paramflags)
     ret = AVS_GetParameter(handle, size)
     if ret[0] != size:
         ret = AVS_GetParameter(ret[0])
@@ -618,7 +483,7 @@ def AVS_SetParameter(handle, deviceconfig):
     """   
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(DeviceConfigType))
     paramflags = (1, "handle",), (1, "deviceconfig",),  
-    AVS_SetParameter = prototype(("AVS_SetParameter", lib), paramflags)
+    AVS_SetParameter = prototype(("AVS_SetParameter", _lib()), paramflags)
     ret = AVS_SetParameter(handle, deviceconfig)
     return ret
 
@@ -632,7 +497,7 @@ def AVS_ResetParameter(handle):
     """       
     prototype = func(ctypes.c_int, ctypes.c_int)
     paramflags = (1, "handle",),
-    AVS_ResetParameter = prototype(("AVS_ResetParameter", lib), paramflags)
+    AVS_ResetParameter = prototype(("AVS_ResetParameter", _lib()), paramflags)
     ret = AVS_ResetParameter(handle)
     return ret 
 
@@ -650,7 +515,7 @@ def AVS_SetSyncMode(handle, enable):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_bool)
     paramflags = (1, "handle",), (1, "enable",),
-    AVS_SetSyncMode = prototype(("AVS_SetSyncMode", lib), paramflags)
+    AVS_SetSyncMode = prototype(("AVS_SetSyncMode", _lib()), paramflags)
     ret = AVS_SetSyncMode(handle, enable)
     return ret
 
@@ -663,7 +528,7 @@ def AVS_GetDeviceType(handle):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_byte))
     paramflags = (1, "handle",), (2, "devicetype",),
-    AVS_GetDeviceType = prototype(("AVS_GetDeviceType",lib), paramflags)
+    AVS_GetDeviceType = prototype(("AVS_GetDeviceType", _lib()), paramflags)
     ret = AVS_GetDeviceType(handle)
     return ret 
 
@@ -677,7 +542,7 @@ def AVS_GetDetectorName(handle, SensorType):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_byte, ctypes.c_char * DETECTOR_NAME_LEN)
     paramflags = (1, "handle",), (1, "SensorType",), (2, "SensorName",), 
-    AVS_GetDetectorName = prototype(("AVS_GetDetectorName", lib), paramflags) 
+    AVS_GetDetectorName = prototype(("AVS_GetDetectorName", _lib()), paramflags) 
     ret = AVS_GetDetectorName(handle, SensorType)
     return ret 
 
@@ -690,7 +555,7 @@ def AVS_SetSensitivityMode(handle, enable):
     """
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_uint32)
     paramflags = (1, "handle",), (1, "enable",),
-    AVS_SetSensitivityMode = prototype(("AVS_SetSensitivityMode", lib), paramflags)
+    AVS_SetSensitivityMode = prototype(("AVS_SetSensitivityMode", _lib()), paramflags)
     ret = AVS_SetSensitivityMode(handle, enable)
     return ret
 
@@ -703,7 +568,7 @@ def AVS_SetPrescanMode(handle, enable):
     """    
     prototype = func(ctypes.c_int, ctypes.c_int, ctypes.c_bool)
     paramflags = (1, "handle",), (1, "enable",),
-    AVS_SetPrescanMode = prototype(("AVS_SetPrescanMode", lib), paramflags)
+    AVS_SetPrescanMode = prototype(("AVS_SetPrescanMode", _lib()), paramflags)
     ret = AVS_SetPrescanMode(handle, enable)
     return ret
 
@@ -716,7 +581,7 @@ def AVS_ResetDevice(handle):
     """     
     prototype = func(ctypes.c_int, ctypes.c_int)
     paramflags = (1, "handle",),
-    AVS_ResetDevice = prototype(("AVS_ResetDevice", lib), paramflags)
+    AVS_ResetDevice = prototype(("AVS_ResetDevice", _lib()), paramflags)
     ret = AVS_ResetDevice(handle)
     return ret
 
@@ -730,6 +595,6 @@ def AVS_EnableLogging(enable):
     """    
     prototype = func(ctypes.c_int, ctypes.c_bool)
     paramflags = (1, "enable",),
-    AVS_EnableLogging = prototype(("AVS_EnableLogging", lib), paramflags)
+    AVS_EnableLogging = prototype(("AVS_EnableLogging", _lib()), paramflags)
     ret = AVS_EnableLogging(enable)    
     return ret    
\ No newline at end of file
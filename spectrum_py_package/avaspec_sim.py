@@ -0,0 +1,401 @@
+# avaspec_sim.py
+# 模擬 AvaSpec 函式庫：提供與 avaspec.py 相同名稱的 AVS_* 函式，
+# 以合成光譜取代實體光譜儀，讓擷取與儲存流程可在任何 Linux 主機上測試與效能評估
+import ctypes
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .avaspec_types import *
+
+# 模擬器使用的錯誤碼（與 AvaSpec 函式庫定義一致）
+ERR_INVALID_PARAMETER = -1
+ERR_DEVICE_NOT_FOUND = -3
+ERR_INVALID_DEVICE_ID = -4
+ERR_OPERATION_PENDING = -5
+ERR_INVALID_MEAS_DATA = -8
+ERR_INVALID_PIXEL_RANGE = -10
+ERR_INVALID_INT_TIME = -11
+
+# 16 bit ADC 的最大計數值
+ADC_MAX_COUNTS = 65535.0
+
+
+@dataclass
+class SimSettings:
+    # 模擬連接的光譜儀數量
+    n_devices: int = 1
+
+    # 每台光譜儀的像素數量
+    pixels: int = 2048
+
+    # 波長範圍（nm），依像素線性分佈後加上少量二次項
+    wavelength_start: float = 200.0
+    wavelength_end: float = 1100.0
+
+    # 最高掃描速率（Hz），實際速率另受積分時間 × 平均次數限制
+    scan_rate_hz: float = 20.0
+
+    # 飽和計數值，超過即截斷並標記為飽和像素
+    saturation_level: float = ADC_MAX_COUNTS
+
+    # 暗電流基準與雜訊標準差（計數值）
+    dark_level: float = 1000.0
+    noise_std: float = 15.0
+
+    # 發射峰 (中心波長 nm, 半高寬 nm, 每毫秒計數)
+    peaks: list = field(default_factory=lambda: [(486.1, 2.0, 300.0),
+                                                 (656.3, 3.0, 500.0),
+                                                 (810.0, 8.0, 120.0)])
+
+    # 峰強度緩慢漂移的相對幅度與週期（秒）
+    drift_amplitude: float = 0.05
+    drift_period_s: float = 30.0
+
+    # DynamicStoreToRam 緩衝區可存放的掃描數
+    dstr_capacity: int = 64
+
+    # 亂數種子（None 表示不固定）
+    seed: int = None
+
+
+settings = SimSettings()
+
+
+def configure(**kwargs):
+    """更新模擬器設定，須在 AVS_Init() 之前呼叫"""
+    for key, value in kwargs.items():
+        if not hasattr(settings, key):
+            raise AttributeError(f"未知的模擬器設定: {key}")
+        setattr(settings, key, value)
+    return settings
+
+
+class _SimDevice:
+    """單一模擬光譜儀的內部狀態"""
+
+    def __init__(self, index, cfg):
+        self.index = index
+        self.serial = f"SIM{index + 1:06d}".encode("utf-8")
+        self.pixels = min(cfg.pixels, MAX_NR_PIXELS)
+        self.active = False
+        self.measconfig = None
+        self.measure_cb = None
+        self.dstr_cb = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.start_time = time.perf_counter()
+        self.rng = np.random.default_rng(None if cfg.seed is None else cfg.seed + index)
+
+        # 波長軸：以二次多項式模擬光柵色散，各裝置略有偏移
+        x = np.arange(self.pixels, dtype=np.float64)
+        span = cfg.wavelength_end - cfg.wavelength_start
+        self.fit = np.array([cfg.wavelength_start + 0.3 * index,
+                             span / max(self.pixels - 1, 1) * 1.02,
+                             -0.02 * span / max(self.pixels - 1, 1) ** 2,
+                             0.0, 0.0])
+        self.wavelength = self.fit[0] + self.fit[1] * x + self.fit[2] * x ** 2
+
+        # 平滑連續背景（以高斯形狀模擬光源與偵測器響應）
+        center = cfg.wavelength_start + 0.55 * span
+        self.continuum = 40.0 * np.exp(-0.5 * ((self.wavelength - center) / (0.25 * span)) ** 2)
+        self.peak_shapes = np.array([
+            amp * np.exp(-0.5 * ((self.wavelength - c) / (w / 2.3548)) ** 2)
+            for c, w, amp in cfg.peaks
+        ]).reshape(len(cfg.peaks), self.pixels)
+
+        self.reset_buffers()
+
+    def reset_buffers(self):
+        self.latest = None
+        self.latest_saturated = np.zeros(self.pixels, dtype=np.uint8)
+        self.data_ready = False
+        self.scans = 0
+        self.dstr_mode = False
+        self.dstr_ram = deque()
+        self.dstr_flags = 0
+
+    def synth_spectrum(self, cfg):
+        """依目前量測設定產生一筆合成光譜（計數值）與飽和遮罩"""
+        mc = self.measconfig
+        inttime = float(mc.m_IntegrationTime)
+        averages = max(int(mc.m_NrAverages), 1)
+        t = time.perf_counter() - self.start_time
+
+        phase = 2 * np.pi * t / cfg.drift_period_s
+        drift = 1.0 + cfg.drift_amplitude * np.sin(phase + np.arange(len(self.peak_shapes)))
+        signal = (self.continuum + drift @ self.peak_shapes) * inttime
+        noise = self.rng.normal(0.0, cfg.noise_std / np.sqrt(averages), self.pixels)
+        counts = cfg.dark_level + signal + noise
+
+        saturated = counts >= cfg.saturation_level
+        counts = np.clip(counts, 0.0, cfg.saturation_level)
+
+        # 只回傳量測設定範圍內的像素，其餘保持為 0
+        start, stop = int(mc.m_StartPixel), int(mc.m_StopPixel)
+        spectrum = np.zeros(self.pixels)
+        spectrum[start:stop + 1] = counts[start:stop + 1]
+        mask = np.zeros(self.pixels, dtype=np.uint8)
+        if mc.m_SaturationDetection:
+            mask[start:stop + 1] = saturated[start:stop + 1]
+        return spectrum, mask
+
+    def scan_period(self, cfg):
+        mc = self.measconfig
+        hardware = float(mc.m_IntegrationTime) * max(int(mc.m_NrAverages), 1) / 1000.0
+        return max(hardware, 1.0 / cfg.scan_rate_hz)
+
+
+_state = {"initialized": False, "devices": []}
+
+
+def _device(handle):
+    devices = _state["devices"]
+    if not isinstance(handle, int) or handle < 0 or handle >= len(devices):
+        return None
+    dev = devices[handle]
+    return dev if dev.active else None
+
+
+def _measure_worker(dev, nummeas):
+    """背景執行緒：依掃描週期產生光譜並通知呼叫端"""
+    cfg = settings
+    period = dev.scan_period(cfg)
+    next_time = time.perf_counter()
+    while not dev.stop_event.is_set() and (nummeas < 0 or dev.scans < nummeas):
+        next_time += period
+        delay = next_time - time.perf_counter()
+        if delay > 0 and dev.stop_event.wait(delay):
+            break
+
+        spectrum, mask = dev.synth_spectrum(cfg)
+        ticks = int((time.perf_counter() - dev.start_time) * 1e5)
+        overflow = False
+        with dev.lock:
+            dev.scans += 1
+            if dev.dstr_mode:
+                if len(dev.dstr_ram) >= cfg.dstr_capacity:
+                    dev.dstr_flags |= DSTR_STATUS_FOE_MASK
+                    overflow = True
+                else:
+                    dev.dstr_ram.append((ticks, spectrum, mask))
+            else:
+                dev.latest = (ticks, spectrum)
+                dev.latest_saturated = mask
+            dev.data_ready = True
+
+        if overflow:
+            _notify_dstr(dev)
+            continue
+        if dev.measure_cb is not None:
+            dev.measure_cb.callback(ctypes.pointer(ctypes.c_int(dev.index)),
+                                    ctypes.pointer(ctypes.c_int(0)))
+
+    if dev.dstr_mode:
+        with dev.lock:
+            dev.dstr_flags |= DSTR_STATUS_DSS_MASK
+        _notify_dstr(dev)
+
+
+def _notify_dstr(dev):
+    if dev.dstr_cb is not None:
+        dev.dstr_cb.callback(ctypes.pointer(ctypes.c_int(dev.index)),
+                             ctypes.pointer(ctypes.c_uint(dev.dstr_flags)))
+
+
+def _start(dev, cb, nummeas):
+    if dev.measconfig is None:
+        return ERR_INVALID_PARAMETER
+    if dev.thread is not None and dev.thread.is_alive():
+        return ERR_OPERATION_PENDING
+    dev.reset_buffers()
+    dev.measure_cb = cb
+    dev.dstr_mode = nummeas == -2
+    dev.stop_event.clear()
+    dev.thread = threading.Thread(target=_measure_worker, args=(dev, nummeas), daemon=True)
+    dev.thread.start()
+    return 0
+
+
+def AVS_Init(a_Port = 0):
+    """初始化模擬器，回傳模擬的光譜儀數量"""
+    if not _state["initialized"]:
+        _state["devices"] = [_SimDevice(i, settings) for i in range(settings.n_devices)]
+        _state["initialized"] = True
+    return len(_state["devices"])
+
+def AVS_Done():
+    """停止所有量測並釋放模擬裝置"""
+    for dev in _state["devices"]:
+        AVS_StopMeasure(dev.index)
+        dev.active = False
+    _state["devices"] = []
+    _state["initialized"] = False
+    return 0
+
+def AVS_GetNrOfDevices():
+    return len(_state["devices"])
+
+def AVS_UpdateUSBDevices():
+    return len(_state["devices"])
+
+def AVS_GetList(spectrometers = 1):
+    """回傳所有模擬光譜儀的 AvsIdentityType 陣列"""
+    devices = _state["devices"]
+    id_list = (AvsIdentityType * len(devices))()
+    for i, dev in enumerate(devices):
+        id_list[i].SerialNumber = dev.serial
+        id_list[i].UserFriendlyName = b"AvaSpec Simulator " + dev.serial
+        id_list[i].Status = b"\x03" if dev.active else b"\x01"
+    return id_list
+
+def AVS_Activate(deviceId):
+    """啟用模擬光譜儀，回傳其 handle"""
+    for dev in _state["devices"]:
+        if dev.serial == deviceId.SerialNumber:
+            dev.active = True
+            return dev.index
+    return INVALID_AVS_HANDLE_VALUE
+
+def AVS_Deactivate(handle):
+    dev = _device(handle)
+    if dev is None:
+        return False
+    AVS_StopMeasure(handle)
+    dev.active = False
+    return True
+
+def AVS_UseHighResAdc(handle, enable):
+    return 0 if _device(handle) is not None else ERR_INVALID_DEVICE_ID
+
+def AVS_GetVersionInfo(handle):
+    return b"SIM-FPGA", b"SIM-FW", b"SIM-DLL"
+
+def AVS_GetParameter(handle, size = 63484):
+    """回傳模擬光譜儀的 DeviceConfigType"""
+    dev = _device(handle)
+    if dev is None:
+        return None
+    config = DeviceConfigType()
+    config.m_Len = ctypes.sizeof(DeviceConfigType)
+    config.m_aUserFriendlyId = b"AvaSpec Simulator " + dev.serial
+    config.m_Detector_m_SensorType = SENS_HAMS11639
+    config.m_Detector_m_NrPixels = dev.pixels
+    for i, coef in enumerate(dev.fit):
+        config.m_Detector_m_aFit[i] = coef
+    return config
+
+def AVS_GetLambda(handle):
+    """回傳 4096 個元素的波長陣列，超過像素數的部分為 0"""
+    dev = _device(handle)
+    wavelength = (ctypes.c_double * MAX_NR_PIXELS)()
+    if dev is not None:
+        ctypes.memmove(wavelength, dev.wavelength.ctypes.data, dev.wavelength.nbytes)
+    return wavelength
+
+def AVS_GetNumPixels(handle):
+    dev = _device(handle)
+    return dev.pixels if dev is not None else 0
+
+def AVS_PrepareMeasure(handle, measconf):
+    """檢查並保存量測設定"""
+    dev = _device(handle)
+    if dev is None:
+        return ERR_INVALID_DEVICE_ID
+    if measconf.m_StartPixel > measconf.m_StopPixel or measconf.m_StopPixel >= dev.pixels:
+        return ERR_INVALID_PIXEL_RANGE
+    if measconf.m_IntegrationTime <= 0:
+        return ERR_INVALID_INT_TIME
+    config = MeasConfigType()
+    ctypes.pointer(config)[0] = measconf
+    dev.measconfig = config
+    return 0
+
+def AVS_Measure(handle, windowhandle, nummeas):
+    """開始量測（輪詢模式，不使用回呼）"""
+    dev = _device(handle)
+    if dev is None:
+        return ERR_INVALID_DEVICE_ID
+    return _start(dev, None, nummeas)
+
+def AVS_MeasureCallback(handle, cb, nummeas):
+    """
+    開始量測，每筆掃描完成後呼叫 cb。nummeas = -1 為無限次，
+    -2 為 DynamicStoreToRam 模式
+    """
+    dev = _device(handle)
+    if dev is None:
+        return ERR_INVALID_DEVICE_ID
+    return _start(dev, cb, nummeas)
+
+def AVS_SetDstrStatusCallback(handle, cb):
+    dev = _device(handle)
+    if dev is None:
+        return ERR_INVALID_DEVICE_ID
+    dev.dstr_cb = cb
+    return 0
+
+def AVS_GetDstrStatus(handle):
+    """回傳 DynamicStoreToRam 緩衝區狀態"""
+    dev = _device(handle)
+    status = DstrStatusType()
+    if dev is None:
+        return status
+    with dev.lock:
+        status.m_TotalScans = settings.dstr_capacity
+        status.m_UsedScans = len(dev.dstr_ram)
+        status.m_Flags = dev.dstr_flags
+        status.m_IsStopEvent = int(bool(dev.dstr_flags & DSTR_STATUS_DSS_MASK))
+        status.m_IsOverflowEvent = int(bool(dev.dstr_flags & DSTR_STATUS_FOE_MASK))
+    return status
+
+def AVS_StopMeasure(handle):
+    dev = _device(handle)
+    if dev is None:
+        return ERR_INVALID_DEVICE_ID
+    dev.stop_event.set()
+    if dev.thread is not None and dev.thread is not threading.current_thread():
+        dev.thread.join(timeout=1.0)
+    dev.thread = None
+    return 0
+
+def AVS_PollScan(handle):
+    dev = _device(handle)
+    if dev is None:
+        return False
+    with dev.lock:
+        return bool(dev.dstr_ram) if dev.dstr_mode else dev.data_ready
+
+def AVS_GetScopeData(handle):
+    """
+    回傳 (timestamp, spectrum)：timestamp 以 10 微秒為單位，
+    spectrum 為 4096 個元素的 c_double 陣列
+    """
+    dev = _device(handle)
+    spectrum = (ctypes.c_double * MAX_NR_PIXELS)()
+    if dev is None:
+        return 0, spectrum
+    with dev.lock:
+        if dev.dstr_mode and dev.dstr_ram:
+            ticks, data, mask = dev.dstr_ram.popleft()
+            dev.latest_saturated = mask
+        elif dev.latest is not None:
+            ticks, data = dev.latest
+        else:
+            return 0, spectrum
+        dev.data_ready = bool(dev.dstr_ram)
+    ctypes.memmove(spectrum, data.ctypes.data, data.nbytes)
+    return ticks, spectrum
+
+def AVS_GetSaturatedPixels(handle):
+    """回傳 4096 個元素的飽和標記陣列，1 = 飽和"""
+    dev = _device(handle)
+    saturated = (ctypes.c_uint8 * MAX_NR_PIXELS)()
+    if dev is not None:
+        mask = np.ascontiguousarray(dev.latest_saturated, dtype=np.uint8)
+        ctypes.memmove(saturated, mask.ctypes.data, mask.nbytes)
+    return saturated
@@ -0,0 +1,155 @@
+# avaspec_types.py
+# AvaSpec 函式庫使用的常數與 ctypes 結構定義，不需載入原生 DLL 即可匯入
+import ctypes
+
+AVS_SERIAL_LEN = 10
+VERSION_LEN = 16
+DETECTOR_NAME_LEN = 20
+USER_ID_LEN = 64
+INVALID_AVS_HANDLE_VALUE = 1000
+ERR_ETHCONN_REUSE = -27
+SENS_HAMS9201 = 4
+SENS_TCD1304 = 5
+SENS_SU256LSB = 17
+SENS_SU512LDB = 18
+SENS_HAMS11639 = 22
+SENS_HAMG9208_512 = 24
+SENS_HAMS13496 = 26
+SENS_HAMS11155_2048_02_DIFF = 30
+SENSOR_OFFSET = 1
+NUMBER_OF_SENSOR_TYPES = 31
+NR_DEFECTIVE_PIXELS = 30
+MAX_NR_PIXELS = 4096
+CLIENT_ID_SIZE = 32
+
+DSTR_STATUS_DSS_MASK = 0x01   # DSTR Sequence Stop (DSS) bit of MEASUREMENT_DSTR_STATUS->DMS
+DSTR_STATUS_FOE_MASK = 0x02   # FIFO Overflow Error (FOE) bit of MEASUREMENT_DSTR_STATUS->DMS
+DSTR_STATUS_IERR_MASK = 0x04  # Internal Error (IERR) bit of MEASUREMENT_DSTR_STATUS->DMS
+
+class AvsIdentityType(ctypes.Structure):
+  _pack_ = 1
+  _fields_ = [("SerialNumber", ctypes.c_char * AVS_SERIAL_LEN),
+              ("UserFriendlyName", ctypes.c_char * USER_ID_LEN),
+              ("Status", ctypes.c_char)]
+
+class BroadcastAnswerType(ctypes.Structure):
+  _pack_ = 1
+  _fields_ = [("InterfaceType", ctypes.c_uint8),
+              ("serial", ctypes.c_char * AVS_SERIAL_LEN),
+              ("port", ctypes.c_uint16),
+              ("status", ctypes.c_uint8),
+              ("RemoteHostIp", ctypes.c_uint32),
+              ("LocalIp", ctypes.c_uint32),
+              ("reserved", ctypes.c_uint8 * 4)]
+
+class MeasConfigType(ctypes.Structure):
+  _pack_ = 1
+  _fields_ = [("m_StartPixel", ctypes.c_uint16),
+              ("m_StopPixel", ctypes.c_uint16),
+              ("m_IntegrationTime", ctypes.c_float),
+              ("m_IntegrationDelay", ctypes.c_uint32),
+              ("m_NrAverages", ctypes.c_uint32),
+              ("m_CorDynDark_m_Enable", ctypes.c_uint8), # nesting of types does NOT work!!
+              ("m_CorDynDark_m_ForgetPercentage", ctypes.c_uint8),
+              ("m_Smoothing_m_SmoothPix", ctypes.c_uint16),
+              ("m_Smoothing_m_SmoothModel", ctypes.c_uint8),
+              ("m_SaturationDetection", ctypes.c_uint8),
+              ("m_Trigger_m_Mode", ctypes.c_uint8),
+              ("m_Trigger_m_Source", ctypes.c_uint8),
+              ("m_Trigger_m_SourceType", ctypes.c_uint8),
+              ("m_Control_m_StrobeControl", ctypes.c_uint16),
+              ("m_Control_m_LaserDelay", ctypes.c_uint32),
+              ("m_Control_m_LaserWidth", ctypes.c_uint32),
+              ("m_Control_m_LaserWaveLength", ctypes.c_float),
+              ("m_Control_m_StoreToRam", ctypes.c_uint16)]
+
+class DeviceConfigType(ctypes.Structure):
+  _pack_ = 1
+  _fields_ = [("m_Len", ctypes.c_uint16),
+              ("m_ConfigVersion", ctypes.c_uint16),
+              ("m_aUserFriendlyId", ctypes.c_char * USER_ID_LEN),
+              ("m_Detector_m_SensorType", ctypes.c_uint8),                      
+              ("m_Detector_m_NrPixels", ctypes.c_uint16),
+              ("m_Detector_m_aFit", ctypes.c_float * 5),
+              ("m_Detector_m_NLEnable", ctypes.c_bool),
+              ("m_Detector_m_aNLCorrect", ctypes.c_double * 8),
+              ("m_Detector_m_aLowNLCounts", ctypes.c_double),
+              ("m_Detector_m_aHighNLCounts", ctypes.c_double),
+              ("m_Detector_m_Gain", ctypes.c_float * 2),
+              ("m_Detector_m_Reserved", ctypes.c_float),
+              ("m_Detector_m_Offset", ctypes.c_float * 2),
+              ("m_Detector_m_ExtOffset", ctypes.c_float),
+              ("m_Detector_m_DefectivePixels", ctypes.c_uint16 * 30),
+              ("m_Irradiance_m_IntensityCalib_m_Smoothing_m_SmoothPix", ctypes.c_uint16),
+              ("m_Irradiance_m_IntensityCalib_m_Smoothing_m_SmoothModel", ctypes.c_uint8),
+              ("m_Irradiance_m_IntensityCalib_m_CalInttime", ctypes.c_float),
+              ("m_Irradiance_m_IntensityCalib_m_aCalibConvers", ctypes.c_float * 4096),
+              ("m_Irradiance_m_CalibrationType", ctypes.c_uint8),
+              ("m_Irradiance_m_FiberDiameter", ctypes.c_uint32),  
+              ("m_Reflectance_m_Smoothing_m_SmoothPix", ctypes.c_uint16),
+              ("m_Reflectance_m_Smoothing_m_SmoothModel", ctypes.c_uint8),
+              ("m_Reflectance_m_CalInttime", ctypes.c_float),
+              ("m_Reflectance_m_aCalibConvers", ctypes.c_float * 4096),
+              ("m_SpectrumCorrect", ctypes.c_float * 4096),
+              ("m_StandAlone_m_Enable", ctypes.c_bool),
+              ("m_StandAlone_m_Meas_m_StartPixel", ctypes.c_uint16),
+              ("m_StandAlone_m_Meas_m_StopPixel", ctypes.c_uint16),
+              ("m_StandAlone_m_Meas_m_IntegrationTime", ctypes.c_float),
+              ("m_StandAlone_m_Meas_m_IntegrationDelay", ctypes.c_uint32),
+              ("m_StandAlone_m_Meas_m_NrAverages", ctypes.c_uint32),
+              ("m_StandAlone_m_Meas_m_CorDynDark_m_Enable", ctypes.c_uint8), 
+              ("m_StandAlone_m_Meas_m_CorDynDark_m_ForgetPercentage", ctypes.c_uint8),
+              ("m_StandAlone_m_Meas_m_Smoothing_m_SmoothPix", ctypes.c_uint16),
+              ("m_StandAlone_m_Meas_m_Smoothing_m_SmoothModel", ctypes.c_uint8),
+              ("m_StandAlone_m_Meas_m_SaturationDetection", ctypes.c_uint8),
+              ("m_StandAlone_m_Meas_m_Trigger_m_Mode", ctypes.c_uint8),
+              ("m_StandAlone_m_Meas_m_Trigger_m_Source", ctypes.c_uint8),
+              ("m_StandAlone_m_Meas_m_Trigger_m_SourceType", ctypes.c_uint8),
+              ("m_StandAlone_m_Meas_m_Control_m_StrobeControl", ctypes.c_uint16),
+              ("m_StandAlone_m_Meas_m_Control_m_LaserDelay", ctypes.c_uint32),
+              ("m_StandAlone_m_Meas_m_Control_m_LaserWidth", ctypes.c_uint32),
+              ("m_StandAlone_m_Meas_m_Control_m_LaserWaveLength", ctypes.c_float),
+              ("m_StandAlone_m_Meas_m_Control_m_StoreToRam", ctypes.c_uint16),
+              ("m_StandAlone_m_Nmsr", ctypes.c_int16),
+              ("m_DynamicStorage", ctypes.c_uint8 * 12), # ex SD Card, do not use
+              ("m_Temperature_1_m_aFit", ctypes.c_float * 5),
+              ("m_Temperature_2_m_aFit", ctypes.c_float * 5),
+              ("m_Temperature_3_m_aFit", ctypes.c_float * 5),
+              ("m_TecControl_m_Enable", ctypes.c_bool),
+              ("m_TecControl_m_Setpoint", ctypes.c_float),
+              ("m_TecControl_m_aFit", ctypes.c_float * 2),
+              ("m_ProcessControl_m_AnalogLow", ctypes.c_float * 2),
+              ("m_ProcessControl_m_AnalogHigh", ctypes.c_float * 2),
+              ("m_ProcessControl_m_DigitalLow", ctypes.c_float * 10),
+              ("m_ProcessControl_m_DigitalHigh", ctypes.c_float * 10),
+              ("m_EthernetSettings_m_IpAddr", ctypes.c_uint32),
+              ("m_EthernetSettings_m_NetMask", ctypes.c_uint32),
+              ("m_EthernetSettings_m_Gateway", ctypes.c_uint32), 
+              ("m_EthernetSettings_m_DhcpEnabled", ctypes.c_uint8), 
+              ("m_EthernetSettings_m_TcpPort", ctypes.c_uint16),
+              ("m_EthernetSettings_m_LinkStatus", ctypes.c_uint8),
+              ("m_EthernetSettings_m_ClientIdType", ctypes.c_uint8),
+              ("m_EthernetSettings_m_ClientIdCustom", ctypes.c_char * 32),
+              ("m_EthernetSettings_m_Reserved", ctypes.c_uint8 * 79),
+              ("m_Reserved", ctypes.c_uint8 * 9608),
+              ("m_OemData", ctypes.c_uint8 * 4096)]
+
+class DstrStatusType(ctypes.Structure):
+  _pack_ = 1
+  _fields_ = [("m_TotalScans", ctypes.c_uint32),
+              ("m_UsedScans", ctypes.c_uint32),
+              ("m_Flags", ctypes.c_uint32),
+              ("m_IsStopEvent", ctypes.c_uint8),
+              ("m_IsOverflowEvent", ctypes.c_uint8),
+              ("m_IsInternalErrorEvent", ctypes.c_uint8),
+              ("m_Reserved", ctypes.c_uint8)]
+
+class AVS_MeasureCallbackFunc(object):
+    def __init__(self, function):
+        self.prototype = ctypes.CFUNCTYPE(None, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int))
+        self.callback = self.prototype(function)    
+
+class AVS_DstrCallbackFunc(object):
+    def __init__(self, function):
+        self.prototype = ctypes.CFUNCTYPE(None, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_uint))
+        self.callback = self.prototype(function)
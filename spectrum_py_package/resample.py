@@ -0,0 +1,98 @@
+# resample.py
+# 將各光譜儀原生的像素波長軸重新取樣到共同的均勻波長網格。
+# 線性內插的權重只需計算一次（依裝置與網格快取），之後每批光譜只做一次帶狀（每點兩個像素）的加權運算
+import hashlib
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def make_grid(start, stop, step):
+    """建立包含端點的均勻波長網格（nm）"""
+    n = int(round((stop - start) / step)) + 1
+    return start + step * np.arange(n)
+
+
+@dataclass
+class InterpolationWeights:
+    # 每個網格點左側來源像素的索引（右側為 left + 1）
+    left: np.ndarray
+
+    # 左、右像素的內插權重
+    w_left: np.ndarray
+    w_right: np.ndarray
+
+    # 網格點是否落在來源波長範圍內（範圍外輸出 NaN）
+    valid: np.ndarray
+
+    def apply(self, spectra):
+        """套用到單筆 (pixels,) 或批次 (n_scans, pixels) 光譜"""
+        spectra = np.asarray(spectra)
+        out = spectra[..., self.left] * self.w_left + spectra[..., self.left + 1] * self.w_right
+        out[..., ~self.valid] = np.nan
+        return out
+
+
+def compute_weights(wavelength, grid):
+    """
+    計算從原生波長軸到網格的線性內插權重。
+    波長 <= 0 的像素（AVS_GetLambda 超出偵測器範圍的部分）會被忽略
+    """
+    wavelength = np.asarray(wavelength, dtype=np.float64)
+    grid = np.asarray(grid, dtype=np.float64)
+
+    pixels = np.flatnonzero(wavelength > 0)
+    if len(pixels) < 2:
+        raise ValueError("有效波長點不足，無法內插")
+    src = wavelength[pixels]
+    if np.any(np.diff(src) <= 0):
+        raise ValueError("波長軸必須嚴格遞增")
+
+    pos = np.clip(np.searchsorted(src, grid) - 1, 0, len(src) - 2)
+    x0, x1 = src[pos], src[pos + 1]
+    frac = (grid - x0) / (x1 - x0)
+    valid = (grid >= src[0]) & (grid <= src[-1])
+
+    return InterpolationWeights(
+        left=pixels[pos],
+        w_left=1.0 - frac,
+        w_right=frac,
+        valid=valid
+    )
+
+
+class WavelengthResampler:
+    """依 (裝置, 網格) 快取內插權重的重新取樣器"""
+
+    def __init__(self, start=200.0, stop=1100.0, step=0.5):
+        self.grid_key = (float(start), float(stop), float(step))
+        self.grid = make_grid(start, stop, step)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def device_key(wavelength, device=None):
+        """有序號時以序號為鍵，否則以波長陣列內容的雜湊值區分（例如讀取歷史資料時）"""
+        if device is not None:
+            return device
+        data = np.ascontiguousarray(wavelength, dtype=np.float64)
+        return hashlib.sha1(data.tobytes()).hexdigest()
+
+    def weights(self, wavelength, device=None):
+        key = (self.device_key(wavelength, device), self.grid_key)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            cached = compute_weights(wavelength, self.grid)
+            with self._lock:
+                self._cache[key] = cached
+        return cached
+
+    def resample(self, spectra, wavelength, device=None):
+        """將光譜（單筆或批次）重新取樣到網格上，回傳 (grid, resampled)"""
+        return self.grid, self.weights(wavelength, device).apply(spectra)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
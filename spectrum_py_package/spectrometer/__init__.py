@@ -1,4 +1,5 @@
 from .spectrometer import Spectrometer
 from .config import SpectrometerConfig
 from .interface import AvantesInterface
-from .calibration import apply_calibration
\ No newline at end of file
+from .calibration import apply_calibration
+from .multi import MultiSpectrometer, ScanBuffer, align_scans
\ No newline at end of file
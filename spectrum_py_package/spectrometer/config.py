@@ -3,8 +3,9 @@
 import numpy as np
 
 class SpectrometerConfig:
-    def __init__(self, dev_handle, pixels, wavelength, calib_factors):
+    def __init__(self, dev_handle, pixels, wavelength, calib_factors, serial=None):
         self.dev_handle = dev_handle
+        self.serial = serial
         self.pixels = pixels
         self.wavelength = wavelength
         self.calib_factors = calib_factors
@@ -21,5 +22,6 @@ class SpectrometerConfig:
             dev_handle=avs.dev_handle,
             pixels=pixels,
             wavelength=wavelength,
-            calib_factors=calib_factors
+            calib_factors=calib_factors,
+            serial=avs.serial
         )
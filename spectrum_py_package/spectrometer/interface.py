@@ -1,40 +1,70 @@
 # spectrometer/interface.py
 # 封裝所有 Avantes DLL 操作函式，提供簡單乾淨的裝置控制介面
-from ..avaspec import *
+import importlib
+import os
+
+# 設定環境變數 AVASPEC_SIMULATE=1 即改用模擬器，不需實體光譜儀與原生 DLL
+SIMULATE_ENV = "AVASPEC_SIMULATE"
+
+
+def load_backend(simulate=None):
+    """載入 AvaSpec 後端模組：原生函式庫 (avaspec) 或模擬器 (avaspec_sim)"""
+    if simulate is None:
+        simulate = os.environ.get(SIMULATE_ENV, "0").lower() in ("1", "true", "yes")
+    name = "avaspec_sim" if simulate else "avaspec"
+    return importlib.import_module(f"..{name}", __package__)
+
 
 class AvantesInterface:
-    def __init__(self):
-        ret = AVS_Init(0)
-        if ret <= 0:
-            raise RuntimeError("沒有找到光譜儀!")
+    def __init__(self, simulate=None, device_index=0, lib=None, devices=None):
+        # 多台光譜儀共用同一個已初始化的函式庫與裝置清單，只需初始化一次
+        self.lib = lib if lib is not None else load_backend(simulate)
+
+        if devices is None:
+            ret = self.lib.AVS_Init(0)
+            if ret <= 0:
+                raise RuntimeError("沒有找到光譜儀!")
+            devices = self.lib.AVS_GetList(ret)
 
-        self.devices = AVS_GetList(1)
+        self.devices = devices
         if len(self.devices) == 0:
             raise RuntimeError("無可用設備!")
+        if device_index >= len(self.devices):
+            raise RuntimeError(f"光譜儀索引 {device_index} 超出範圍 (共 {len(self.devices)} 台)")
+
+        self.device_index = device_index
+        self.serial = self.devices[device_index].SerialNumber.decode('utf-8')
+        self.dev_handle = self.lib.AVS_Activate(self.devices[device_index])
+        print(f"啟動光譜儀: {self.serial}")
 
-        self.dev_handle = AVS_Activate(self.devices[0])
-        print(f"啟動光譜儀: {self.devices[0].SerialNumber.decode('utf-8')}")
+    @classmethod
+    def open_all(cls, simulate=None):
+        """初始化函式庫並啟用所有連接的光譜儀，回傳每台裝置的介面清單"""
+        first = cls(simulate=simulate)
+        others = [cls(device_index=i, lib=first.lib, devices=first.devices)
+                  for i in range(1, len(first.devices))]
+        return [first] + others
 
     def get_parameter(self):
-        return AVS_GetParameter(self.dev_handle, 63484)
+        return self.lib.AVS_GetParameter(self.dev_handle, 63484)
 
     def get_lambda(self):
-        return AVS_GetLambda(self.dev_handle)
+        return self.lib.AVS_GetLambda(self.dev_handle)
 
     def prepare_measure(self, measconfig):
-        return AVS_PrepareMeasure(self.dev_handle, measconfig)
+        return self.lib.AVS_PrepareMeasure(self.dev_handle, measconfig)
 
-    def start_measurement(self, callback_func):
-        return AVS_MeasureCallback(self.dev_handle, callback_func, 1)
+    def start_measurement(self, callback_func, nummeas=1):
+        return self.lib.AVS_MeasureCallback(self.dev_handle, callback_func, nummeas)
 
     def poll_scan(self):
-        return AVS_PollScan(self.dev_handle)
+        return self.lib.AVS_PollScan(self.dev_handle)
 
     def get_scope_data(self):
-        return AVS_GetScopeData(self.dev_handle)
+        return self.lib.AVS_GetScopeData(self.dev_handle)
 
     def stop(self):
-        AVS_StopMeasure(self.dev_handle)
+        self.lib.AVS_StopMeasure(self.dev_handle)
 
     def close(self):
-        AVS_Done()
+        self.lib.AVS_Done()
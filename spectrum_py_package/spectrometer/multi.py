@@ -0,0 +1,213 @@
+# spectrometer/multi.py
+# 同時啟用所有連接的光譜儀：每台裝置有各自的回呼與掃描緩衝區，
+# 讀取時再依時間戳合併成單一、時間對齊的資料流
+import threading
+import time
+import numpy as np
+
+from .interface import AvantesInterface
+from .config import SpectrometerConfig
+from .calibration import apply_calibration
+from ..avaspec_types import MeasConfigType, AVS_MeasureCallbackFunc
+from ..globals import SpectrometerGlobals
+
+
+class ScanBuffer:
+    """
+    單一光譜儀的固定大小掃描環形緩衝區（由回呼執行緒寫入）。
+    讀取端以 drain() 取出全部新掃描，或以 peek() 查看、consume() 只取出其中一部分
+    """
+
+    def __init__(self, pixels, capacity=256):
+        self.capacity = capacity
+        self.spectra = np.zeros((capacity, pixels))
+        self.timestamps = np.zeros(capacity)
+        self.ticks = np.zeros(capacity, dtype=np.uint32)
+        self.written = 0    # 累計寫入的掃描數
+        self.read = 0       # 已被 drain() / consume() 取出的掃描數
+        self.dropped = 0    # 來不及讀取就被覆寫的掃描數
+        self.lock = threading.Lock()
+
+    def append(self, timestamp, ticks, spectrum):
+        with self.lock:
+            slot = self.written % self.capacity
+            self.spectra[slot] = spectrum
+            self.timestamps[slot] = timestamp
+            self.ticks[slot] = ticks
+            self.written += 1
+
+    def peek(self):
+        """查看尚未取出的掃描但不取出，回傳 (起始序號, timestamps, ticks, spectra) 複本"""
+        with self.lock:
+            start = max(self.read, self.written - self.capacity)
+            idx = np.arange(start, self.written) % self.capacity
+            return start, self.timestamps[idx], self.ticks[idx], self.spectra[idx]
+
+    def consume(self, upto):
+        """標記序號 upto 之前的掃描為已取出（upto 為 peek() 的起始序號加上筆數）"""
+        with self.lock:
+            start = max(self.read, self.written - self.capacity)
+            self.dropped += start - self.read
+            self.read = max(start, min(upto, self.written))
+
+    def drain(self):
+        """取出上次呼叫後新增的掃描，回傳 (timestamps, ticks, spectra) 複本"""
+        with self.lock:
+            start = max(self.read, self.written - self.capacity)
+            self.dropped += start - self.read
+            idx = np.arange(start, self.written) % self.capacity
+            self.read = self.written
+            return self.timestamps[idx], self.ticks[idx], self.spectra[idx]
+
+
+def align_scans(streams, tolerance=None):
+    """
+    將多台光譜儀各自的 (timestamps, spectra) 合併成時間對齊的資料流。
+    以掃描數最少（最慢）的裝置為時間基準，其他裝置取時間最接近的掃描；
+    若指定 tolerance（秒），任一裝置時間差超過此值的基準點會被捨棄。
+    回傳 (timestamps, [每台裝置的 spectra，形狀 (n, pixels)])
+    """
+    if not streams or any(len(times) == 0 for times, _ in streams):
+        return np.array([]), [spectra[:0] for _, spectra in streams]
+
+    ref = min(range(len(streams)), key=lambda k: len(streams[k][0]))
+    ref_times = np.asarray(streams[ref][0])
+    keep = np.ones(len(ref_times), dtype=bool)
+
+    indices = []
+    for times, _ in streams:
+        times = np.asarray(times)
+        pos = np.searchsorted(times, ref_times)
+        left = np.clip(pos - 1, 0, len(times) - 1)
+        right = np.clip(pos, 0, len(times) - 1)
+        nearest = np.where(np.abs(times[left] - ref_times) <= np.abs(times[right] - ref_times), left, right)
+        if tolerance is not None:
+            keep &= np.abs(times[nearest] - ref_times) <= tolerance
+        indices.append(nearest)
+
+    aligned = [np.asarray(spectra)[idx[keep]] for (_, spectra), idx in zip(streams, indices)]
+    return ref_times[keep], aligned
+
+
+class MultiSpectrometer:
+    def __init__(self, simulate=None, buffer_size=256):
+        self.interfaces = AvantesInterface.open_all(simulate=simulate)
+        self.configs = [SpectrometerConfig.from_device(avs) for avs in self.interfaces]
+
+        # 每台裝置各自的狀態（取代單一的 globals 單例）與掃描緩衝區
+        self.states = [
+            SpectrometerGlobals(dev_handle=c.dev_handle, pixels=c.pixels,
+                                wavelength=c.wavelength, spectraldata=np.zeros(c.pixels))
+            for c in self.configs
+        ]
+        self.buffers = [ScanBuffer(c.pixels, buffer_size) for c in self.configs]
+
+        # 保留 ctypes 回呼物件的參考，避免量測期間被回收
+        self._callbacks = []
+        self.integration_time = 50.0
+        self.running = False
+
+    @property
+    def serials(self):
+        return [avs.serial for avs in self.interfaces]
+
+    def get_wavelengths(self):
+        return [c.wavelength for c in self.configs]
+
+    def _make_callback(self, k):
+        avs, config, state, buf = self.interfaces[k], self.configs[k], self.states[k], self.buffers[k]
+
+        def handle_newdata(lparam1, lparam2):
+            timestamp = time.time()
+            if lparam2[0] < 0:
+                print(f"光譜儀 {avs.serial} 量測錯誤: {lparam2[0]}")
+                return
+            ticks, spectrum = avs.get_scope_data()
+            data = np.ctypeslib.as_array(spectrum)[:config.pixels]
+            data = apply_calibration(data, config.calib_factors)
+            buf.append(timestamp, ticks, data)
+            state.spectraldata = data
+            state.NrScanned += 1
+
+        return AVS_MeasureCallbackFunc(handle_newdata)
+
+    def start(self, integration_time=50.0, averages=1, nummeas=-1):
+        """所有光譜儀同時開始量測；nummeas = -1 為連續量測"""
+        for avs, config in zip(self.interfaces, self.configs):
+            measconfig = MeasConfigType()
+            measconfig.m_StartPixel = 0
+            measconfig.m_StopPixel = config.pixels - 1
+            measconfig.m_IntegrationTime = integration_time
+            measconfig.m_NrAverages = averages
+            measconfig.m_Trigger_m_Mode = 0
+            if avs.prepare_measure(measconfig) != 0:
+                raise RuntimeError(f"光譜儀 {avs.serial} AVS_PrepareMeasure 失敗")
+
+        self._callbacks = [self._make_callback(k) for k in range(len(self.interfaces))]
+        for avs, cb in zip(self.interfaces, self._callbacks):
+            if avs.start_measurement(cb, nummeas) != 0:
+                self.stop()
+                raise RuntimeError(f"光譜儀 {avs.serial} AVS_MeasureCallback 啟動失敗")
+
+        self.integration_time = integration_time
+        self.running = True
+
+    def read_aligned(self, tolerance=None):
+        """
+        將各裝置新增的掃描合併為時間對齊的 (timestamps, [spectra...])。
+        只取出到最後一個對齊時間點為止的掃描，較新的掃描留在緩衝區等下次對齊；
+        某台裝置暫時沒有新掃描時不取出任何資料，較慢的裝置補上後仍可對齊
+        """
+        snapshots = [buf.peek() for buf in self.buffers]
+        streams = [(times, spectra) for _, times, _, spectra in snapshots]
+        timestamps, aligned = align_scans(streams, tolerance)
+        if not streams or any(len(times) == 0 for times, _ in streams):
+            return timestamps, aligned
+
+        cutoff = timestamps[-1] if len(timestamps) else -np.inf
+        if tolerance is not None:
+            # 比每台裝置最新的掃描都早超過 tolerance 的掃描，之後也不可能對齊，一併取出
+            cutoff = max(cutoff, min(times[-1] for times, _ in streams) - tolerance)
+        for buf, (start, times, _, _) in zip(self.buffers, snapshots):
+            buf.consume(start + int(np.searchsorted(times, cutoff, side='right')))
+        return timestamps, aligned
+
+    def read_resampled(self, resampler, tolerance=None):
+        """
+        同 read_aligned()，但將每台裝置的光譜重新取樣到 resampler 的共同波長網格，
+        回傳 (timestamps, grid, spectra)，spectra 形狀為 (n, 裝置數, 網格點數)
+        """
+        timestamps, aligned = self.read_aligned(tolerance)
+        resampled = [resampler.resample(spectra, config.wavelength, device=config.serial)[1]
+                     for spectra, config in zip(aligned, self.configs)]
+        return timestamps, resampler.grid, np.stack(resampled, axis=1)
+
+    def measure_once(self, timeout=5, integration_time=50.0, averages=1):
+        """所有光譜儀同時進行單次測量，回傳每台裝置的光譜"""
+        counts = [state.NrScanned for state in self.states]
+        self.start(integration_time=integration_time, averages=averages, nummeas=1)
+
+        start_time = time.time()
+        while any(state.NrScanned == c for state, c in zip(self.states, counts)):
+            if time.time() - start_time > timeout:
+                self.stop()
+                raise RuntimeError("等待超時")
+            time.sleep(0.01)
+
+        self.stop()
+        return [state.spectraldata for state in self.states]
+
+    def get_integration_time(self):
+        return self.integration_time
+
+    def stop(self):
+        for avs in self.interfaces:
+            avs.stop()
+        self.running = False
+
+    def close(self):
+        self.stop()
+        # AVS_Done 會釋放所有裝置，只需呼叫一次
+        if self.interfaces:
+            self.interfaces[0].close()
+        print(f"已關閉 {len(self.interfaces)} 台光譜儀")
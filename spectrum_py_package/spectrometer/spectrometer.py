@@ -1,16 +1,15 @@
 # spectrometer.py
 # 此模組定義 Spectrometer 類別，負責統整光譜儀的初始化、測量、資料接收與關閉流程
-from PyQt5.QtCore import pyqtSlot
 from .interface import AvantesInterface
 from .config import SpectrometerConfig
 from .calibration import apply_calibration
-from ..avaspec import MeasConfigType, AVS_MeasureCallbackFunc
+from ..avaspec_types import MeasConfigType, AVS_MeasureCallbackFunc
 import numpy as np
 import time
 
 class Spectrometer:
-    def __init__(self):
-        self.avs = AvantesInterface()
+    def __init__(self, simulate=None):
+        self.avs = AvantesInterface(simulate=simulate)
         self.config = SpectrometerConfig.from_device(self.avs)
         self.data_ready = False
         self.spectral_data = np.zeros(self.config.pixels)
@@ -55,7 +54,6 @@ class Spectrometer:
             time.sleep(0.5)
         return self.spectral_data
 
-    @pyqtSlot(int, int)
     def handle_newdata(self, lparam1, lparam2):
         print("接收新光譜資料中...")
         ret = self.avs.get_scope_data()
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pyaudio")
+
+from signal_package.audio_recorder import CaptureBuffer
+
+
+def test_write_block_larger_than_capacity_keeps_newest_in_order():
+    buf = CaptureBuffer(capacity_frames=8, channels=1)
+    buf.write(np.arange(3, dtype=np.int16))
+    buf.write(np.arange(100, 120, dtype=np.int16))
+
+    assert buf.available() == 8
+    assert buf.overruns == 1
+    assert buf.dropped_samples == 15
+    np.testing.assert_array_equal(buf.read(8, timeout=0), np.arange(112, 120))
+
+
+def test_wraparound_read_after_oversized_write():
+    buf = CaptureBuffer(capacity_frames=4, channels=2)
+    buf.write(np.arange(13, dtype=np.int16))
+    np.testing.assert_array_equal(buf.read(4, timeout=0), np.arange(5, 9))
+    buf.write(np.arange(13, 17, dtype=np.int16))
+    np.testing.assert_array_equal(buf.read(8, timeout=0), np.arange(9, 17))